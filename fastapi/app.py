@@ -6,7 +6,7 @@ This module creates and configures the FastAPI application.
 
 import asyncio
 import logging
-import time
+import os
 from contextlib import asynccontextmanager
 from typing import Dict
 
@@ -15,15 +15,29 @@ from config.database import (
     check_database_exists,
     database_health,
     init_engine,
+    start_pool_warmup,
+    start_read_replica_monitor,
     start_token_refresh,
+    stop_pool_warmup,
+    stop_read_replica_monitor,
     stop_token_refresh,
 )
 from errors.handlers import register_exception_handlers
 from routes import api_router
 from services.db.connector import close_connections
+from services.monitoring.metrics import mark_process_dead
+from services.monitoring.middleware import ProcessTimeMiddleware
+from services.orders.change_feed import order_change_feed
+from services.orders.changes import start_change_tracking, stop_change_tracking
+from services.orders.counts import order_counts
+from services.orders.indexes import order_indexes
+from services.orders.notifications import order_change_listener
+from services.orders.page_index import page_index
+from services.orders.summary import order_summary
+from services.orders.write_behind import status_write_behind
 from sqlmodel import SQLModel
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -47,7 +61,17 @@ async def lifespan(app: FastAPI):
 
             async with engine.begin() as conn:
                 await conn.run_sync(SQLModel.metadata.create_all)
+            await start_pool_warmup()
+            await order_indexes.start()
+            await start_change_tracking()
             await start_token_refresh()
+            await start_read_replica_monitor()
+            await page_index.start()
+            await order_counts.start()
+            await order_summary.start()
+            await status_write_behind.start()
+            await order_change_listener.start()
+            await order_change_feed.start()
             health_check_task = asyncio.create_task(check_database_health(300))
             logger.info("Database engine initialized and health monitoring started")
         except Exception as e:
@@ -68,9 +92,20 @@ async def lifespan(app: FastAPI):
             await health_check_task
         except asyncio.CancelledError:
             logger.info("Database health check task cancelled successfully")
+        await order_change_feed.stop()
+        await order_change_listener.stop()
+        await status_write_behind.stop()
+        await order_summary.stop()
+        await order_counts.stop()
+        await page_index.stop()
+        await stop_change_tracking()
+        await order_indexes.stop()
+        await stop_read_replica_monitor()
+        await stop_pool_warmup()
         await stop_token_refresh()
     logger.info("Application shutdown complete")
     close_connections()
+    mark_process_dead()
 
 
 # Create the main FastAPI application
@@ -84,6 +119,12 @@ app = FastAPI(
 # Register exception handlers
 register_exception_handlers(app)
 
+# Performance monitoring middleware
+app.add_middleware(
+    ProcessTimeMiddleware,
+    log_sample_rate=float(os.getenv("REQUEST_LOG_SAMPLE_RATE", "1.0")),
+)
+
 # Include the API router
 app.include_router(api_router)
 
@@ -98,19 +139,6 @@ async def root() -> Dict[str, str]:
     }
 
 
-# Performance monitoring middleware
-@app.middleware("http")
-async def add_process_time_header(request: Request, call_next):
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
-    response.headers["X-Process-Time"] = str(process_time)
-    logger.info(
-        f"Request: {request.method} {request.url.path} - {process_time * 1000:.1f}ms"
-    )
-    return response
-
-
 async def check_database_health(interval: int):
     while True:
         try:
@@ -0,0 +1,350 @@
+"""
+Lakebase credential management.
+
+Lakebase accepts short-lived OAuth tokens as Postgres passwords. The
+credential manager keeps a current token for new connections:
+
+- The Databricks SDK call generating a token is blocking, so it runs in a
+  worker thread and never stalls the event loop.
+- The next refresh is scheduled from the expiry reported with the token,
+  a margin ahead of it and with random jitter, so that app processes
+  started together do not refresh together.
+- A failed refresh is retried with exponential backoff while the current
+  token is still valid.
+- After a rotation, pooled connections opened with the previous token are
+  retired at random points over a window instead of all at once, so the
+  pool reconnects gradually.
+
+With several worker processes, the token can be shared through a file
+instead of being generated by every worker. The worker holding an
+exclusive `flock` on the file's lock file is the leader: it generates and
+rotates the token and writes it to the file. The other workers read the
+file periodically and take over the lock when the leader exits.
+"""
+
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import random
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+
+def parse_expiration_time(value: Optional[str]) -> Optional[float]:
+    """Parse an ISO 8601 expiration time into a Unix timestamp, None if missing or invalid."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        logger.warning(f"Unparsable credential expiration time: {value}")
+        return None
+
+
+@dataclass(frozen=True)
+class SharedCredential:
+    """A token as stored in the shared credential file."""
+
+    token: str
+    expires_at: float
+    refreshed_at: float
+
+
+class SharedCredentialFile:
+    """A token file shared by the workers of one host, written by the lock holder."""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Path of the credential file; the lock file is `<path>.lock`
+        """
+        self.path = path
+        self.lock_path = f"{path}.lock"
+        self._lock_fd: Optional[int] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._lock_fd is not None
+
+    def try_lead(self) -> bool:
+        """Take the leader lock if no other process holds it; True if this process is the leader."""
+        if self._lock_fd is not None:
+            return True
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    def release(self) -> None:
+        """Give up the leader lock."""
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def read(self) -> Optional[SharedCredential]:
+        """Return the stored token, None if there is none or it cannot be read."""
+        try:
+            with open(self.path) as f:
+                return SharedCredential(**json.load(f))
+        except FileNotFoundError:
+            return None
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Unreadable shared credential file {self.path}: {e}")
+            return None
+
+    def write(self, credential: SharedCredential) -> None:
+        """Replace the stored token atomically, readable by the owner only."""
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        fd = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(asdict(credential), f)
+        os.replace(temporary, self.path)
+
+
+class CredentialManager:
+    """Keeps a valid database token and rotates it before it expires."""
+
+    def __init__(
+        self,
+        generate: Callable[[], Any],
+        refresh_margin: float,
+        jitter: float,
+        retry_initial: float,
+        retry_max: float,
+        default_lifetime: float,
+        retire_window: float,
+        shared: Optional[SharedCredentialFile] = None,
+        poll_interval: float = 10.0,
+        startup_wait: float = 30.0,
+    ):
+        """
+        Args:
+            generate: Blocking function returning a credential with `token`
+                and `expiration_time` attributes
+            refresh_margin: Seconds before expiry at which the token is refreshed
+            jitter: Maximum random seconds by which a refresh is brought forward
+            retry_initial: Seconds before the first retry of a failed refresh
+            retry_max: Maximum seconds between retries
+            default_lifetime: Token lifetime assumed when no expiry is reported
+            retire_window: Seconds over which connections opened with a
+                previous token are retired
+            shared: File sharing the token with other workers, None to
+                generate tokens in this process only
+            poll_interval: Seconds between reads of the shared file by a
+                worker that is not the leader
+            startup_wait: Seconds a worker waits at startup for the leader
+                to share a token before generating its own
+        """
+        self.generate = generate
+        self.refresh_margin = refresh_margin
+        self.jitter = jitter
+        self.retry_initial = retry_initial
+        self.retry_max = retry_max
+        self.default_lifetime = default_lifetime
+        self.retire_window = retire_window
+        self.shared = shared
+        self.poll_interval = poll_interval
+        self.startup_wait = startup_wait
+
+        self.token: Optional[str] = None
+        self.expires_at: float = 0
+        self.refreshed_at: float = 0
+        # Incremented on every rotation; pooled connections remember theirs
+        self.generation = 0
+        self.failures = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def time_to_expiry(self) -> float:
+        return self.expires_at - time.time()
+
+    def _set(self, credential: SharedCredential) -> None:
+        self.token = credential.token
+        self.expires_at = credential.expires_at
+        self.refreshed_at = credential.refreshed_at
+        self.generation += 1
+        self.failures = 0
+
+    def _store(self, credential: Any) -> None:
+        now = time.time()
+        expires_at = parse_expiration_time(getattr(credential, "expiration_time", None))
+        generated = SharedCredential(
+            token=credential.token,
+            expires_at=expires_at or now + self.default_lifetime,
+            refreshed_at=now,
+        )
+        self._set(generated)
+        if self.shared is not None and self.shared.is_leader:
+            self.shared.write(generated)
+
+    def _adopt_shared(self, min_remaining: float = 0) -> bool:
+        """Use the shared token if it is newer than ours and valid for min_remaining seconds."""
+        credential = self.shared.read()
+        if credential is None or credential.expires_at - time.time() <= min_remaining:
+            return False
+        if credential.refreshed_at > self.refreshed_at:
+            self._set(credential)
+            logger.info(
+                f"Database credential read from {self.shared.path}, "
+                f"valid for {self.time_to_expiry:.0f}s"
+            )
+        return True
+
+    def refresh_sync(self) -> None:
+        """Obtain a token on the calling thread, for use before the event loop serves requests."""
+        if self.shared is not None:
+            if self.shared.try_lead():
+                # A token left by a previous leader is reused while it is fresh enough
+                if self._adopt_shared(min_remaining=self.refresh_margin):
+                    return
+            else:
+                deadline = time.monotonic() + self.startup_wait
+                while time.monotonic() < deadline:
+                    if self._adopt_shared():
+                        return
+                    time.sleep(0.5)
+                logger.warning("No shared database credential yet; generating one")
+        self._store(self.generate())
+        logger.info(f"Database credential generated, valid for {self.time_to_expiry:.0f}s")
+
+    async def refresh(self) -> None:
+        """Generate a token in a worker thread and make it current."""
+        credential = await asyncio.to_thread(self.generate)
+        self._store(credential)
+        logger.info(f"Database credential rotated, valid for {self.time_to_expiry:.0f}s")
+
+    def next_refresh_delay(self) -> float:
+        """Return the seconds until the next scheduled refresh."""
+        delay = self.time_to_expiry - self.refresh_margin - random.uniform(0, self.jitter)
+        return max(delay, 0)
+
+    def retry_delay(self) -> float:
+        """Return the seconds before retrying after `failures` consecutive failed refreshes."""
+        delay = min(self.retry_max, self.retry_initial * 2 ** (self.failures - 1))
+        # Full jitter, but never retry in a tight loop
+        return random.uniform(delay / 2, delay)
+
+    async def _run(self) -> None:
+        delay = None
+        while True:
+            if self.shared is not None and not self.shared.try_lead():
+                # Follow the leader's rotations until its lock is released
+                await asyncio.sleep(self.poll_interval)
+                self._adopt_shared()
+                delay = None
+                continue
+            if delay is None:
+                if self.shared is not None:
+                    self._adopt_shared()
+                delay = self.next_refresh_delay()
+            await asyncio.sleep(delay)
+            try:
+                await self.refresh()
+                delay = self.next_refresh_delay()
+            except Exception as e:
+                self.failures += 1
+                delay = self.retry_delay()
+                remaining = self.time_to_expiry
+                if remaining > 0:
+                    logger.error(
+                        f"Database credential refresh failed ({self.failures} in a row), "
+                        f"token expires in {remaining:.0f}s; retrying in {delay:.0f}s: {e}"
+                    )
+                else:
+                    logger.error(
+                        f"Database credential refresh failed ({self.failures} in a row), "
+                        f"token expired {-remaining:.0f}s ago; retrying in {delay:.0f}s: {e}"
+                    )
+
+    async def start(self) -> None:
+        """Start rotating the token in the background."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info("Database credential rotation started")
+
+    async def stop(self) -> None:
+        """Stop rotating the token."""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            logger.info("Database credential rotation stopped")
+        if self.shared is not None:
+            # Let another worker take over rotating the token
+            self.shared.release()
+
+    def attach(self, engine: AsyncEngine) -> None:
+        """
+        Use the current token for an engine's new connections and retire old ones gradually.
+
+        Args:
+            engine: The engine whose connections authenticate with the token
+        """
+
+        @event.listens_for(engine.sync_engine, "do_connect")
+        def provide_token(dialect, conn_rec, cargs, cparams):
+            cparams["password"] = self.token
+
+        @event.listens_for(engine.sync_engine, "connect")
+        def remember_generation(dbapi_connection, conn_rec):
+            conn_rec.info["credential_generation"] = self.generation
+
+        @event.listens_for(engine.sync_engine, "checkout")
+        def retire_stale(dbapi_connection, conn_rec, conn_proxy):
+            if conn_rec.info.get("credential_generation", self.generation) >= self.generation:
+                return
+            retire_at = conn_rec.info.get("retire_at")
+            if retire_at is None:
+                # Pick this connection's slot in the retirement window once
+                retire_at = self.refreshed_at + random.uniform(0, self.retire_window)
+                conn_rec.info["retire_at"] = retire_at
+            if time.time() >= retire_at:
+                # The pool closes the connection and checks out a new one
+                raise exc.DisconnectionError("Connection opened with a previous credential")
+
+
+def lakebase_credential_manager(workspace_client, instance_name: str) -> CredentialManager:
+    """
+    Create a credential manager generating tokens for a Lakebase instance.
+
+    Args:
+        workspace_client: The Databricks workspace client
+        instance_name: Name of the Lakebase database instance
+
+    Returns:
+        CredentialManager: A manager configured from the environment
+    """
+
+    def generate():
+        return workspace_client.database.generate_database_credential(
+            request_id=str(uuid.uuid4()), instance_names=[instance_name]
+        )
+
+    shared_path = os.getenv("DB_CREDENTIAL_CACHE_PATH")
+    return CredentialManager(
+        generate=generate,
+        refresh_margin=float(os.getenv("DB_CREDENTIAL_REFRESH_MARGIN", "600")),
+        jitter=float(os.getenv("DB_CREDENTIAL_REFRESH_JITTER", "120")),
+        retry_initial=float(os.getenv("DB_CREDENTIAL_RETRY_INITIAL", "5")),
+        retry_max=float(os.getenv("DB_CREDENTIAL_RETRY_MAX", "60")),
+        default_lifetime=float(os.getenv("DB_CREDENTIAL_DEFAULT_LIFETIME", "3600")),
+        retire_window=float(os.getenv("DB_CREDENTIAL_RETIRE_WINDOW", "300")),
+        shared=SharedCredentialFile(shared_path) if shared_path else None,
+        poll_interval=float(os.getenv("DB_CREDENTIAL_CACHE_POLL_INTERVAL", "10")),
+    )
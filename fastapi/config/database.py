@@ -2,11 +2,12 @@ import asyncio
 import logging
 import os
 import time
-import uuid
 from typing import AsyncGenerator
 
+from config.credentials import CredentialManager, lakebase_credential_manager
 from databricks.sdk import WorkspaceClient
 from dotenv import load_dotenv
+from services.monitoring.metrics import InstrumentedAsyncQueuePool, instrument_engine
 from sqlalchemy import URL, event, text
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
@@ -20,33 +21,74 @@ AsyncSessionLocal: sessionmaker | None = None
 workspace_client: WorkspaceClient | None = None
 database_instance = None
 
-# Token management for background refresh
-postgres_password: str | None = None
-last_password_refresh: float = 0
-token_refresh_task: asyncio.Task | None = None
+# Read replica (readable secondaries) used by read-only endpoints
+read_engine: AsyncEngine | None = None
+AsyncReadSessionLocal: sessionmaker | None = None
+read_replica_healthy: bool = False
+read_replica_monitor_task: asyncio.Task | None = None
+
+# Credential manager rotating the OAuth token used as the Postgres password
+credentials: CredentialManager | None = None
+
+# Pool pre-warming; the app reports ready once the pools hold open connections
+pool_warmup_task: asyncio.Task | None = None
+pools_warm: bool = False
+warmed_connections: dict[str, int] = {}
+
+
+def _create_engine(
+    host: str,
+    username: str,
+    database_name: str,
+    application_name: str,
+    pool_name: str,
+    pool_size: int,
+    max_overflow: int,
+) -> AsyncEngine:
+    """Create an async engine for one Lakebase endpoint using the shared OAuth token"""
+    url = URL.create(
+        drivername="postgresql+asyncpg",
+        username=username,
+        password="",  # Will be set by event handler
+        host=host,
+        port=int(os.getenv("DATABRICKS_DATABASE_PORT", "5432")),
+        database=database_name,
+    )
+
+    new_engine = create_async_engine(
+        url,
+        pool_pre_ping=False,
+        echo=False,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_logging_name=pool_name,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=int(os.getenv("DB_POOL_TIMEOUT", "30")),
+        # OPTIONAL: Recycle connections every hour (before token expires)
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE_INTERVAL", "3600")),
+        connect_args={
+            "command_timeout": int(os.getenv("DB_COMMAND_TIMEOUT", "10")),
+            "server_settings": {
+                "application_name": application_name,
+            },
+            "ssl": "require",
+        },
+    )
 
+    # New connections use the current token; old ones are retired after a rotation
+    credentials.attach(new_engine)
+    instrument_engine(new_engine, pool_name)
 
-async def refresh_token_background():
-    """Background task to refresh tokens every 50 minutes"""
-    global postgres_password, last_password_refresh, workspace_client, database_instance
+    return new_engine
 
-    while True:
-        try:
-            await asyncio.sleep(50 * 60)  # Wait 50 minutes
-            logger.info(
-                "Background token refresh: Generating fresh PostgreSQL OAuth token"
-            )
 
-            cred = workspace_client.database.generate_database_credential(
-                request_id=str(uuid.uuid4()),
-                instance_names=[database_instance.name],
-            )
-            postgres_password = cred.token
-            last_password_refresh = time.time()
-            logger.info("Background token refresh: Token updated successfully")
-
-        except Exception as e:
-            logger.error(f"Background token refresh failed: {e}")
+def mark_replica_unhealthy(context):
+    """Route reads to the primary after a read replica disconnect or failed connection attempt"""
+    global read_replica_healthy
+    if context.is_disconnect or context.connection is None:
+        if read_replica_healthy:
+            logger.warning("Read replica connection failed; routing reads to the primary")
+        read_replica_healthy = False
 
 
 def init_engine():
@@ -54,10 +96,11 @@ def init_engine():
     global \
         engine, \
         AsyncSessionLocal, \
+        read_engine, \
+        AsyncReadSessionLocal, \
         workspace_client, \
         database_instance, \
-        postgres_password, \
-        last_password_refresh
+        credentials
 
     try:
         workspace_client = WorkspaceClient()
@@ -71,12 +114,8 @@ def init_engine():
         )
 
         # Generate initial credentials
-        cred = workspace_client.database.generate_database_credential(
-            request_id=str(uuid.uuid4()), instance_names=[database_instance.name]
-        )
-        postgres_password = cred.token
-        last_password_refresh = time.time()
-        logger.info("Database: Initial credentials generated")
+        credentials = lakebase_credential_manager(workspace_client, database_instance.name)
+        credentials.refresh_sync()
 
         # Create Engine
         database_name = os.getenv("LAKEBASE_DATABASE_NAME", database_instance.name)
@@ -86,43 +125,42 @@ def init_engine():
             or None
         )
 
-        url = URL.create(
-            drivername="postgresql+asyncpg",
-            username=username,
-            password="",  # Will be set by event handler
+        engine = _create_engine(
             host=database_instance.read_write_dns,
-            port=int(os.getenv("DATABRICKS_DATABASE_PORT", "5432")),
-            database=database_name,
-        )
-
-        engine = create_async_engine(
-            url,
-            pool_pre_ping=False,
-            echo=False,
+            username=username,
+            database_name=database_name,
+            application_name="fastapi_orders_app",
+            pool_name="primary",
             pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
             max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
-            pool_timeout=int(os.getenv("DB_POOL_TIMEOUT", "30")),
-            # OPTIONAL: Recycle connections every hour (before token expires)
-            pool_recycle=int(os.getenv("DB_POOL_RECYCLE_INTERVAL", "3600")),
-            connect_args={
-                "command_timeout": int(os.getenv("DB_COMMAND_TIMEOUT", "10")),
-                "server_settings": {
-                    "application_name": "fastapi_orders_app",
-                },
-                "ssl": "require",
-            },
         )
-
-        # Register token provider for new connections
-        @event.listens_for(engine.sync_engine, "do_connect")
-        def provide_token(dialect, conn_rec, cargs, cparams):
-            global postgres_password
-            # Use current token from background refresh
-            cparams["password"] = postgres_password
-
         AsyncSessionLocal = sessionmaker(
             bind=engine, class_=AsyncSession, expire_on_commit=False
         )
+
+        read_replica_enabled = (
+            os.getenv("DB_READ_REPLICA_ENABLED", "true").lower() == "true"
+        )
+        if read_replica_enabled and database_instance.read_only_dns:
+            read_engine = _create_engine(
+                host=database_instance.read_only_dns,
+                username=username,
+                database_name=database_name,
+                application_name="fastapi_orders_app_read",
+                pool_name="read",
+                pool_size=int(os.getenv("DB_READ_POOL_SIZE", "5")),
+                max_overflow=int(os.getenv("DB_READ_MAX_OVERFLOW", "10")),
+            )
+
+            # Stop routing reads to the replica as soon as it drops connections
+            event.listen(read_engine.sync_engine, "handle_error", mark_replica_unhealthy)
+            AsyncReadSessionLocal = sessionmaker(
+                bind=read_engine, class_=AsyncSession, expire_on_commit=False
+            )
+            logger.info(
+                f"Read replica engine initialized for {database_instance.read_only_dns}"
+            )
+
         logger.info(
             f"Database engine initialized for {database_name} with background token refresh"
         )
@@ -133,23 +171,15 @@ def init_engine():
 
 
 async def start_token_refresh():
-    """Start the background token refresh task"""
-    global token_refresh_task
-    if token_refresh_task is None or token_refresh_task.done():
-        token_refresh_task = asyncio.create_task(refresh_token_background())
-        logger.info("Background token refresh task started")
+    """Start the background token rotation"""
+    if credentials is not None:
+        await credentials.start()
 
 
 async def stop_token_refresh():
-    """Stop the background token refresh task"""
-    global token_refresh_task
-    if token_refresh_task and not token_refresh_task.done():
-        token_refresh_task.cancel()
-        try:
-            await token_refresh_task
-        except asyncio.CancelledError:
-            pass
-        logger.info("Background token refresh task stopped")
+    """Stop the background token rotation"""
+    if credentials is not None:
+        await credentials.stop()
 
 
 async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
@@ -160,6 +190,28 @@ async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+def get_read_sessionmaker() -> sessionmaker:
+    """Get the session factory for read-only work, preferring a healthy read replica"""
+    if AsyncReadSessionLocal is not None and read_replica_healthy:
+        return AsyncReadSessionLocal
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Engine not initialized; call init_engine() first")
+    return AsyncSessionLocal
+
+
+def get_read_engine() -> AsyncEngine | None:
+    """Get the engine for read-only work, preferring a healthy read replica"""
+    if read_engine is not None and read_replica_healthy:
+        return read_engine
+    return engine
+
+
+async def get_async_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Get a read-only database session, falling back to the primary when the replica is unhealthy"""
+    async with get_read_sessionmaker()() as session:
+        yield session
+
+
 def check_database_exists() -> bool:
     """Check if the Lakebase database instance exists"""
     try:
@@ -196,3 +248,142 @@ async def database_health() -> bool:
     except Exception as e:
         logger.error("Database health check failed: %s", e)
         return False
+
+
+async def read_replica_health() -> bool:
+    """Check the read replica and update whether reads are routed to it"""
+    global read_replica_healthy
+
+    if read_engine is None:
+        return False
+
+    try:
+        async with read_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+        if not read_replica_healthy:
+            logger.info("Read replica is healthy; routing reads to the replica")
+        read_replica_healthy = True
+    except Exception as e:
+        if read_replica_healthy:
+            logger.warning(f"Read replica health check failed, using primary: {e}")
+        read_replica_healthy = False
+    return read_replica_healthy
+
+
+async def monitor_read_replica(interval: int):
+    """Background task re-checking the read replica so reads return to it after an outage"""
+    while True:
+        await read_replica_health()
+        await asyncio.sleep(interval)
+
+
+async def start_read_replica_monitor():
+    """Start the read replica health monitor if a replica is configured"""
+    global read_replica_monitor_task
+    if read_engine is None:
+        return
+    if read_replica_monitor_task is None or read_replica_monitor_task.done():
+        read_replica_monitor_task = asyncio.create_task(
+            monitor_read_replica(int(os.getenv("DB_READ_REPLICA_HEALTH_INTERVAL", "30")))
+        )
+        logger.info("Read replica health monitor started")
+
+
+async def stop_read_replica_monitor():
+    """Stop the read replica health monitor"""
+    global read_replica_monitor_task
+    if read_replica_monitor_task and not read_replica_monitor_task.done():
+        read_replica_monitor_task.cancel()
+        try:
+            await read_replica_monitor_task
+        except asyncio.CancelledError:
+            pass
+        logger.info("Read replica health monitor stopped")
+
+
+async def warm_pool(target: AsyncEngine, size: int, query: str) -> int:
+    """
+    Open `size` pooled connections concurrently and run a warm-up query on each.
+
+    The connections are held until all of them are open, so that the pool
+    opens that many distinct connections, and then returned to the pool.
+
+    Args:
+        target: The engine whose pool is warmed
+        size: Number of connections to open
+        query: Query run on every connection
+
+    Returns:
+        The number of connections opened
+    """
+    all_open = asyncio.Event()
+    opened = 0
+
+    async def hold():
+        nonlocal opened
+        try:
+            async with target.connect() as connection:
+                await connection.execute(text(query))
+                opened += 1
+                if opened == size:
+                    all_open.set()
+                await all_open.wait()
+        finally:
+            # A failed connection must not keep the others waiting
+            all_open.set()
+
+    await asyncio.gather(*(hold() for _ in range(size)))
+    return opened
+
+
+async def warm_pools(retry_interval: float = 5.0):
+    """Warm the primary and read replica pools, retrying until both succeed"""
+    global pools_warm
+
+    query = os.getenv("DB_POOL_WARMUP_QUERY", "SELECT 1")
+    pools = {"primary": engine, "read": read_engine}
+    while True:
+        started = time.perf_counter()
+        try:
+            for name, target in pools.items():
+                if target is not None and name not in warmed_connections:
+                    warmed_connections[name] = await warm_pool(
+                        target, target.pool.size(), query
+                    )
+            pools_warm = True
+            logger.info(
+                f"Connection pools warmed in {(time.perf_counter() - started) * 1000:.0f}ms: "
+                f"{warmed_connections}"
+            )
+            return
+        except Exception as e:
+            logger.error(f"Connection pool warm-up failed, retrying in {retry_interval}s: {e}")
+            await asyncio.sleep(retry_interval)
+
+
+async def start_pool_warmup():
+    """Warm the connection pools in the background, or mark them warm if disabled"""
+    global pool_warmup_task, pools_warm
+    if os.getenv("DB_POOL_WARMUP_ENABLED", "true").lower() != "true":
+        pools_warm = True
+        return
+    if pool_warmup_task is None or pool_warmup_task.done():
+        pool_warmup_task = asyncio.create_task(warm_pools())
+        logger.info("Connection pool warm-up started")
+
+
+async def stop_pool_warmup():
+    """Stop warming the connection pools"""
+    global pool_warmup_task
+    if pool_warmup_task and not pool_warmup_task.done():
+        pool_warmup_task.cancel()
+        try:
+            await pool_warmup_task
+        except asyncio.CancelledError:
+            pass
+
+
+def database_ready() -> bool:
+    """Whether requests can be served without waiting for cold connections"""
+    # Without a database there are no pools to warm
+    return engine is None or pools_warm
@@ -1,9 +1,13 @@
-from datetime import date
+from datetime import date, datetime
 from decimal import Decimal
 from typing import Optional
 
+from sqlalchemy import MetaData
 from sqlmodel import Field, SQLModel
 
+# Tables created by their service when it is enabled, not by create_all at startup
+optional_metadata = MetaData()
+
 
 class OrderBase(SQLModel):
     o_custkey: int
@@ -18,20 +22,44 @@ class OrderBase(SQLModel):
 
 class Order(OrderBase, table=True):
     __tablename__ = "orders_synced"
-    __table_args__ = "public"
+    __table_args__ = {"schema": "public"}
     o_orderkey: Optional[int] = Field(default=None, primary_key=True)
 
 
+class OrderDailySummary(SQLModel, table=True):
+    metadata = optional_metadata
+    __tablename__ = "orders_daily_summary"
+    __table_args__ = {"schema": "public"}
+    o_orderdate: date = Field(primary_key=True)
+    o_orderstatus: str = Field(primary_key=True)
+    o_orderpriority: str = Field(primary_key=True)
+    order_count: int = Field(default=0)
+    total_price: Decimal = Field(default=0, max_digits=20, decimal_places=2)
+
+
 class OrderRead(OrderBase):
     o_orderkey: int
 
 
 class OrderCount(SQLModel):
     total_orders: int
+    count_mode: str = "exact"
+    as_of: datetime | None = None
 
 
 class OrderSample(SQLModel):
     sample_order_keys: list[int]
+    method: str | None = None
+    seed: int | None = None
+
+
+class OrderBatchRequest(SQLModel):
+    order_keys: list[int]
+
+
+class OrderBatchResponse(SQLModel):
+    orders: list[OrderRead]
+    missing_keys: list[int]
 
 
 class OrderStatusUpdate(SQLModel):
@@ -44,6 +72,28 @@ class OrderStatusUpdateResponse(SQLModel):
     message: str
 
 
+class OrderStatusBulkItem(SQLModel):
+    o_orderkey: int
+    o_orderstatus: str
+
+
+class OrderStatusBulkUpdate(SQLModel):
+    updates: list[OrderStatusBulkItem]
+
+
+class OrderStatusBulkResult(SQLModel):
+    o_orderkey: int
+    o_orderstatus: str
+    updated: bool
+
+
+class OrderStatusBulkUpdateResponse(SQLModel):
+    results: list[OrderStatusBulkResult]
+    updated_count: int
+    missing_count: int
+    message: str
+
+
 class OrderListResponse(SQLModel):
     orders: list[OrderRead]
     pagination: "PaginationInfo"
@@ -56,18 +106,85 @@ class PaginationInfo(SQLModel):
     total_count: int
     has_next: bool
     has_previous: bool
-    next_cursor: int | None = None
-    previous_cursor: int | None = None
+    next_cursor: str | None = None
+    previous_cursor: str | None = None
+    count_mode: str | None = None
+    count_as_of: datetime | None = None
 
 
 class CursorPaginationInfo(SQLModel):
     page_size: int
     has_next: bool
     has_previous: bool
-    next_cursor: int | None = None
-    previous_cursor: int | None = None
+    next_cursor: str | None = None
+    previous_cursor: str | None = None
+
+
+class PageIndexStatus(SQLModel):
+    ready: bool
+    building: bool
+    stride: int
+    boundary_count: int
+    built_at: datetime | None = None
+
+
+class OrderCacheStats(SQLModel):
+    hits: int
+    misses: int
+    coalesced: int
+    evictions: int
+    expirations: int
+    invalidations: int
+    entries: int
+    size_bytes: int
+    max_entries: int
+    max_bytes: int
+    ttl_seconds: float
 
 
 class OrderListCursorResponse(SQLModel):
     orders: list[OrderRead]
     pagination: CursorPaginationInfo
+
+
+class OrderChangesResponse(SQLModel):
+    orders: list[OrderRead]
+    sync_token: str
+    has_more: bool
+
+
+class OrderSearchResult(OrderRead):
+    rank: float
+
+
+class OrderSearchResponse(SQLModel):
+    results: list[OrderSearchResult]
+    pagination: CursorPaginationInfo
+
+
+class OrderSummaryRow(SQLModel):
+    period: date | None = None
+    o_orderstatus: str | None = None
+    o_orderpriority: str | None = None
+    order_count: int
+    total_price: Decimal
+
+
+class OrderSummaryResponse(SQLModel):
+    rows: list[OrderSummaryRow]
+    group_by: list[str]
+    period: str | None = None
+
+
+class OrderTimeSeriesPoint(SQLModel):
+    bucket_start: date
+    bucket_end: date
+    order_count: int
+    total_price: Decimal
+
+
+class OrderTimeSeriesResponse(SQLModel):
+    start_date: date | None = None
+    end_date: date | None = None
+    bucket: str | None = None
+    points: list[OrderTimeSeriesPoint]
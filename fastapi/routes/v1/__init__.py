@@ -5,6 +5,7 @@ from fastapi import APIRouter
 
 from .healthcheck import router as healthcheck_router
 from .lakebase import router as lakebase_router
+from .metrics import router as metrics_router
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +17,7 @@ def create_router(database_exists: bool = False) -> APIRouter:
     # Always include these endpoints
     router.include_router(healthcheck_router)
     router.include_router(lakebase_router)
+    router.include_router(metrics_router)
     
     # Conditionally include database-dependent endpoints
     if database_exists:
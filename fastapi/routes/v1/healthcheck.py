@@ -3,7 +3,10 @@
 from datetime import datetime, timezone
 from typing import Dict
 
+from config import database
+
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 
 router = APIRouter()
 
@@ -12,3 +15,23 @@ router = APIRouter()
 async def healthcheck() -> Dict[str, str]:
     """Return the API status."""
     return {"status": "OK", "timestamp": datetime.now(timezone.utc).isoformat()}
+
+
+@router.get("/readiness")
+async def readiness() -> JSONResponse:
+    """
+    Report whether the app is ready to serve traffic.
+
+    Returns 503 until the database connection pools have been pre-opened at
+    startup, so that load balancers and rolling deploys only send requests
+    to instances without cold connections.
+    """
+    ready = database.database_ready()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "READY" if ready else "WARMING",
+            "pools": database.warmed_connections,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        },
+    )
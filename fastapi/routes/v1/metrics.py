@@ -0,0 +1,19 @@
+"""Prometheus metrics endpoint for the V1 API."""
+
+from services.monitoring.metrics import render_metrics
+
+from fastapi import APIRouter, Response
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """
+    Expose application metrics in the Prometheus text format.
+
+    Covers request latency per route, connection pool usage and checkout
+    waits, SQL statement execution times and SQL warehouse call times.
+    """
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
@@ -1,65 +1,211 @@
+import asyncio
 import logging
+import os
+from datetime import date, datetime, timezone
 
-from config.database import get_async_db
+from config.database import get_async_db, get_async_read_db, get_read_engine
 from models.orders import (
     CursorPaginationInfo,
     Order,
+    OrderBatchRequest,
+    OrderBatchResponse,
+    OrderCacheStats,
+    OrderChangesResponse,
     OrderCount,
     OrderListCursorResponse,
     OrderListResponse,
     OrderRead,
     OrderSample,
+    OrderSearchResponse,
+    OrderSearchResult,
+    OrderStatusBulkResult,
+    OrderStatusBulkUpdate,
+    OrderStatusBulkUpdateResponse,
     OrderStatusUpdate,
     OrderStatusUpdateResponse,
+    OrderSummaryResponse,
+    OrderSummaryRow,
+    OrderTimeSeriesPoint,
+    OrderTimeSeriesResponse,
+    PageIndexStatus,
     PaginationInfo,
 )
-from sqlalchemy import func, select
+from services.orders.cursors import (
+    BACKWARD,
+    FORWARD,
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+)
+from services.orders.cache import order_cache
+from services.orders.change_feed import order_change_feed
+from services.orders.changes import (
+    CHANGE_TRACKING_ENABLED,
+    InvalidSyncTokenError,
+    SyncToken,
+    current_horizon,
+    decode_sync_token,
+    encode_sync_token,
+    fetch_changes,
+)
+from services.orders.columnar import (
+    COLUMNAR_RESPONSES,
+    columnar_response,
+    negotiate_format,
+)
+from services.orders.counts import CountMode, order_counts
+from services.orders.export import (
+    MEDIA_TYPES,
+    ExportFormat,
+    build_export_query,
+    encode_rows,
+    open_export,
+)
+from services.orders.keyset import (
+    InvalidStreamQueryError,
+    StreamFilters,
+    StreamSort,
+    build_stream_query,
+    cursor_values,
+    parse_cursor_values,
+    validate_stream_query,
+)
+from services.orders.page_index import page_index
+from services.orders.sampling import SampleMethod, sample_order_keys
+from services.orders.search import (
+    MIN_SEARCH_LENGTH,
+    SEARCH_TIMEOUT_MS,
+    build_search_query,
+    is_search_unavailable,
+    is_statement_timeout,
+    set_statement_timeout,
+)
+from services.orders.serialization import FAST_JSON_ENABLED, order_list_response
+from services.orders.status_updates import (
+    apply_bulk_status_updates,
+    apply_status_update,
+)
+from services.orders.summary import (
+    SUMMARY_ENABLED,
+    SummaryDimension,
+    SummaryPeriod,
+    build_summary_query,
+)
+from services.orders.timeseries import (
+    MAX_POINTS,
+    InvalidTimeSeriesQueryError,
+    choose_bucket_width,
+    order_date_range,
+    order_time_series,
+)
+from services.orders.write_behind import status_write_behind
+from sqlalchemy import BigInteger, any_, bindparam, select
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(tags=["orders"])
+router = APIRouter(prefix="/orders", tags=["orders"])
+
+BATCH_MAX_KEYS = int(os.getenv("ORDERS_BATCH_MAX_KEYS", "1000"))
+BULK_UPDATE_MAX_ITEMS = int(os.getenv("ORDERS_BULK_UPDATE_MAX_ITEMS", "50000"))
+WRITE_BEHIND_WAIT_TIMEOUT = (
+    float(os.getenv("ORDERS_WRITE_BEHIND_WAIT_TIMEOUT_MS", "10000")) / 1000
+)
+
+
+def _order_read(row) -> OrderRead:
+    return OrderRead(
+        o_orderkey=row.o_orderkey,
+        o_custkey=row.o_custkey,
+        o_orderstatus=row.o_orderstatus,
+        o_totalprice=row.o_totalprice,
+        o_orderdate=row.o_orderdate,
+        o_orderpriority=row.o_orderpriority,
+        o_clerk=row.o_clerk,
+        o_shippriority=row.o_shippriority,
+        o_comment=row.o_comment,
+    )
 
 
 @router.get("/count", response_model=OrderCount, summary="Get total order count")
-async def get_order_count(db: AsyncSession = Depends(get_async_db)):
+async def get_order_count(
+    count_mode: CountMode = Query(
+        CountMode.EXACT,
+        description="exact (cached for a TTL), approximate (planner statistics) or background",
+    ),
+    max_age: float | None = Query(
+        None,
+        ge=0,
+        description="Oldest acceptable cached exact count in seconds (0 forces a fresh count)",
+    ),
+    db: AsyncSession = Depends(get_async_read_db),
+):
     """
     Get the total number of orders in the database.
 
+    Args:
+        count_mode: How the count should be obtained
+        max_age: Oldest acceptable cached exact count in seconds
+        db: Database session
+
     Returns:
-        OrderCount: The total count of orders in the database
+        OrderCount: The total count of orders, the mode used and when it was taken
 
     Raises:
         HTTPException: If the query fails
     """
     try:
-        stmt = select(func.count(Order.o_orderkey))
-        result = await db.execute(stmt)
-        count = result.scalar()
-        return OrderCount(total_orders=count)
+        count = await order_counts.get(db, mode=count_mode, max_age=max_age)
+        return OrderCount(
+            total_orders=count.value,
+            count_mode=count.mode.value,
+            as_of=datetime.fromtimestamp(count.as_of, tz=timezone.utc),
+        )
     except Exception as e:
         logger.error(f"Error getting order count: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve order count")
 
 
-@router.get("/sample", response_model=OrderSample, summary="Get 5 random order keys")
-async def get_sample_orders(db: AsyncSession = Depends(get_async_db)):
+@router.get("/sample", response_model=OrderSample, summary="Get random order keys")
+async def get_sample_orders(
+    size: int = Query(5, ge=1, le=10000, description="Number of order keys to return"),
+    method: SampleMethod = Query(
+        SampleMethod.KEYRANGE, description="Sampling method: keyrange, system or bernoulli"
+    ),
+    seed: int | None = Query(None, description="Seed for a repeatable sample"),
+    db: AsyncSession = Depends(get_async_read_db),
+):
     """
-    Get 5 sample order keys for testing and development purposes.
+    Get a random sample of order keys for testing and benchmarking.
+
+    Args:
+        size: Number of order keys to return
+        method: Sampling method (keyrange, system or bernoulli)
+        seed: Seed for a repeatable sample
+        db: Database session
 
     Returns:
-        OrderSample: A list of 5 order keys from the database
+        OrderSample: Distinct order keys in random order
 
     Raises:
         HTTPException: If the query fails
+
+    Usage:
+        - `/orders/sample` (5 keys)
+        - `/orders/sample?size=1000&seed=42` (repeatable key set for a load test)
+        - `/orders/sample?size=1000&method=bernoulli` (uniform, reads the whole table)
+
+    keyrange probes the primary key index once per key and system reads a
+    few random pages, so both cost the same on any table size; bernoulli
+    scans the table.
     """
     try:
-        stmt = select(Order.o_orderkey).limit(5)
-        result = await db.execute(stmt)
-        order_keys = result.scalars().all()
-        return OrderSample(sample_order_keys=order_keys)
+        order_keys = await sample_order_keys(db, size, method, seed)
+        return OrderSample(sample_order_keys=order_keys, method=method.value, seed=seed)
     except Exception as e:
         logger.error(f"Error getting sample orders: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve sample orders")
@@ -68,6 +214,7 @@ async def get_sample_orders(db: AsyncSession = Depends(get_async_db)):
 @router.get(
     "/pages",
     response_model=OrderListResponse,
+    responses=COLUMNAR_RESPONSES,
     summary="Get orders with page-based pagination",
 )
 async def get_orders_by_page(
@@ -78,7 +225,22 @@ async def get_orders_by_page(
     include_count: bool = Query(
         True, description="Include total count for pagination info"
     ),
-    db: AsyncSession = Depends(get_async_db),
+    count_mode: CountMode = Query(
+        CountMode.EXACT,
+        description="exact (cached for a TTL), approximate (planner statistics) or background",
+    ),
+    count_max_age: float | None = Query(
+        None,
+        ge=0,
+        description="Oldest acceptable cached exact count in seconds (0 forces a fresh count)",
+    ),
+    accept: str | None = Header(
+        None,
+        description=(
+            "application/vnd.apache.arrow.stream or application/parquet for columnar output"
+        ),
+    ),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     """
     Get orders using traditional page-based pagination.
@@ -87,10 +249,14 @@ async def get_orders_by_page(
         page: Page number (1-based)
         page_size: Number of records per page (max 1000)
         include_count: Include total count for pagination info
+        count_mode: How the total count should be obtained
+        count_max_age: Oldest acceptable cached exact count in seconds
+        accept: Accept header selecting a columnar response format
         db: Database session
 
     Returns:
-        OrderListResponse: Orders with pagination information
+        OrderListResponse: Orders with pagination information, or an Arrow
+        IPC stream / Parquet file with pagination in `X-Pagination`
 
     Raises:
         HTTPException: If the query fails
@@ -103,34 +269,44 @@ async def get_orders_by_page(
     Usage:
         - `/orders/pages?page=1&page_size=100`
         - `/orders/pages?page=5&page_size=50&include_count=false`
+        - `/orders/pages?page=5&page_size=50&count_mode=approximate`
+        - `Accept: application/vnd.apache.arrow.stream` or `Accept: application/parquet`
+          for DataFrame consumers
+
+    Once the background page index is built, the page number is translated
+    into a boundary `o_orderkey` and the query seeks to it, so deep pages
+    cost about the same as the first one.
     """
     try:
+        count = None
         if include_count:
-            count_stmt = select(func.count(Order.o_orderkey))
-            count_result = await db.execute(count_stmt)
-            total_count = count_result.scalar()
+            count = await order_counts.get(db, mode=count_mode, max_age=count_max_age)
+            total_count = count.value
             total_pages = (total_count + page_size - 1) // page_size
         else:
             total_count = -1
             total_pages = -1
 
         offset = (page - 1) * page_size
-        stmt = (
-            select(
-                Order.o_orderkey,
-                Order.o_custkey,
-                Order.o_orderstatus,
-                Order.o_totalprice,
-                Order.o_orderdate,
-                Order.o_orderpriority,
-                Order.o_clerk,
-                Order.o_shippriority,
-                Order.o_comment,
-            )
-            .order_by(Order.o_orderkey)
-            .offset(offset)
-            .limit(page_size + 1)  # Get one extra to check has_next
-        )
+        stmt = select(
+            Order.o_orderkey,
+            Order.o_custkey,
+            Order.o_orderstatus,
+            Order.o_totalprice,
+            Order.o_orderdate,
+            Order.o_orderpriority,
+            Order.o_clerk,
+            Order.o_shippriority,
+            Order.o_comment,
+        ).order_by(Order.o_orderkey)
+
+        # Seek to the closest indexed boundary so OFFSET stays below one stride
+        seek = page_index.seek(offset)
+        if seek is not None:
+            boundary_key, offset = seek
+            stmt = stmt.where(Order.o_orderkey >= boundary_key)
+
+        stmt = stmt.offset(offset).limit(page_size + 1)  # Get one extra to check has_next
 
         result = await db.execute(stmt)
         all_orders = result.all()
@@ -139,24 +315,15 @@ async def get_orders_by_page(
         orders_data = all_orders[:page_size]
         has_previous = page > 1
 
-        orders = [
-            OrderRead(
-                o_orderkey=row[0],
-                o_custkey=row[1],
-                o_orderstatus=row[2],
-                o_totalprice=row[3],
-                o_orderdate=row[4],
-                o_orderpriority=row[5],
-                o_clerk=row[6],
-                o_shippriority=row[7],
-                o_comment=row[8],
-            )
-            for row in orders_data
-        ]
-
-        next_cursor = orders[-1].o_orderkey if orders and has_next else None
+        next_cursor = (
+            encode_cursor(FORWARD, [orders_data[-1].o_orderkey])
+            if orders_data and has_next
+            else None
+        )
         previous_cursor = (
-            orders[0].o_orderkey - page_size if orders and has_previous else None
+            encode_cursor(BACKWARD, [orders_data[0].o_orderkey])
+            if orders_data and has_previous
+            else None
         )
 
         pagination_info = PaginationInfo(
@@ -167,10 +334,21 @@ async def get_orders_by_page(
             has_next=has_next,
             has_previous=has_previous,
             next_cursor=next_cursor,
-            previous_cursor=max(0, previous_cursor) if previous_cursor else None,
+            previous_cursor=previous_cursor,
+            count_mode=count.mode.value if count else None,
+            count_as_of=(
+                datetime.fromtimestamp(count.as_of, tz=timezone.utc) if count else None
+            ),
         )
 
-        return OrderListResponse(orders=orders, pagination=pagination_info)
+        columnar_format = negotiate_format(accept)
+        if columnar_format is not None:
+            return columnar_response(orders_data, pagination_info, columnar_format)
+        if FAST_JSON_ENABLED:
+            return order_list_response(orders_data, pagination_info)
+        return OrderListResponse(
+            orders=[_order_read(row) for row in orders_data], pagination=pagination_info
+        )
 
     except Exception as e:
         logger.error(f"Error getting page-based orders: {e}")
@@ -180,30 +358,59 @@ async def get_orders_by_page(
 @router.get(
     "/stream",
     response_model=OrderListCursorResponse,
+    responses=COLUMNAR_RESPONSES,
     summary="Get orders with cursor-based pagination",
 )
 async def get_orders_by_cursor(
-    cursor: int = Query(
-        0, ge=0, description="Start after this order key (0 for beginning)"
+    cursor: str | None = Query(
+        None,
+        description="Opaque cursor from a previous response (omit for the first page)",
     ),
     page_size: int = Query(
         100, ge=1, le=1000, description="Number of records to fetch (max 1000)"
     ),
-    db: AsyncSession = Depends(get_async_db),
+    sort: StreamSort = Query(
+        StreamSort.ORDERKEY, description="Sort by orderkey or by (orderdate, orderkey)"
+    ),
+    order_status: str | None = Query(
+        None, alias="status", description="Only return orders with this status"
+    ),
+    custkey: int | None = Query(None, description="Only return orders of this customer"),
+    start_date: date | None = Query(
+        None, description="Earliest order date to include (requires sort=orderdate)"
+    ),
+    end_date: date | None = Query(
+        None, description="Latest order date to include (requires sort=orderdate)"
+    ),
+    accept: str | None = Header(
+        None,
+        description=(
+            "application/vnd.apache.arrow.stream or application/parquet for columnar output"
+        ),
+    ),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     """
-    Get orders using efficient cursor-based pagination.
+    Get orders using efficient keyset (cursor-based) pagination.
 
     Args:
-        cursor: Start after this order key (0 for beginning)
+        cursor: Opaque cursor from a previous response (omit for the first page)
         page_size: Number of records to fetch (max 1000)
+        sort: Sort by orderkey or by (orderdate, orderkey)
+        order_status: Only return orders with this status
+        custkey: Only return orders of this customer
+        start_date: Earliest order date to include
+        end_date: Latest order date to include
+        accept: Accept header selecting a columnar response format
         db: Database session
 
     Returns:
-        OrderListCursorResponse: Orders with cursor pagination information
+        OrderListCursorResponse: Orders with cursor pagination information, or
+        an Arrow IPC stream / Parquet file with pagination in `X-Pagination`
 
     Raises:
-        HTTPException: If the query fails
+        HTTPException: 400 for a malformed cursor or an unsupported filter
+            combination, 500 if the query fails
 
     Best for:
         - Large datasets (millions of records)
@@ -212,52 +419,68 @@ async def get_orders_by_cursor(
         - Real-time data feeds
 
     Usage:
-        - First page: `/orders/stream?cursor=0&page_size=100`
-        - Next page: `/orders/stream?cursor=100&page_size=100`
+        - First page: `/orders/stream?page_size=100`
+        - Next page: `/orders/stream?cursor=<pagination.next_cursor>&page_size=100`
+        - Previous page: `/orders/stream?cursor=<pagination.previous_cursor>&page_size=100`
         - Jump to key: `/orders/stream?cursor=12345&page_size=100` (shows records after key 12345)
+        - Filtered: `/orders/stream?status=O&custkey=370`
+        - By date: `/orders/stream?sort=orderdate&start_date=1995-01-01&end_date=1995-03-31`
+        - `Accept: application/vnd.apache.arrow.stream` or `Accept: application/parquet`
+          for DataFrame consumers
+
+    Every page is fetched with a seek on the sort key
+    (`WHERE (o_orderdate, o_orderkey) > (:date, :key) ORDER BY o_orderdate, o_orderkey`
+    going forward and the reverse going backward). The equality filters and
+    the sort key lead one of the managed indexes, so every supported
+    combination is an index range scan and the cost depends on page_size
+    only, not on the position in the table. Pass the same filters and sort
+    with every cursor of a stream.
     """
+    filters = StreamFilters(
+        status=order_status, custkey=custkey, start_date=start_date, end_date=end_date
+    )
     try:
-        stmt = (
-            select(
-                Order.o_orderkey,
-                Order.o_custkey,
-                Order.o_orderstatus,
-                Order.o_totalprice,
-                Order.o_orderdate,
-                Order.o_orderpriority,
-                Order.o_clerk,
-                Order.o_shippriority,
-                Order.o_comment,
-            )
-            .where(Order.o_orderkey > cursor)
-            .order_by(Order.o_orderkey)
-            .limit(page_size + 1)  # Get one extra to check has_next
-        )
+        try:
+            validate_stream_query(sort, filters)
+        except InvalidStreamQueryError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        try:
+            position = decode_cursor(cursor) if cursor else None
+            boundary = parse_cursor_values(sort, position.values) if position else None
+        except (InvalidCursorError, InvalidStreamQueryError):
+            raise HTTPException(status_code=400, detail="Invalid cursor provided")
+
+        is_backward = position is not None and position.is_backward
+
+        # Get one extra to check for more rows
+        stmt = build_stream_query(sort, filters, boundary, is_backward, page_size + 1)
 
         result = await db.execute(stmt)
         all_orders = result.all()
 
-        has_next = len(all_orders) > page_size
+        has_more = len(all_orders) > page_size
         orders_data = all_orders[:page_size]
-        has_previous = cursor > 0
-
-        orders = [
-            OrderRead(
-                o_orderkey=row[0],
-                o_custkey=row[1],
-                o_orderstatus=row[2],
-                o_totalprice=row[3],
-                o_orderdate=row[4],
-                o_orderpriority=row[5],
-                o_clerk=row[6],
-                o_shippriority=row[7],
-                o_comment=row[8],
-            )
-            for row in orders_data
-        ]
+        if is_backward:
+            # Rows were read in descending order; restore ascending order
+            orders_data = list(reversed(orders_data))
+            has_next = True
+            has_previous = has_more
+        else:
+            has_next = has_more
+            # Starting after order key 0 is the same as starting at the first page
+            has_previous = boundary is not None and boundary != [0]
 
-        next_cursor = orders[-1].o_orderkey if orders and has_next else None
-        previous_cursor = max(0, cursor - page_size) if has_previous else None
+        next_cursor = (
+            encode_cursor(FORWARD, cursor_values(orders_data[-1], sort))
+            if orders_data and has_next
+            else None
+        )
+        previous_cursor = (
+            encode_cursor(BACKWARD, cursor_values(orders_data[0], sort))
+            if orders_data and has_previous
+            else None
+        )
 
         pagination_info = CursorPaginationInfo(
             page_size=page_size,
@@ -267,18 +490,581 @@ async def get_orders_by_cursor(
             previous_cursor=previous_cursor,
         )
 
-        return OrderListCursorResponse(orders=orders, pagination=pagination_info)
+        columnar_format = negotiate_format(accept)
+        if columnar_format is not None:
+            return columnar_response(orders_data, pagination_info, columnar_format)
+        if FAST_JSON_ENABLED:
+            return order_list_response(orders_data, pagination_info)
+        return OrderListCursorResponse(
+            orders=[_order_read(row) for row in orders_data], pagination=pagination_info
+        )
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting cursor-based orders: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve orders")
 
 
+@router.get("/export", summary="Export orders as NDJSON or CSV")
+async def export_orders(
+    export_format: ExportFormat = Query(
+        ExportFormat.NDJSON, alias="format", description="Output format: ndjson or csv"
+    ),
+    min_key: int | None = Query(None, ge=0, description="Smallest order key to include"),
+    max_key: int | None = Query(None, ge=0, description="Largest order key to include"),
+    start_date: date | None = Query(None, description="Earliest order date to include"),
+    end_date: date | None = Query(None, description="Latest order date to include"),
+    limit: int | None = Query(None, ge=1, description="Maximum number of rows to export"),
+    batch_size: int = Query(
+        5000, ge=100, le=50000, description="Rows fetched from the database at a time"
+    ),
+):
+    """
+    Stream a slice of the orders table in a single response.
+
+    Args:
+        export_format: Output format (ndjson or csv)
+        min_key: Smallest order key to include
+        max_key: Largest order key to include
+        start_date: Earliest order date to include
+        end_date: Latest order date to include
+        limit: Maximum number of rows to export
+        batch_size: Rows fetched from the database at a time
+
+    Returns:
+        StreamingResponse: Orders ordered by key, one batch written at a time
+
+    Raises:
+        HTTPException: 503 if the database is not initialized, 500 if the query fails
+
+    Best for:
+        - Downstream jobs pulling millions of rows
+        - Bulk extracts without paging through `/orders/stream`
+
+    Usage:
+        - `/orders/export?format=ndjson`
+        - `/orders/export?format=csv&start_date=1995-01-01&end_date=1995-12-31`
+        - `/orders/export?min_key=1000000&max_key=2000000`
+
+    Rows are read through a server-side cursor, so memory use stays constant
+    and a slow client slows down the database reads instead of buffering.
+    """
+    export_engine = get_read_engine()
+    if export_engine is None:
+        raise HTTPException(status_code=503, detail="Database engine not initialized")
+
+    stmt = build_export_query(
+        min_key=min_key,
+        max_key=max_key,
+        start_date=start_date,
+        end_date=end_date,
+        limit=limit,
+    )
+
+    # The connection outlives this handler and is closed when the stream ends
+    conn = None
+    try:
+        conn = await export_engine.connect()
+        result = await open_export(conn, stmt, batch_size)
+    except Exception as e:
+        if conn is not None:
+            await conn.close()
+        logger.error(f"Error starting orders export: {e}")
+        raise HTTPException(status_code=500, detail="Failed to export orders")
+
+    return StreamingResponse(
+        encode_rows(conn, result, export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="orders.{export_format.value}"'
+        },
+    )
+
+
+@router.get(
+    "/search",
+    response_model=OrderSearchResponse,
+    summary="Search orders by a fragment of their comment",
+)
+async def search_orders(
+    q: str = Query(
+        ...,
+        min_length=MIN_SEARCH_LENGTH,
+        max_length=200,
+        description="Text to find in order comments",
+    ),
+    cursor: str | None = Query(
+        None, description="Opaque cursor from a previous response (omit for the first page)"
+    ),
+    page_size: int = Query(
+        20, ge=1, le=200, description="Number of results to fetch (max 200)"
+    ),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """
+    Find orders whose comment contains a text, best matches first.
+
+    Args:
+        q: Text to find in order comments (case-insensitive, at least 3 characters)
+        cursor: Opaque cursor from a previous response (omit for the first page)
+        page_size: Number of results to fetch (max 200)
+        db: Database session
+
+    Returns:
+        OrderSearchResponse: Matching orders with their rank and a cursor to the next page
+
+    Raises:
+        HTTPException: 400 for a malformed cursor, 503 if pg_trgm is not
+            installed, 504 if the search exceeds ORDERS_SEARCH_TIMEOUT_MS,
+            500 if the query fails
+
+    Best for:
+        - Support staff looking up orders by what was written in the comment
+
+    Usage:
+        - `/orders/search?q=special requests`
+        - Next page: `/orders/search?q=special requests&cursor=<pagination.next_cursor>`
+
+    Candidates are found through the trigram index on `o_comment` and ranked
+    by `word_similarity`, ties broken by order key. A search text that
+    matches a large part of the table is cut off by the statement timeout;
+    narrow it down and retry.
+    """
+    try:
+        try:
+            position = decode_cursor(cursor) if cursor else None
+            after = (
+                [float(position.values[0]), int(position.values[1])] if position else None
+            )
+        except (InvalidCursorError, IndexError, TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor provided")
+
+        await set_statement_timeout(db, SEARCH_TIMEOUT_MS)
+        result = await db.execute(build_search_query(q, after, page_size + 1))
+        rows = result.all()
+
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        next_cursor = (
+            encode_cursor(FORWARD, [rows[-1].rank, rows[-1].o_orderkey])
+            if rows and has_next
+            else None
+        )
+
+        return OrderSearchResponse(
+            results=[
+                OrderSearchResult(**_order_read(row).model_dump(), rank=row.rank)
+                for row in rows
+            ],
+            pagination=CursorPaginationInfo(
+                page_size=page_size,
+                has_next=has_next,
+                has_previous=position is not None,
+                next_cursor=next_cursor,
+            ),
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        if is_statement_timeout(e):
+            raise HTTPException(
+                status_code=504, detail="Search took too long; use a more specific text"
+            )
+        if is_search_unavailable(e):
+            raise HTTPException(
+                status_code=503, detail="Comment search requires the pg_trgm extension"
+            )
+        logger.error(f"Error searching orders: {e}")
+        raise HTTPException(status_code=500, detail="Failed to search orders")
+
+
+@router.get(
+    "/changes",
+    response_model=OrderChangesResponse,
+    summary="Get orders changed since a sync token",
+)
+async def get_order_changes(
+    sync_token: str | None = Query(
+        None, description="Token from the previous response (omit to start tracking)"
+    ),
+    limit: int = Query(
+        1000, ge=1, le=10000, description="Maximum number of orders to return"
+    ),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Get the orders that were inserted or updated since a previous sync.
+
+    Args:
+        sync_token: Token from the previous response (omit to start tracking)
+        limit: Maximum number of orders to return
+        db: Database session
+
+    Returns:
+        OrderChangesResponse: Changed orders and the token for the next call
+
+    Raises:
+        HTTPException: 400 for a malformed token, 503 if change tracking is
+            disabled, 500 if the query fails
+
+    Best for:
+        - Clients that keep a local copy of the orders table
+
+    Usage:
+        - Start: `/orders/changes` returns no orders, only a `sync_token`;
+          then copy the table once, e.g. with `/orders/export`
+        - Sync: `/orders/changes?sync_token=<sync_token>`, repeated while
+          `has_more` is true, then keep the last `sync_token` for the next sync
+
+    Rows are found through an index on the writing transaction id, so a
+    sync costs time proportional to the number of changed orders, not to
+    the size of the table. An order may be returned again by a later sync;
+    deleted orders are not reported.
+
+    Reads always go to the primary: a token holds transaction ids of the
+    node that issued it, and a replica that has not yet replayed them would
+    skip their changes for good.
+    """
+    if not CHANGE_TRACKING_ENABLED:
+        raise HTTPException(status_code=503, detail="Order change tracking is not enabled")
+
+    try:
+        if sync_token is None:
+            horizon = await current_horizon(db)
+            start = SyncToken(since=horizon, horizon=horizon)
+            return OrderChangesResponse(
+                orders=[], sync_token=encode_sync_token(start), has_more=False
+            )
+
+        try:
+            token = decode_sync_token(sync_token)
+        except InvalidSyncTokenError:
+            raise HTTPException(status_code=400, detail="Invalid sync token provided")
+
+        page = await fetch_changes(db, token, limit)
+        return OrderChangesResponse(
+            orders=[_order_read(row) for row in page.rows],
+            sync_token=encode_sync_token(page.token),
+            has_more=page.has_more,
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting order changes: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve order changes")
+
+
+@router.get("/changes/live", summary="Stream order changes as Server-Sent Events")
+async def stream_order_changes():
+    """
+    Push order status changes to the client as they are committed.
+
+    Returns:
+        StreamingResponse: A `text/event-stream` of `order_changed` events
+
+    Raises:
+        HTTPException: 503 if change notifications are disabled or too many clients are connected
+
+    Best for:
+        - Dashboards that would otherwise poll `/orders/stream` for changes
+
+    Usage:
+        - `/orders/changes/live`
+
+    Every process listens for changes on one database connection and fans
+    them out to its subscribers, so connected clients add no database load.
+    An idle stream receives a heartbeat comment every
+    ORDERS_LIVE_HEARTBEAT_INTERVAL seconds. A client that falls more than
+    ORDERS_LIVE_MAX_BUFFER events behind receives a `close` event with
+    reason `overflow` and should reconnect and reload the orders it shows.
+    """
+    if not order_change_feed.available:
+        raise HTTPException(
+            status_code=503, detail="Order change notifications are not enabled"
+        )
+    if order_change_feed.full:
+        raise HTTPException(
+            status_code=503, detail="Too many live order change subscribers"
+        )
+
+    subscription = order_change_feed.subscribe()
+    return StreamingResponse(
+        order_change_feed.stream(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _page_index_status() -> PageIndexStatus:
+    return PageIndexStatus(
+        ready=page_index.ready,
+        building=page_index.building,
+        stride=page_index.stride,
+        boundary_count=page_index.boundary_count,
+        built_at=(
+            datetime.fromtimestamp(page_index.built_at, tz=timezone.utc)
+            if page_index.built_at
+            else None
+        ),
+    )
+
+
+@router.get(
+    "/analytics/summary",
+    response_model=OrderSummaryResponse,
+    summary="Get order counts and revenue by status, priority and period",
+)
+async def get_order_summary(
+    group_by: list[SummaryDimension] = Query(
+        [SummaryDimension.STATUS], description="Dimensions to group by (repeatable)"
+    ),
+    period: SummaryPeriod = Query(
+        SummaryPeriod.MONTH, description="Period order dates are grouped by"
+    ),
+    start_date: date | None = Query(None, description="First order date to include"),
+    end_date: date | None = Query(None, description="Last order date to include"),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """
+    Get the number of orders and their total price per group.
+
+    Args:
+        group_by: Dimensions to group by: status, priority and/or date
+        period: Period order dates are grouped by when grouping by date
+        start_date: First order date to include
+        end_date: Last order date to include
+        db: Database session
+
+    Returns:
+        OrderSummaryResponse: One row per group with `order_count` and `total_price`
+
+    Raises:
+        HTTPException: 400 if start_date is after end_date, 503 if the summary
+            is disabled, 500 if the query fails
+
+    Best for:
+        - Dashboards charting order volume and revenue over time
+
+    Usage:
+        - Totals per status: `/orders/analytics/summary`
+        - Monthly revenue per priority:
+          `/orders/analytics/summary?group_by=date&group_by=priority&period=month`
+        - One year by quarter:
+          `/orders/analytics/summary?group_by=date&period=quarter&start_date=1995-01-01&end_date=1995-12-31`
+
+    Results are rolled up from a daily summary table rather than from the
+    orders themselves, so the cost depends on the number of days in the
+    range, not on the number of orders. Status updates are reflected
+    immediately, other changes to the orders table after the next summary
+    refresh (ORDERS_SUMMARY_REFRESH_INTERVAL).
+    """
+    if not SUMMARY_ENABLED:
+        raise HTTPException(status_code=503, detail="Order summary is not enabled")
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+
+    try:
+        dimensions = list(dict.fromkeys(group_by))
+        result = await db.execute(
+            build_summary_query(dimensions, period, start_date, end_date)
+        )
+        rows = [
+            OrderSummaryRow(
+                period=row.period,
+                o_orderstatus=row.o_orderstatus,
+                o_orderpriority=row.o_orderpriority,
+                order_count=row.order_count,
+                total_price=row.total_price,
+            )
+            for row in result
+        ]
+        return OrderSummaryResponse(
+            rows=rows,
+            group_by=[dimension.value for dimension in dimensions],
+            period=period.value if SummaryDimension.DATE in dimensions else None,
+        )
+
+    except Exception as e:
+        logger.error(f"Error getting order summary: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve order summary")
+
+
+@router.get(
+    "/analytics/timeseries",
+    response_model=OrderTimeSeriesResponse,
+    summary="Get order volume and value over time, downsampled to a number of points",
+)
+async def get_order_time_series(
+    start_date: date | None = Query(
+        None, description="First order date to include (default: first order)"
+    ),
+    end_date: date | None = Query(
+        None, description="Last order date to include (default: last order)"
+    ),
+    points: int = Query(
+        200, ge=1, le=MAX_POINTS, description="Maximum number of points to return"
+    ),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """
+    Get the number of orders and their total price per time bucket.
+
+    Args:
+        start_date: First order date to include (default: first order)
+        end_date: Last order date to include (default: last order)
+        points: Maximum number of points to return
+        db: Database session
+
+    Returns:
+        OrderTimeSeriesResponse: The chosen bucket width and one point per
+            bucket that holds orders
+
+    Raises:
+        HTTPException: 400 if start_date is after end_date or the range needs
+            more than `points` yearly buckets, 500 if the query fails
+
+    Best for:
+        - Charts of order volume and revenue that zoom in and out
+
+    Usage:
+        - Whole history: `/orders/analytics/timeseries?points=100`
+        - Zoomed in: `/orders/analytics/timeseries?start_date=1995-03-01&end_date=1995-06-30&points=300`
+
+    The bucket width is the narrowest of 1, 2, 3, 7 or 14 days, a month, a
+    quarter or a year that fits the range in `points` buckets. Results are
+    cached per range and bucket width for ORDERS_TIMESERIES_CACHE_TTL seconds.
+    """
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+
+    try:
+        if start_date is None or end_date is None:
+            first, last = await order_date_range(db)
+            if first is None:
+                return OrderTimeSeriesResponse(points=[])
+            start_date = start_date or first
+            end_date = end_date or last
+            if start_date > end_date:
+                return OrderTimeSeriesResponse(
+                    start_date=start_date, end_date=end_date, points=[]
+                )
+
+        try:
+            width = choose_bucket_width(start_date, end_date, points)
+        except InvalidTimeSeriesQueryError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        series = await order_time_series(db, start_date, end_date, width)
+        return OrderTimeSeriesResponse(
+            start_date=start_date,
+            end_date=end_date,
+            bucket=width.name,
+            points=[
+                OrderTimeSeriesPoint(
+                    bucket_start=point.bucket_start,
+                    bucket_end=point.bucket_end,
+                    order_count=point.order_count,
+                    total_price=point.total_price,
+                )
+                for point in series
+            ],
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting order time series: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve order time series")
+
+
+@router.get(
+    "/page-index",
+    response_model=PageIndexStatus,
+    summary="Get the status of the page number index",
+)
+async def get_page_index_status():
+    """
+    Get the status of the sparse index used by `/orders/pages`.
+
+    Returns:
+        PageIndexStatus: Whether the index is ready and how many boundaries it holds
+    """
+    return _page_index_status()
+
+
+@router.post(
+    "/page-index/rebuild",
+    response_model=PageIndexStatus,
+    summary="Rebuild the page number index",
+)
+async def rebuild_page_index():
+    """
+    Rebuild the page index in the background, e.g. after the synced table was refreshed.
+
+    The current index keeps serving requests until the new one replaces it.
+
+    Returns:
+        PageIndexStatus: The index status once the rebuild has been scheduled
+    """
+    page_index.schedule_rebuild()
+    return _page_index_status()
+
+
+@router.delete(
+    "/page-index",
+    response_model=PageIndexStatus,
+    summary="Invalidate the page number index",
+)
+async def invalidate_page_index():
+    """
+    Discard the page index so `/orders/pages` falls back to OFFSET scans.
+
+    Use this when the synced table is being refreshed and stale boundaries
+    would return shifted pages.
+
+    Returns:
+        PageIndexStatus: The index status after invalidation
+    """
+    page_index.invalidate()
+    return _page_index_status()
+
+
+@router.get(
+    "/cache/stats",
+    response_model=OrderCacheStats,
+    summary="Get order cache statistics",
+)
+async def get_order_cache_stats():
+    """
+    Get hit, miss and eviction counters of the single-order read cache.
+
+    Returns:
+        OrderCacheStats: Cache counters and current size
+    """
+    return OrderCacheStats(**order_cache.snapshot())
+
+
+async def _load_order(db: AsyncSession, order_key: int) -> OrderRead | None:
+    stmt = select(Order.__table__).where(Order.o_orderkey == order_key)
+    result = await db.execute(stmt)
+    row = result.first()
+    return OrderRead(**row._mapping) if row else None
+
+
 @router.get("/{order_key}", response_model=OrderRead, summary="Get an order by its key")
 async def read_order(order_key: int, db: AsyncSession = Depends(get_async_db)):
     """
     Fetch a single order by its key, returning all order fields.
 
+    Orders are served from an in-process LRU cache with a TTL. Concurrent
+    misses for the same key share one query, and status updates invalidate
+    the cached copy. Misses are loaded from the primary: a replica may not
+    have replayed the update that evicted the order yet, and its stale copy
+    would then be cached for the whole TTL.
+
     Args:
         order_key: The unique key of the order to retrieve
         db: Database session
@@ -293,9 +1079,9 @@ async def read_order(order_key: int, db: AsyncSession = Depends(get_async_db)):
         if order_key <= 0:
             raise HTTPException(status_code=400, detail="Invalid order key provided")
 
-        stmt = select(Order).where(Order.o_orderkey == order_key)
-        result = await db.execute(stmt)
-        order = result.scalars().first()
+        order = await order_cache.get_or_load(
+            order_key, lambda: _load_order(db, order_key)
+        )
 
         if not order:
             logger.info(f"Order not found: {order_key}")
@@ -312,6 +1098,67 @@ async def read_order(order_key: int, db: AsyncSession = Depends(get_async_db)):
         raise HTTPException(status_code=500, detail="Internal server error occurred")
 
 
+@router.post(
+    "/batch",
+    response_model=OrderBatchResponse,
+    summary="Get many orders by their keys",
+)
+async def read_orders_batch(
+    batch: OrderBatchRequest,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """
+    Fetch many orders with a single query.
+
+    Args:
+        batch: The order keys to look up (duplicates are ignored)
+        db: Database session
+
+    Returns:
+        OrderBatchResponse: The orders found, in request order, and the keys that were not found
+
+    Raises:
+        HTTPException: 400 for an empty, oversized or invalid key list, 500 for database errors
+
+    Best for:
+        - Enriching events or records with order data
+        - Replacing many `/orders/{order_key}` calls with one request
+
+    Usage:
+        - `POST /orders/batch` with `{"order_keys": [1, 2, 3]}`
+    """
+    try:
+        order_keys = list(dict.fromkeys(batch.order_keys))
+        if not order_keys:
+            raise HTTPException(status_code=400, detail="No order keys provided")
+        if len(order_keys) > BATCH_MAX_KEYS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {BATCH_MAX_KEYS} order keys can be requested at once",
+            )
+        if any(key <= 0 for key in order_keys):
+            raise HTTPException(status_code=400, detail="Invalid order key provided")
+
+        # One array parameter keeps the statement text identical for any batch size
+        stmt = select(Order.__table__).where(
+            Order.o_orderkey
+            == any_(bindparam("order_keys", order_keys, type_=ARRAY(BigInteger)))
+        )
+        result = await db.execute(stmt)
+        found = {row.o_orderkey: OrderRead(**row._mapping) for row in result.all()}
+
+        return OrderBatchResponse(
+            orders=[found[key] for key in order_keys if key in found],
+            missing_keys=[key for key in order_keys if key not in found],
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching order batch: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve orders")
+
+
 @router.post(
     "/{order_key}/status",
     response_model=OrderStatusUpdateResponse,
@@ -320,47 +1167,82 @@ async def read_order(order_key: int, db: AsyncSession = Depends(get_async_db)):
 async def update_order_status(
     order_key: int,
     status_data: OrderStatusUpdate,
+    response: Response,
+    wait: bool = Query(
+        False,
+        description="With write-behind enabled, wait until the update is committed",
+    ),
     db: AsyncSession = Depends(get_async_db),
 ):
     """
     Update the status for a specific order.
 
+    The update is a single `UPDATE ... RETURNING` statement; no returned row
+    means the order does not exist.
+
+    When `ORDERS_WRITE_BEHIND_ENABLED` is set, the update is queued and
+    written by a background flusher together with other queued updates.
+    The endpoint then answers 202 right away, unless `wait=true` is passed,
+    in which case it answers once the update is committed, or with 503 if
+    it is still queued after `ORDERS_WRITE_BEHIND_WAIT_TIMEOUT_MS`.
+
     Args:
         order_key: The key of the order to update
         status_data: The new order status data
+        response: The outgoing response, used to signal queued updates
+        wait: With write-behind enabled, wait until the update is committed
         db: Database session
 
     Returns:
         OrderStatusUpdateResponse: Confirmation of the status update
 
     Raises:
-        HTTPException: 400 for invalid order key, 404 if order not found, 500 for database errors
+        HTTPException: 400 for invalid order key, 404 if order not found, 503 if a
+            waited-for queued update is not committed in time, 500 for database errors
     """
     try:
         if order_key <= 0:
             raise HTTPException(status_code=400, detail="Invalid order key provided")
 
-        check_stmt = select(Order).where(Order.o_orderkey == order_key)
-        check_result = await db.execute(check_stmt)
-        existing_order = check_result.scalars().first()
+        if status_write_behind.enabled:
+            pending = status_write_behind.submit(order_key, status_data.o_orderstatus)
+            if not wait:
+                response.status_code = status.HTTP_202_ACCEPTED
+                return OrderStatusUpdateResponse(
+                    o_orderkey=order_key,
+                    o_orderstatus=status_data.o_orderstatus,
+                    message="Order status update queued",
+                )
+            try:
+                # Shielded: the update stays queued when the wait times out
+                change = await asyncio.wait_for(
+                    asyncio.shield(pending), timeout=WRITE_BEHIND_WAIT_TIMEOUT
+                )
+            except asyncio.TimeoutError:
+                logger.warning(f"Queued status update of order {order_key} not committed in time")
+                raise HTTPException(
+                    status_code=503,
+                    detail="Order status update is still queued and will be retried; "
+                    "it was not committed in time",
+                )
+        else:
+            change = await apply_status_update(
+                db, order_key, status_data.o_orderstatus
+            )
 
-        if not existing_order:
+        if change is None:
             logger.info(f"Order not found for update: {order_key}")
             raise HTTPException(
                 status_code=404, detail=f"Order with key '{order_key}' not found"
             )
 
-        existing_order.o_orderstatus = status_data.o_orderstatus
-        await db.commit()
-        await db.refresh(existing_order)
-
         logger.info(
-            f"Successfully updated order {order_key} status to {status_data.o_orderstatus}"
+            f"Successfully updated order {order_key} status to {change.o_orderstatus}"
         )
 
         return OrderStatusUpdateResponse(
-            o_orderkey=order_key,
-            o_orderstatus=status_data.o_orderstatus,
+            o_orderkey=change.o_orderkey,
+            o_orderstatus=change.o_orderstatus,
             message="Order status updated successfully",
         )
 
@@ -369,3 +1251,76 @@ async def update_order_status(
     except Exception as e:
         logger.error(f"Error updating status for order {order_key}: {e}")
         raise HTTPException(status_code=500, detail="Failed to update order status")
+
+
+@router.post(
+    "/status/bulk",
+    response_model=OrderStatusBulkUpdateResponse,
+    summary="Update the status of many orders",
+)
+async def update_order_status_bulk(
+    bulk_data: OrderStatusBulkUpdate,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Update the status of many orders in a single transaction.
+
+    Args:
+        bulk_data: Pairs of order key and new status (the last entry wins for repeated keys)
+        db: Database session
+
+    Returns:
+        OrderStatusBulkUpdateResponse: The outcome for every requested order key
+
+    Raises:
+        HTTPException: 400 for an empty, oversized or invalid payload, 500 for database errors
+
+    Best for:
+        - Bursts of status changes from fulfillment systems
+        - Replacing many `/orders/{order_key}/status` calls with one request
+
+    Usage:
+        - `POST /orders/status/bulk` with
+          `{"updates": [{"o_orderkey": 1, "o_orderstatus": "F"}, {"o_orderkey": 2, "o_orderstatus": "O"}]}`
+
+    Large payloads are split into chunks of `ORDERS_BULK_UPDATE_CHUNK_SIZE`
+    orders, each applied with one `UPDATE ... FROM unnest(...)` statement,
+    and all chunks are committed together.
+    """
+    try:
+        updates = [(item.o_orderkey, item.o_orderstatus) for item in bulk_data.updates]
+        if not updates:
+            raise HTTPException(status_code=400, detail="No status updates provided")
+        if len(updates) > BULK_UPDATE_MAX_ITEMS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {BULK_UPDATE_MAX_ITEMS} status updates can be sent at once",
+            )
+        if any(order_key <= 0 for order_key, _ in updates):
+            raise HTTPException(status_code=400, detail="Invalid order key provided")
+
+        changes = await apply_bulk_status_updates(db, updates)
+        updated = {change.o_orderkey: change.o_orderstatus for change in changes}
+
+        requested = dict(updates)
+        results = [
+            OrderStatusBulkResult(
+                o_orderkey=order_key,
+                o_orderstatus=updated.get(order_key, new_status),
+                updated=order_key in updated,
+            )
+            for order_key, new_status in requested.items()
+        ]
+
+        return OrderStatusBulkUpdateResponse(
+            results=results,
+            updated_count=len(updated),
+            missing_count=len(requested) - len(updated),
+            message="Order statuses updated successfully",
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error applying bulk status update: {e}")
+        raise HTTPException(status_code=500, detail="Failed to update order statuses")
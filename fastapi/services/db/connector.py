@@ -11,6 +11,7 @@ from typing import Dict, List, Optional, Union
 import pandas as pd
 from databricks import sql
 from databricks.sdk.core import Config
+from services.monitoring.metrics import observe_warehouse_call
 
 # Use Databricks SDK Config for authentication
 # In Databricks Apps, auth is handled automatically
@@ -30,11 +31,12 @@ def get_connection(warehouse_id: str):
         A connection to the SQL warehouse
     """
     http_path = f"/sql/1.0/warehouses/{warehouse_id}"
-    return sql.connect(
-        server_hostname=cfg.host,
-        http_path=http_path,
-        credentials_provider=lambda: cfg.authenticate,
-    )
+    with observe_warehouse_call("connect"):
+        return sql.connect(
+            server_hostname=cfg.host,
+            http_path=http_path,
+            credentials_provider=lambda: cfg.authenticate,
+        )
 
 
 def close_connections():
@@ -66,7 +68,7 @@ def query(
     conn = get_connection(warehouse_id)
 
     try:
-        with conn.cursor() as cursor:
+        with observe_warehouse_call("query"), conn.cursor() as cursor:
             cursor.execute(sql_query)
 
             # Use fetchall directly for non-Arrow results
@@ -107,7 +109,7 @@ def insert_data(table_path: str, data: List[Dict], warehouse_id: str) -> int:
     conn = get_connection(warehouse_id)
 
     try:
-        with conn.cursor() as cursor:
+        with observe_warehouse_call("insert"), conn.cursor() as cursor:
             # Get column names from the first record
             columns = list(data[0].keys())
             columns_str = ", ".join(columns)
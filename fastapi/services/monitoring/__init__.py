@@ -0,0 +1 @@
+"""Monitoring services exposing application metrics."""
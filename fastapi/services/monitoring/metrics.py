@@ -0,0 +1,188 @@
+"""
+Prometheus metrics.
+
+Four groups of series are collected, plus counters of background work:
+
+- `http_request_duration_seconds`: request latency per method, route
+  template and status code
+- `db_pool_*`: size, checked-out connections and overflow of every
+  SQLAlchemy pool, and the time spent waiting to obtain a connection
+- `db_statement_duration_seconds`: execution time of every SQL statement,
+  per pool and statement type; statements slower than
+  `DB_SLOW_STATEMENT_MS` are also logged
+- `warehouse_call_duration_seconds`: calls to the Databricks SQL warehouse
+  connector, per operation and outcome
+- `orders_write_behind_failed_flushes_total`: failed flushes of queued
+  order status updates, which are retried
+
+With several worker processes, set `PROMETHEUS_MULTIPROC_DIR` to an empty
+directory so that every worker records into it and `/metrics` reports the
+totals of all workers.
+"""
+
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+from typing import Iterator, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+logger = logging.getLogger(__name__)
+
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+SLOW_STATEMENT_SECONDS = float(os.getenv("DB_SLOW_STATEMENT_MS", "1000")) / 1000
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency",
+    ["method", "route", "status"],
+)
+POOL_SIZE = Gauge(
+    "db_pool_size", "Configured connection pool size", ["pool"], multiprocess_mode="livesum"
+)
+POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out of the pool",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "Connections open beyond the pool size",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time to obtain a connection from the pool, including opening new ones",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+STATEMENT_DURATION = Histogram(
+    "db_statement_duration_seconds",
+    "SQL statement execution time",
+    ["pool", "operation"],
+)
+WAREHOUSE_CALL_DURATION = Histogram(
+    "warehouse_call_duration_seconds",
+    "Databricks SQL warehouse connector call time",
+    ["operation", "outcome"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+WRITE_BEHIND_FAILED_FLUSHES = Counter(
+    "orders_write_behind_failed_flushes",
+    "Failed flushes of queued order status updates",
+)
+
+_OPERATION = re.compile(r"\s*([A-Za-z]+)")
+_KNOWN_OPERATIONS = set(
+    "SELECT INSERT UPDATE DELETE WITH BEGIN COMMIT ROLLBACK CREATE DROP ALTER "
+    "LOCK SET SHOW LISTEN UNLISTEN ANALYZE".split()
+)
+
+
+def statement_operation(statement: str) -> str:
+    """Return the leading keyword of a statement, bounded to a known set for the label."""
+    match = _OPERATION.match(statement)
+    operation = match.group(1).upper() if match else ""
+    return operation if operation in _KNOWN_OPERATIONS else "OTHER"
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """An async queue pool recording how long every checkout waits, labelled by its logging name."""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            POOL_CHECKOUT_WAIT.labels(self.logging_name or "default").observe(
+                time.perf_counter() - started
+            )
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """
+    Record pool and statement metrics for an engine.
+
+    Args:
+        engine: The engine to instrument; use `InstrumentedAsyncQueuePool`
+            with `pool_logging_name=name` to also record checkout waits
+        name: The `pool` label of the engine's series
+    """
+    sync_engine = engine.sync_engine
+    size = sync_engine.pool.size()
+    POOL_SIZE.labels(name).set(size)
+
+    def set_pool_gauges(checked_out: int) -> None:
+        POOL_CHECKED_OUT.labels(name).set(checked_out)
+        # Connections beyond the pool size are closed on checkin, so the
+        # overflow is whatever is checked out beyond it
+        POOL_OVERFLOW.labels(name).set(max(checked_out - size, 0))
+
+    @event.listens_for(sync_engine, "checkout")
+    def on_checkout(dbapi_connection, conn_rec, conn_proxy):
+        set_pool_gauges(sync_engine.pool.checkedout())
+
+    @event.listens_for(sync_engine, "checkin")
+    def on_checkin(dbapi_connection, conn_rec):
+        # Fired before the pool takes the connection back
+        set_pool_gauges(max(sync_engine.pool.checkedout() - 1, 0))
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def observe_statement(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_started
+        STATEMENT_DURATION.labels(name, statement_operation(statement)).observe(elapsed)
+        if elapsed >= SLOW_STATEMENT_SECONDS:
+            logger.warning(
+                f"Slow statement on {name} ({elapsed * 1000:.0f}ms): "
+                f"{' '.join(statement.split())[:500]}"
+            )
+
+
+@contextmanager
+def observe_warehouse_call(operation: str) -> Iterator[None]:
+    """Time a SQL warehouse connector call, labelled with whether it raised."""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "success"
+    finally:
+        WAREHOUSE_CALL_DURATION.labels(operation, outcome).observe(
+            time.perf_counter() - started
+        )
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Return the metrics in the Prometheus text format and its content type."""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges from the multiprocess totals on shutdown."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
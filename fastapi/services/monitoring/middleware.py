@@ -0,0 +1,72 @@
+"""
+Request timing middleware.
+
+A plain ASGI middleware rather than `@app.middleware("http")`: Starlette's
+`BaseHTTPMiddleware` runs the endpoint in a separate task and relays the
+response body through a stream, which adds overhead to every request and
+holds back streaming responses. This middleware only wraps `send`, so
+response bodies pass through unchanged as the app produces them.
+
+Every request is recorded in `http_request_duration_seconds`. The
+`X-Process-Time` header carries the time until the response headers were
+sent. Request log lines are written for a sample of requests, and always
+for server errors.
+"""
+
+import logging
+import random
+import time
+
+from services.monitoring.metrics import REQUEST_DURATION
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessTimeMiddleware:
+    """Times HTTP requests, adds the `X-Process-Time` header and logs a sample of requests."""
+
+    def __init__(self, app: ASGIApp, log_sample_rate: float = 1.0):
+        """
+        Args:
+            app: The ASGI application to wrap
+            log_sample_rate: Fraction of requests logged, from 0 to 1;
+                server errors are always logged
+        """
+        self.app = app
+        self.log_sample_rate = log_sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status_code = 500
+
+        async def send_with_process_time(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Process-Time", str(time.perf_counter() - start_time))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_process_time)
+        finally:
+            process_time = time.perf_counter() - start_time
+            # Label by route template, not path, to keep the series count bounded
+            route = scope.get("route")
+            REQUEST_DURATION.labels(
+                scope["method"], route.path if route else "unmatched", status_code
+            ).observe(process_time)
+            if status_code >= 500 or random.random() < self.log_sample_rate:
+                logger.info(
+                    "Request: %s %s - %d - %.1fms",
+                    scope["method"],
+                    scope["path"],
+                    status_code,
+                    process_time * 1000,
+                )
@@ -0,0 +1 @@
+"""Services for querying and maintaining Lakebase orders data."""
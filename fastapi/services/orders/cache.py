@@ -0,0 +1,189 @@
+"""
+In-process LRU cache with TTL for order reads.
+
+Entries are bounded both by count and by an estimate of their memory
+footprint; the least recently used entries are evicted first. Concurrent
+misses for the same key share a single load, so a burst of requests for a
+cold order results in one database query.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_size(value: Any) -> int:
+    """Estimate the memory used by a value and its attributes in bytes."""
+    size = sys.getsizeof(value)
+    attributes = getattr(value, "__dict__", None)
+    if attributes:
+        size += sum(sys.getsizeof(item) for item in attributes.values())
+    return size
+
+
+@dataclass
+class CacheStats:
+    """Counters describing cache effectiveness."""
+
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+
+class TTLCache:
+    """A bounded LRU cache whose entries expire after a TTL."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int,
+        ttl: float,
+        sizeof: Callable[[Any], int] = estimate_size,
+    ):
+        """
+        Args:
+            max_entries: Maximum number of cached entries (0 disables caching)
+            max_bytes: Maximum estimated memory used by cached values
+            ttl: Seconds an entry stays valid after it was stored
+            sizeof: Function estimating the size of a value in bytes
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._sizeof = sizeof
+        # key -> (value, expires_at, size); ordered from least to most recently used
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._stale_inflight: Set[Hashable] = set()
+        self.stats = CacheStats()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return a cached value, or None if it is missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at, _ = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            self.stats.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting least recently used entries to stay within bounds."""
+        if not self.enabled:
+            return
+        size = self._sizeof(value)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, time.monotonic() + self.ttl, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.stats.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a key, including the result of a load that is still running."""
+        if key in self._inflight:
+            self._stale_inflight.add(key)
+        if key in self._entries:
+            self._remove(key)
+            self.stats.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._stale_inflight.update(self._inflight)
+        self._entries.clear()
+        self._bytes = 0
+
+    async def get_or_load(
+        self, key: Hashable, loader: Callable[[], Awaitable[Optional[Any]]]
+    ) -> Optional[Any]:
+        """
+        Return a cached value or load it, sharing the load between concurrent callers.
+
+        Args:
+            key: The cache key
+            loader: Coroutine function returning the value, or None if it does not exist
+
+        Returns:
+            The cached or loaded value; None results are not cached
+        """
+        value = self.get(key)
+        if value is not None:
+            self.stats.hits += 1
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        self.stats.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+        except BaseException as e:
+            error = e if isinstance(e, Exception) else RuntimeError("Load was cancelled")
+            future.set_exception(error)
+            # Mark the exception as retrieved in case nobody else was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            # A write that happened while loading makes the result unsafe to keep
+            if value is not None and key not in self._stale_inflight:
+                self.set(key, value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+            self._stale_inflight.discard(key)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the cache counters together with its current size."""
+        return {
+            **asdict(self.stats),
+            "entries": len(self._entries),
+            "size_bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+
+order_cache = TTLCache(
+    max_entries=int(os.getenv("ORDERS_CACHE_MAX_ENTRIES", "10000")),
+    max_bytes=int(os.getenv("ORDERS_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+    ttl=float(os.getenv("ORDERS_CACHE_TTL", "60")),
+)
@@ -0,0 +1,200 @@
+"""
+Live feed of order changes for Server-Sent Events subscribers.
+
+All subscribers of a process share the single order change listener: each
+notification is fanned out to per-subscriber buffers in memory, so the
+number of connected clients does not add database load. Buffers are
+bounded; a subscriber that falls behind is dropped instead of holding
+memory, and is expected to reconnect and catch up from the database.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Deque, Optional, Set
+
+from services.orders.notifications import order_change_listener
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    """A status change delivered to live subscribers."""
+
+    id: int
+    o_orderkey: int
+    o_orderstatus: str
+
+
+class FeedClosed(Exception):
+    """Raised when a subscription ends because it was dropped or the feed stopped."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class Subscription:
+    """A bounded buffer of change events for one subscriber."""
+
+    def __init__(self, max_buffer: int):
+        """
+        Args:
+            max_buffer: Number of undelivered events after which the subscriber is dropped
+        """
+        self.max_buffer = max_buffer
+        self._events: Deque[ChangeEvent] = deque()
+        self._ready = asyncio.Event()
+        self.closed_reason: Optional[str] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._events)
+
+    def push(self, event: ChangeEvent) -> bool:
+        """
+        Buffer an event for delivery.
+
+        Returns:
+            False if the buffer is full and the subscriber has been dropped
+        """
+        if self.closed_reason is not None:
+            return False
+        if len(self._events) >= self.max_buffer:
+            self.close("overflow")
+            return False
+        self._events.append(event)
+        self._ready.set()
+        return True
+
+    def close(self, reason: str) -> None:
+        """End the subscription once buffered events were consumed."""
+        if self.closed_reason is None:
+            self.closed_reason = reason
+            self._ready.set()
+
+    async def next(self, timeout: float) -> Optional[ChangeEvent]:
+        """
+        Wait for the next event.
+
+        Args:
+            timeout: Seconds to wait before giving up
+
+        Returns:
+            The next event, or None if no event arrived within the timeout
+
+        Raises:
+            FeedClosed: If the subscription was dropped or the feed stopped
+        """
+        while True:
+            # A dropped subscriber has already lost events, so it stops at once
+            if self.closed_reason == "overflow":
+                raise FeedClosed(self.closed_reason)
+            if self._events:
+                return self._events.popleft()
+            if self.closed_reason is not None:
+                raise FeedClosed(self.closed_reason)
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                return None
+
+
+class OrderChangeFeed:
+    """Fans order changes out to live subscribers."""
+
+    def __init__(self, max_buffer: int, max_subscribers: int, heartbeat_interval: float):
+        """
+        Args:
+            max_buffer: Undelivered events per subscriber before it is dropped
+            max_subscribers: Maximum number of concurrent subscribers
+            heartbeat_interval: Seconds between heartbeat frames on an idle stream
+        """
+        self.max_buffer = max_buffer
+        self.max_subscribers = max_subscribers
+        self.heartbeat_interval = heartbeat_interval
+        self._subscribers: Set[Subscription] = set()
+        self._ids = itertools.count(1)
+        self.dropped = 0
+
+    @property
+    def available(self) -> bool:
+        return order_change_listener.enabled
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    @property
+    def full(self) -> bool:
+        return len(self._subscribers) >= self.max_subscribers
+
+    def subscribe(self) -> Subscription:
+        """Register a new subscriber."""
+        subscription = Subscription(self.max_buffer)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def publish(self, order_key: int, status: str) -> None:
+        """Deliver a change to every subscriber, dropping those that fell behind."""
+        event = ChangeEvent(id=next(self._ids), o_orderkey=order_key, o_orderstatus=status)
+        for subscription in list(self._subscribers):
+            if not subscription.push(event):
+                self._subscribers.discard(subscription)
+                self.dropped += 1
+                logger.warning(
+                    f"Dropped slow order change subscriber ({subscription.pending} events behind)"
+                )
+
+    async def stream(self, subscription: Subscription) -> AsyncIterator[str]:
+        """
+        Encode a subscription as Server-Sent Events.
+
+        Yields change events as `order_changed` events, a comment frame when
+        the stream was idle for the heartbeat interval, and a final `close`
+        event with the reason when the subscription ends.
+        """
+        try:
+            yield f"retry: {int(self.heartbeat_interval * 1000)}\n\n"
+            while True:
+                try:
+                    event = await subscription.next(self.heartbeat_interval)
+                except FeedClosed as e:
+                    yield f"event: close\ndata: {json.dumps({'reason': e.reason})}\n\n"
+                    return
+                if event is None:
+                    yield ": heartbeat\n\n"
+                    continue
+                data = json.dumps(
+                    {"o_orderkey": event.o_orderkey, "o_orderstatus": event.o_orderstatus}
+                )
+                yield f"id: {event.id}\nevent: order_changed\ndata: {data}\n\n"
+        finally:
+            self.unsubscribe(subscription)
+
+    async def start(self) -> None:
+        """Start receiving changes from the order change listener."""
+        order_change_listener.add_handler(self.publish)
+
+    async def stop(self) -> None:
+        """Stop receiving changes and end all open streams."""
+        order_change_listener.remove_handler(self.publish)
+        for subscription in list(self._subscribers):
+            subscription.close("shutdown")
+        self._subscribers.clear()
+
+
+order_change_feed = OrderChangeFeed(
+    max_buffer=int(os.getenv("ORDERS_LIVE_MAX_BUFFER", "1000")),
+    max_subscribers=int(os.getenv("ORDERS_LIVE_MAX_SUBSCRIBERS", "1000")),
+    heartbeat_interval=float(os.getenv("ORDERS_LIVE_HEARTBEAT_INTERVAL", "15")),
+)
@@ -0,0 +1,187 @@
+"""
+Order count provider.
+
+Counting `orders_synced` exactly is a full scan, so totals are served in
+one of three modes:
+
+- exact: `count(*)` cached for a TTL, recomputed by at most one request at a time
+- approximate: planner statistics from `pg_class.reltuples`, falling back to
+  `pg_stat_user_tables.n_live_tup` for tables that were never analyzed
+- background: the last exact count computed by a background task, never
+  blocking the request; the task only starts once a request asks for this
+  mode, so processes whose clients never do so do not scan the table
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional
+
+from config import database
+from models.orders import Order
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+_APPROXIMATE_COUNT_SQL = text(
+    """
+    SELECT
+        CASE WHEN c.reltuples >= 0 THEN c.reltuples::bigint ELSE s.n_live_tup END
+    FROM pg_class c
+    LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+    WHERE c.oid = to_regclass(:table_name)
+    """
+)
+
+
+class CountMode(str, Enum):
+    """How an order count is obtained."""
+
+    EXACT = "exact"
+    APPROXIMATE = "approximate"
+    BACKGROUND = "background"
+
+
+@dataclass(frozen=True)
+class CountResult:
+    """An order count and how it was obtained."""
+
+    value: int
+    mode: CountMode
+    as_of: float
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.as_of
+
+
+class OrderCountProvider:
+    """Serves order counts from cache, statistics or a background task."""
+
+    def __init__(self, ttl: float, refresh_interval: float):
+        """
+        Args:
+            ttl: Seconds an exact count is reused before it is recomputed
+            refresh_interval: Seconds between background exact counts
+        """
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self._exact: Optional[CountResult] = None
+        self._background: Optional[CountResult] = None
+        self._lock = asyncio.Lock()
+        self._started = False
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def get(
+        self,
+        db: AsyncSession,
+        mode: CountMode = CountMode.EXACT,
+        max_age: Optional[float] = None,
+    ) -> CountResult:
+        """
+        Get the number of orders.
+
+        Args:
+            db: Database session used when the count has to be queried
+            mode: How the count should be obtained
+            max_age: Oldest acceptable cached exact count in seconds
+                (defaults to the provider TTL, 0 forces a fresh count)
+
+        Returns:
+            CountResult: The count, the mode that produced it and when it was taken
+        """
+        if mode == CountMode.APPROXIMATE:
+            return await self._approximate(db)
+        if mode == CountMode.BACKGROUND:
+            self._ensure_refreshing()
+            if self._background is not None:
+                return self._background
+            # Nothing computed yet; answer from statistics rather than block
+            return await self._approximate(db)
+        return await self._exact_cached(db, self.ttl if max_age is None else max_age)
+
+    def invalidate(self) -> None:
+        """Forget cached exact counts, e.g. after the synced table was refreshed."""
+        self._exact = None
+
+    async def _exact_cached(self, db: AsyncSession, max_age: float) -> CountResult:
+        cached = self._exact
+        if cached is not None and cached.age <= max_age:
+            return cached
+
+        async with self._lock:
+            # Another request may have refreshed the count while we waited
+            cached = self._exact
+            if cached is not None and cached.age <= max_age:
+                return cached
+            self._exact = await self._count_exact(db, CountMode.EXACT)
+            return self._exact
+
+    @staticmethod
+    async def _count_exact(db: AsyncSession, mode: CountMode) -> CountResult:
+        result = await db.execute(select(func.count(Order.o_orderkey)))
+        return CountResult(value=result.scalar(), mode=mode, as_of=time.time())
+
+    @staticmethod
+    async def _approximate(db: AsyncSession) -> CountResult:
+        table = Order.__table__
+        table_name = f"{table.schema}.{table.name}" if table.schema else table.name
+        result = await db.execute(_APPROXIMATE_COUNT_SQL, {"table_name": table_name})
+        value = result.scalar()
+        return CountResult(
+            value=max(int(value or 0), 0),
+            mode=CountMode.APPROXIMATE,
+            as_of=time.time(),
+        )
+
+    async def refresh_background(self) -> None:
+        """Compute an exact count for the background mode."""
+        async with database.get_read_sessionmaker()() as session:
+            self._background = await self._count_exact(session, CountMode.BACKGROUND)
+        # A fresh exact count is also good enough for the exact mode cache
+        self._exact = CountResult(
+            value=self._background.value,
+            mode=CountMode.EXACT,
+            as_of=self._background.as_of,
+        )
+        logger.info(f"Background order count refreshed: {self._background.value}")
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                await self.refresh_background()
+            except Exception as e:
+                logger.error(f"Background order count failed: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+    def _ensure_refreshing(self) -> None:
+        if not self._started:
+            return
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+            logger.info("Background order count task started")
+
+    async def start(self) -> None:
+        """Allow the background count task to start on the first background mode request."""
+        self._started = True
+
+    async def stop(self) -> None:
+        """Stop the background count task."""
+        self._started = False
+        if self._refresh_task and not self._refresh_task.done():
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            logger.info("Background order count task stopped")
+
+
+order_counts = OrderCountProvider(
+    ttl=float(os.getenv("ORDERS_COUNT_CACHE_TTL", "30")),
+    refresh_interval=float(os.getenv("ORDERS_COUNT_REFRESH_INTERVAL", "300")),
+)
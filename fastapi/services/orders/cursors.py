@@ -0,0 +1,82 @@
+"""
+Opaque keyset cursors for orders pagination.
+
+A cursor token encodes the keyset position of a page boundary together with
+the direction to travel from it. Tokens are URL-safe base64 encoded JSON so
+that clients treat them as opaque values rather than computing them.
+"""
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from typing import Any, List
+
+FORWARD = "next"
+BACKWARD = "prev"
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a cursor token cannot be decoded."""
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """A decoded keyset cursor."""
+
+    direction: str
+    values: List[Any]
+
+    @property
+    def is_backward(self) -> bool:
+        return self.direction == BACKWARD
+
+
+def encode_cursor(direction: str, values: List[Any]) -> str:
+    """
+    Encode a keyset position into an opaque cursor token.
+
+    Args:
+        direction: Either FORWARD (rows after the position) or BACKWARD (rows before it)
+        values: The keyset values of the boundary row, in sort order
+
+    Returns:
+        A URL-safe cursor token
+    """
+    if direction not in (FORWARD, BACKWARD):
+        raise ValueError(f"Unknown cursor direction: {direction}")
+    payload = json.dumps({"d": direction, "k": list(values)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Cursor:
+    """
+    Decode an opaque cursor token.
+
+    For backwards compatibility a bare integer is accepted and treated as a
+    forward cursor starting after that order key.
+
+    Args:
+        token: The cursor token received from a client
+
+    Returns:
+        The decoded Cursor
+
+    Raises:
+        InvalidCursorError: If the token is malformed
+    """
+    # isdigit() alone also accepts non-ASCII digits such as "²", which int() rejects
+    if token.isascii() and token.isdigit():
+        return Cursor(direction=FORWARD, values=[int(token)])
+
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        direction = payload["d"]
+        values = payload["k"]
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError(f"Malformed cursor: {token}") from e
+
+    if direction not in (FORWARD, BACKWARD) or not isinstance(values, list):
+        raise InvalidCursorError(f"Malformed cursor: {token}")
+    return Cursor(direction=direction, values=values)
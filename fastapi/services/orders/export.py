@@ -0,0 +1,123 @@
+"""
+Streaming export of orders.
+
+Rows are read through a server-side cursor (asyncpg cursor inside a
+transaction) in fixed-size batches and encoded incrementally, so an export
+holds at most one batch in memory no matter how many rows it covers. Each
+encoded batch is handed to the ASGI server before the next one is fetched,
+which lets a slow client throttle the database reads.
+"""
+
+import csv
+import io
+import json
+import logging
+from datetime import date
+from enum import Enum
+from typing import AsyncIterator, Optional
+
+from models.orders import Order
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncResult
+
+logger = logging.getLogger(__name__)
+
+
+class ExportFormat(str, Enum):
+    """Supported export encodings."""
+
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+
+def build_export_query(
+    min_key: Optional[int] = None,
+    max_key: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: Optional[int] = None,
+) -> Select:
+    """
+    Build the export query for an order key and order date range.
+
+    Args:
+        min_key: Smallest order key to include
+        max_key: Largest order key to include
+        start_date: Earliest order date to include
+        end_date: Latest order date to include
+        limit: Maximum number of rows to export
+
+    Returns:
+        A select statement ordered by order key
+    """
+    stmt = select(Order.__table__).order_by(Order.o_orderkey)
+    if min_key is not None:
+        stmt = stmt.where(Order.o_orderkey >= min_key)
+    if max_key is not None:
+        stmt = stmt.where(Order.o_orderkey <= max_key)
+    if start_date is not None:
+        stmt = stmt.where(Order.o_orderdate >= start_date)
+    if end_date is not None:
+        stmt = stmt.where(Order.o_orderdate <= end_date)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+async def open_export(
+    conn: AsyncConnection, stmt: Select, batch_size: int
+) -> AsyncResult:
+    """
+    Start streaming a query through a server-side cursor.
+
+    Args:
+        conn: A dedicated connection that stays open for the whole export
+        stmt: The export query
+        batch_size: Number of rows fetched from the cursor at a time
+
+    Returns:
+        The streaming result
+    """
+    return await conn.stream(stmt.execution_options(yield_per=batch_size))
+
+
+async def encode_rows(
+    conn: AsyncConnection, result: AsyncResult, export_format: ExportFormat
+) -> AsyncIterator[bytes]:
+    """
+    Encode a streaming result batch by batch and release the connection at the end.
+
+    Args:
+        conn: The connection the result is read from
+        result: The streaming result returned by open_export
+        export_format: The output encoding
+
+    Yields:
+        Encoded chunks, one per fetched batch (plus the CSV header)
+    """
+    columns = list(result.keys())
+    rows_sent = 0
+    try:
+        if export_format == ExportFormat.CSV:
+            yield (",".join(columns) + "\r\n").encode()
+
+        async for batch in result.partitions():
+            buffer = io.StringIO()
+            if export_format == ExportFormat.CSV:
+                csv.writer(buffer).writerows(batch)
+            else:
+                for row in batch:
+                    buffer.write(json.dumps(dict(zip(columns, row)), default=str))
+                    buffer.write("\n")
+            rows_sent += len(batch)
+            yield buffer.getvalue().encode()
+    finally:
+        await result.close()
+        await conn.close()
+        logger.info(f"Orders export finished after {rows_sent} rows")
@@ -0,0 +1,172 @@
+"""
+Managed secondary indexes on the orders table.
+
+`orders_synced` only has its primary key, so the filtered and sorted order
+stream and the comment search need additional indexes. They are created in
+the background after startup with `CREATE INDEX CONCURRENTLY`, which does
+not block writes to the table; an index left invalid by an interrupted
+build is dropped and built again. Indexes whose extension cannot be
+installed are skipped. An advisory lock lets one app process at a time
+check and build them, so that an index another process is still building,
+which is invalid until it finishes, is not taken for an interrupted build.
+"""
+
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from config import database
+from sqlalchemy import func, select, text
+
+logger = logging.getLogger(__name__)
+
+_TABLE = "public.orders_synced"
+
+# Advisory lock key letting a single app process build the indexes at a time
+_BUILD_LOCK_KEY = 0x6F7264696478  # "ordidx"
+
+
+@dataclass(frozen=True)
+class ManagedIndex:
+    """An index on the orders table kept in place by the index manager."""
+
+    name: str
+    definition: str
+    extension: Optional[str] = None
+
+
+# Stream indexes list the equality filters first, then the sort key, one index
+# per stream combination. Filtering on both status and customer uses the
+# customer indexes, since a customer has few orders.
+MANAGED_INDEXES: List[ManagedIndex] = [
+    ManagedIndex("orders_synced_status_key_idx", "(o_orderstatus, o_orderkey)"),
+    ManagedIndex("orders_synced_custkey_key_idx", "(o_custkey, o_orderkey)"),
+    ManagedIndex("orders_synced_date_key_idx", "(o_orderdate, o_orderkey)"),
+    ManagedIndex(
+        "orders_synced_status_date_key_idx", "(o_orderstatus, o_orderdate, o_orderkey)"
+    ),
+    ManagedIndex(
+        "orders_synced_custkey_date_key_idx", "(o_custkey, o_orderdate, o_orderkey)"
+    ),
+    # Trigram index serving substring searches on comments
+    ManagedIndex(
+        "orders_synced_comment_trgm_idx",
+        "USING gin (o_comment gin_trgm_ops)",
+        extension="pg_trgm",
+    ),
+]
+
+_INDEX_STATE_SQL = text(
+    """
+    SELECT c.relname, i.indisvalid
+    FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indexrelid
+    WHERE i.indrelid = to_regclass(:table_name)
+    """
+)
+
+
+class OrderIndexManager:
+    """Creates the managed order indexes that are missing or invalid."""
+
+    def __init__(self, enabled: bool, indexes: List[ManagedIndex]):
+        """
+        Args:
+            enabled: Whether missing indexes should be created at startup
+            indexes: The indexes to keep in place
+        """
+        self.enabled = enabled
+        self.indexes = indexes
+        self.ready: Dict[str, bool] = {index.name: False for index in indexes}
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    async def _create_extension(conn, extension: str) -> bool:
+        try:
+            await conn.execute(text(f"CREATE EXTENSION IF NOT EXISTS {extension}"))
+            return True
+        except Exception as e:
+            logger.error(f"Extension {extension} is not available: {e}")
+            return False
+
+    async def ensure_indexes(self) -> bool:
+        """
+        Create missing indexes and rebuild invalid ones, one at a time.
+
+        Returns:
+            False if another process was already building them
+        """
+        async with database.engine.connect() as conn:
+            # Index builds cannot run in a transaction, so the lock is held
+            # by the session rather than a transaction
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            result = await conn.execute(select(func.pg_try_advisory_lock(_BUILD_LOCK_KEY)))
+            if not result.scalar():
+                logger.info("Managed order indexes are being built by another process")
+                return False
+            try:
+                await self._build_missing(conn)
+            finally:
+                await conn.execute(select(func.pg_advisory_unlock(_BUILD_LOCK_KEY)))
+        logger.info("Managed order indexes are in place")
+        return True
+
+    async def _build_missing(self, conn) -> None:
+        result = await conn.execute(_INDEX_STATE_SQL, {"table_name": _TABLE})
+        existing = dict(result.all())
+        extensions: Dict[str, bool] = {}
+
+        for index in self.indexes:
+            if existing.get(index.name) is True:
+                self.ready[index.name] = True
+                continue
+            if index.extension is not None:
+                if index.extension not in extensions:
+                    extensions[index.extension] = await self._create_extension(
+                        conn, index.extension
+                    )
+                if not extensions[index.extension]:
+                    continue
+            if index.name in existing:
+                logger.warning(f"Rebuilding invalid index {index.name}")
+                await conn.execute(
+                    text(f"DROP INDEX CONCURRENTLY IF EXISTS public.{index.name}")
+                )
+            logger.info(f"Creating index {index.name} on {_TABLE} {index.definition}")
+            await conn.execute(
+                text(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index.name} "
+                    f"ON {_TABLE} {index.definition}"
+                )
+            )
+            self.ready[index.name] = True
+
+    async def _run(self) -> None:
+        try:
+            await self.ensure_indexes()
+        except Exception as e:
+            logger.error(f"Failed to create managed order indexes: {e}")
+
+    async def start(self) -> None:
+        """Create missing indexes in the background if enabled."""
+        if not self.enabled:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop waiting for index builds."""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+
+order_indexes = OrderIndexManager(
+    enabled=os.getenv("ORDERS_MANAGED_INDEXES_ENABLED", "true").lower() == "true",
+    indexes=MANAGED_INDEXES,
+)
@@ -0,0 +1,148 @@
+"""
+Composite keyset queries for filtered and sorted order streams.
+
+`/orders/stream` can filter on `o_orderstatus` and `o_custkey` (equality)
+and on an `o_orderdate` range, and sort by `o_orderkey` or by
+`(o_orderdate, o_orderkey)`. A page boundary is the sort key of a row, so
+every page is a seek with a row comparison such as
+`(o_orderdate, o_orderkey) > (:date, :key)`. Each supported combination is
+served by an index whose leading columns are the equality filters followed
+by the sort key (see `services.orders.indexes`), which makes every page an
+index range scan.
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from enum import Enum
+from typing import Any, List, Optional, Sequence
+
+from models.orders import Order
+from sqlalchemy import Select, select, tuple_
+
+ORDER_COLUMNS = (
+    Order.o_orderkey,
+    Order.o_custkey,
+    Order.o_orderstatus,
+    Order.o_totalprice,
+    Order.o_orderdate,
+    Order.o_orderpriority,
+    Order.o_clerk,
+    Order.o_shippriority,
+    Order.o_comment,
+)
+
+
+class StreamSort(str, Enum):
+    """Sort orders supported by the order stream."""
+
+    ORDERKEY = "orderkey"
+    ORDERDATE = "orderdate"
+
+
+SORT_COLUMNS = {
+    StreamSort.ORDERKEY: (Order.o_orderkey,),
+    StreamSort.ORDERDATE: (Order.o_orderdate, Order.o_orderkey),
+}
+
+
+class InvalidStreamQueryError(ValueError):
+    """Raised for a filter, sort and cursor combination that cannot be served."""
+
+
+@dataclass(frozen=True)
+class StreamFilters:
+    """Filters applied to the order stream."""
+
+    status: Optional[str] = None
+    custkey: Optional[int] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+
+    @property
+    def has_date_range(self) -> bool:
+        return self.start_date is not None or self.end_date is not None
+
+
+def validate_stream_query(sort: StreamSort, filters: StreamFilters) -> None:
+    """
+    Check that a filter and sort combination is served by an index.
+
+    Raises:
+        InvalidStreamQueryError: If a date range is combined with another sort than orderdate
+    """
+    if filters.has_date_range and sort != StreamSort.ORDERDATE:
+        raise InvalidStreamQueryError("Date filters require sort=orderdate")
+
+
+def cursor_values(row: Any, sort: StreamSort) -> List[Any]:
+    """Return the JSON-serializable sort key of a row for a cursor."""
+    values = []
+    for column in SORT_COLUMNS[sort]:
+        value = getattr(row, column.key)
+        values.append(value.isoformat() if isinstance(value, date) else value)
+    return values
+
+
+def parse_cursor_values(sort: StreamSort, values: Sequence[Any]) -> List[Any]:
+    """
+    Convert the values of a decoded cursor back into sort key values.
+
+    Raises:
+        InvalidStreamQueryError: If the values do not match the sort key
+    """
+    columns = SORT_COLUMNS[sort]
+    if len(values) != len(columns):
+        raise InvalidStreamQueryError("Cursor does not match the requested sort")
+    try:
+        return [
+            date.fromisoformat(value) if column.key == "o_orderdate" else int(value)
+            for column, value in zip(columns, values)
+        ]
+    except (TypeError, ValueError) as e:
+        raise InvalidStreamQueryError("Cursor does not match the requested sort") from e
+
+
+def build_stream_query(
+    sort: StreamSort,
+    filters: StreamFilters,
+    boundary: Optional[List[Any]],
+    backward: bool,
+    limit: int,
+) -> Select:
+    """
+    Build the query for one page of the order stream.
+
+    Args:
+        sort: The sort order of the stream
+        filters: Filters to apply
+        boundary: Sort key of the row the page starts after (or before when
+            going backward), None for the first page
+        backward: Whether to read the rows before the boundary
+        limit: Maximum number of rows to read
+
+    Returns:
+        A select reading rows in sort order, or in reverse sort order when
+        going backward
+    """
+    columns = SORT_COLUMNS[sort]
+    stmt = select(*ORDER_COLUMNS)
+
+    if filters.status is not None:
+        stmt = stmt.where(Order.o_orderstatus == filters.status)
+    if filters.custkey is not None:
+        stmt = stmt.where(Order.o_custkey == filters.custkey)
+    if filters.start_date is not None:
+        stmt = stmt.where(Order.o_orderdate >= filters.start_date)
+    if filters.end_date is not None:
+        stmt = stmt.where(Order.o_orderdate <= filters.end_date)
+
+    if boundary is not None:
+        key = columns[0] if len(columns) == 1 else tuple_(*columns)
+        value = boundary[0] if len(columns) == 1 else tuple_(*boundary)
+        stmt = stmt.where(key < value if backward else key > value)
+
+    if backward:
+        stmt = stmt.order_by(*(column.desc() for column in columns))
+    else:
+        stmt = stmt.order_by(*columns)
+    return stmt.limit(limit)
@@ -0,0 +1,154 @@
+"""
+Cross-process order change notifications via Postgres LISTEN/NOTIFY.
+
+Status update statements emit one `pg_notify` per updated order as part of
+the same statement, so notifications are delivered only if the update
+commits. Every app process runs a listener on one dedicated connection to
+the primary and evicts the affected orders from its local cache, keeping
+caches consistent across workers and replicas.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from typing import Callable, List, Optional, Tuple
+
+from config import database
+from services.orders.cache import order_cache
+from sqlalchemy import Select, Text, Update, cast, func, literal, select
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_ENABLED = os.getenv("ORDERS_NOTIFY_ENABLED", "false").lower() == "true"
+NOTIFY_CHANNEL = os.getenv("ORDERS_NOTIFY_CHANNEL", "orders_changed")
+
+ChangeHandler = Callable[[int, str], None]
+
+
+def with_change_notifications(stmt: Update) -> Select:
+    """
+    Wrap an `UPDATE ... RETURNING o_orderkey, o_orderstatus` so that it notifies listeners.
+
+    Args:
+        stmt: The update statement returning at least the order key and status
+
+    Returns:
+        A statement returning the same columns that also calls `pg_notify`
+        for every updated row
+    """
+    updated = stmt.cte("updated")
+    return select(
+        *updated.c,
+        func.pg_notify(
+            literal(NOTIFY_CHANNEL),
+            cast(
+                func.json_build_array(updated.c.o_orderkey, updated.c.o_orderstatus),
+                Text,
+            ),
+        ),
+    )
+
+
+def parse_notification(payload: str) -> Tuple[int, str]:
+    """Parse a notification payload into an (order key, status) pair."""
+    order_key, status = json.loads(payload)
+    return int(order_key), status
+
+
+class OrderChangeListener:
+    """Listens for order change notifications on a dedicated connection."""
+
+    def __init__(self, enabled: bool, channel: str, reconnect_delay: float = 5.0):
+        """
+        Args:
+            enabled: Whether change notifications are used
+            channel: The notification channel to listen on
+            reconnect_delay: Seconds to wait before reconnecting after a failure
+        """
+        self.enabled = enabled
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self._handlers: List[ChangeHandler] = [self._evict]
+        self._task: Optional[asyncio.Task] = None
+        self._connected = asyncio.Event()
+
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
+    def add_handler(self, handler: ChangeHandler) -> None:
+        """Call `handler(order_key, status)` for every received change."""
+        self._handlers.append(handler)
+
+    def remove_handler(self, handler: ChangeHandler) -> None:
+        if handler in self._handlers:
+            self._handlers.remove(handler)
+
+    @staticmethod
+    def _evict(order_key: int, status: str) -> None:
+        order_cache.invalidate(order_key)
+
+    def _on_notification(self, connection, pid, channel, payload) -> None:
+        try:
+            order_key, status = parse_notification(payload)
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Ignoring malformed order change notification {payload!r}: {e}")
+            return
+        for handler in list(self._handlers):
+            try:
+                handler(order_key, status)
+            except Exception as e:
+                logger.error(f"Order change handler failed: {e}")
+
+    async def _listen_once(self) -> None:
+        # Detach a connection from the primary pool so it reuses the pool's
+        # connect arguments and token provider without reducing pool capacity
+        raw = await database.engine.raw_connection()
+        connection = raw.driver_connection
+        raw.detach()
+        closed = asyncio.Event()
+        connection.add_termination_listener(lambda _: closed.set())
+        try:
+            await connection.add_listener(self.channel, self._on_notification)
+            self._connected.set()
+            logger.info(f"Listening for order changes on channel '{self.channel}'")
+            await closed.wait()
+            logger.warning("Order change listener connection was closed")
+        finally:
+            self._connected.clear()
+            if not connection.is_closed():
+                await connection.close()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._listen_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Order change listener failed: {e}")
+            # Notifications may have been missed while disconnected
+            order_cache.clear()
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def start(self) -> None:
+        """Start listening in the background if notifications are enabled."""
+        if not self.enabled:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info("Order change listener started")
+
+    async def stop(self) -> None:
+        """Stop listening and close the dedicated connection."""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            logger.info("Order change listener stopped")
+
+
+order_change_listener = OrderChangeListener(enabled=NOTIFY_ENABLED, channel=NOTIFY_CHANNEL)
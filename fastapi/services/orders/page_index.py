@@ -0,0 +1,175 @@
+"""
+Sparse page index for page-number pagination over orders.
+
+The index keeps the `o_orderkey` found at every Nth row of `orders_synced`
+(N being the stride). A page number is translated into the nearest boundary
+key at or before the page's first row, so the page query becomes a keyset
+seek followed by an OFFSET of less than one stride, instead of an OFFSET
+that grows with the page number.
+
+Every invalidation or rebuild request starts a new generation of the index.
+A build that finishes after a newer generation was started is discarded,
+so boundaries read before a synced-table refresh are never installed after
+it.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import List, Optional, Tuple
+
+from config import database
+from models.orders import Order
+from sqlalchemy import func, select
+
+logger = logging.getLogger(__name__)
+
+
+class PageIndex:
+    """In-memory boundary keys for translating row offsets into keyset seeks."""
+
+    def __init__(self, stride: int, refresh_interval: int = 0):
+        """
+        Args:
+            stride: Number of rows between two boundary keys
+            refresh_interval: Seconds between background rebuilds (0 to build once)
+        """
+        if stride < 1:
+            raise ValueError("Page index stride must be at least 1")
+        self.stride = stride
+        self.refresh_interval = refresh_interval
+        self._boundaries: List[int] = []
+        self._built_at: Optional[float] = None
+        self._generation = 0
+        self._rebuild_requested = False
+        self._lock = asyncio.Lock()
+        self._build_task: Optional[asyncio.Task] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        """Whether the index has been built and not invalidated since."""
+        return self._built_at is not None
+
+    @property
+    def building(self) -> bool:
+        """Whether a rebuild is currently running."""
+        return self._lock.locked()
+
+    @property
+    def boundary_count(self) -> int:
+        return len(self._boundaries)
+
+    @property
+    def built_at(self) -> Optional[float]:
+        return self._built_at
+
+    def seek(self, offset: int) -> Optional[Tuple[int, int]]:
+        """
+        Translate a row offset into a keyset seek.
+
+        Args:
+            offset: Zero-based row offset of the first row of the page
+
+        Returns:
+            A tuple of (boundary key to start at, inclusive; remaining rows to
+            skip) or None if the index is not available
+        """
+        if not self.ready or not self._boundaries:
+            return None
+        slot = min(offset // self.stride, len(self._boundaries) - 1)
+        return self._boundaries[slot], offset - slot * self.stride
+
+    def invalidate(self) -> None:
+        """Discard the index, e.g. after the synced table has been refreshed."""
+        # A build already running read the table before this point
+        self._generation += 1
+        self._boundaries = []
+        self._built_at = None
+        logger.info("Orders page index invalidated")
+
+    async def rebuild(self) -> bool:
+        """
+        Rebuild the index from `orders_synced`.
+
+        Returns:
+            bool: False if the index was invalidated or another rebuild was
+            requested while building, in which case the result is discarded
+        """
+        async with self._lock:
+            generation = self._generation
+            started = time.time()
+            row_number = func.row_number().over(order_by=Order.o_orderkey)
+            numbered = select(
+                Order.o_orderkey.label("o_orderkey"), row_number.label("rn")
+            ).subquery()
+            stmt = (
+                select(numbered.c.o_orderkey)
+                .where((numbered.c.rn - 1) % self.stride == 0)
+                .order_by(numbered.c.o_orderkey)
+            )
+
+            async with database.get_read_sessionmaker()() as session:
+                result = await session.execute(stmt)
+                boundaries = list(result.scalars().all())
+
+            if generation != self._generation:
+                logger.info("Orders page index build discarded: superseded while building")
+                return False
+            self._boundaries = boundaries
+            self._built_at = time.time()
+            logger.info(
+                f"Orders page index built with {len(boundaries)} boundaries "
+                f"(stride {self.stride}) in {(self._built_at - started) * 1000:.1f}ms"
+            )
+            return True
+
+    def schedule_rebuild(self) -> asyncio.Task:
+        """Start a rebuild in the background, or build again once the running one ends."""
+        self._generation += 1
+        if self._build_task is None or self._build_task.done():
+            self._build_task = asyncio.create_task(self._rebuild_logged())
+        else:
+            self._rebuild_requested = True
+        return self._build_task
+
+    async def _rebuild_logged(self) -> None:
+        while True:
+            self._rebuild_requested = False
+            try:
+                await self.rebuild()
+            except Exception as e:
+                logger.error(f"Orders page index rebuild failed: {e}")
+            if not self._rebuild_requested:
+                return
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await self.schedule_rebuild()
+            if self.refresh_interval <= 0:
+                return
+            await asyncio.sleep(self.refresh_interval)
+
+    async def start(self) -> None:
+        """Build the index in the background and keep it refreshed."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+            logger.info("Orders page index background build started")
+
+    async def stop(self) -> None:
+        """Stop background building and refreshing."""
+        for task in (self._refresh_task, self._build_task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        logger.info("Orders page index background build stopped")
+
+
+page_index = PageIndex(
+    stride=int(os.getenv("ORDERS_PAGE_INDEX_STRIDE", "1000")),
+    refresh_interval=int(os.getenv("ORDERS_PAGE_INDEX_REFRESH_INTERVAL", "0")),
+)
@@ -0,0 +1,128 @@
+"""
+Random samples of order keys.
+
+Three methods are supported:
+
+- keyrange: draws random keys between the smallest and largest order key
+  and takes the first existing key at or after each of them, one index
+  probe per key in a single statement. Keys that follow a gap in the key
+  space are picked more often.
+- system: `TABLESAMPLE SYSTEM`, which reads a random subset of the table's
+  pages; rows of the same page are sampled together.
+- bernoulli: `TABLESAMPLE BERNOULLI`, which samples individual rows
+  uniformly but has to read every page of the table.
+
+keyrange and system read a number of pages that depends on the sample size
+only, not on the size of the table. A seed makes any method repeatable for
+an unchanged table.
+"""
+
+import random
+from enum import Enum
+from typing import List, Optional
+
+from models.orders import Order
+from services.orders.counts import CountMode, order_counts
+from sqlalchemy import BigInteger, bindparam, func, literal, select, true
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Sampled rows requested per wanted key, so that sparse pages still yield enough
+_OVERSAMPLE = 2
+# Attempts to top up a sample that came back short
+_MAX_ATTEMPTS = 4
+
+
+class SampleMethod(str, Enum):
+    """How order keys are sampled."""
+
+    KEYRANGE = "keyrange"
+    SYSTEM = "system"
+    BERNOULLI = "bernoulli"
+
+
+async def sample_order_keys(
+    db: AsyncSession, size: int, method: SampleMethod, seed: Optional[int] = None
+) -> List[int]:
+    """
+    Draw a random sample of distinct order keys.
+
+    Args:
+        db: Database session
+        size: Number of keys to return
+        method: The sampling method
+        seed: Seed making the sample repeatable
+
+    Returns:
+        Up to `size` distinct order keys in random order; fewer only if the
+        table has fewer orders
+    """
+    rng = random.Random(seed)
+    if method == SampleMethod.KEYRANGE:
+        keys = await _sample_keyrange(db, size, rng)
+    else:
+        keys = await _sample_tablesample(db, size, method, seed)
+    rng.shuffle(keys)
+    return keys[:size]
+
+
+async def _sample_keyrange(db: AsyncSession, size: int, rng: random.Random) -> List[int]:
+    result = await db.execute(select(func.min(Order.o_orderkey), func.max(Order.o_orderkey)))
+    low, high = result.one()
+    if low is None:
+        return []
+
+    probes = (
+        func.unnest(bindparam("probes", type_=ARRAY(BigInteger)))
+        .table_valued("key")
+        .render_derived(name="probes")
+    )
+    next_key = (
+        select(Order.o_orderkey)
+        .where(Order.o_orderkey >= probes.c.key)
+        .order_by(Order.o_orderkey)
+        .limit(1)
+        .lateral("next_key")
+    )
+    stmt = select(next_key.c.o_orderkey).select_from(probes.join(next_key, true()))
+
+    keys: List[int] = []
+    seen = set()
+    for _ in range(_MAX_ATTEMPTS):
+        # A few extra probes make up for probes landing on the same key
+        wanted = size - len(keys)
+        probe_keys = [rng.randint(low, high) for _ in range(wanted + wanted // 10 + 1)]
+        result = await db.execute(stmt, {"probes": probe_keys})
+        for key in result.scalars():
+            if key not in seen:
+                seen.add(key)
+                keys.append(key)
+        if len(keys) >= size:
+            break
+    return keys
+
+
+async def _sample_tablesample(
+    db: AsyncSession, size: int, method: SampleMethod, seed: Optional[int]
+) -> List[int]:
+    estimate = await order_counts.get(db, mode=CountMode.APPROXIMATE)
+    total = max(estimate.value, 1)
+    percent = min(100.0, size * _OVERSAMPLE * 100.0 / total)
+
+    sampler = func.system if method == SampleMethod.SYSTEM else func.bernoulli
+    keys: List[int] = []
+    for _ in range(_MAX_ATTEMPTS):
+        sampled = Order.__table__.tablesample(
+            sampler(percent),
+            name="sampled",
+            seed=literal(seed) if seed is not None else None,
+        )
+        result = await db.execute(
+            select(sampled.c.o_orderkey).limit(size * _OVERSAMPLE * 2)
+        )
+        keys = list(result.scalars())
+        # Statistics may be stale or pages sparse; widen the sample and retry
+        if len(keys) >= size or percent >= 100.0:
+            break
+        percent = min(100.0, percent * 4)
+    return keys
@@ -0,0 +1,82 @@
+"""
+Substring search over order comments.
+
+Searches match `o_comment ILIKE '%<text>%'`, which the `pg_trgm` GIN index
+on `o_comment` answers from the trigrams of the search text instead of a
+full scan. Matches are ranked by `word_similarity(<text>, o_comment)` and
+paginated with a keyset on (rank, o_orderkey). Every search runs with a
+statement timeout, so a fragment that matches too much of the table fails
+fast instead of tying up a connection.
+"""
+
+import os
+from typing import Any, List, Optional
+
+from models.orders import Order
+from services.orders.keyset import ORDER_COLUMNS
+from sqlalchemy import Select, and_, bindparam, func, or_, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+SEARCH_TIMEOUT_MS = int(os.getenv("ORDERS_SEARCH_TIMEOUT_MS", "2000"))
+
+# Trigram indexes cannot narrow down shorter search texts
+MIN_SEARCH_LENGTH = 3
+
+_QUERY_CANCELED = "57014"
+_UNDEFINED_FUNCTION = "42883"
+
+_SET_TIMEOUT_SQL = text("SELECT set_config('statement_timeout', :timeout, true)")
+
+
+def escape_like(value: str) -> str:
+    """Escape LIKE wildcards so the search text matches literally."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def build_search_query(
+    query: str, after: Optional[List[Any]], limit: int
+) -> Select:
+    """
+    Build the query for one page of search results.
+
+    Args:
+        query: Text to search for in order comments
+        after: (rank, o_orderkey) of the last result of the previous page
+        limit: Maximum number of rows to read
+
+    Returns:
+        A select of the order columns and a `rank` column, best matches first
+    """
+    search_text = bindparam("search_text", query)
+    rank = func.word_similarity(search_text, Order.o_comment)
+    stmt = select(*ORDER_COLUMNS, rank.label("rank")).where(
+        Order.o_comment.ilike(f"%{escape_like(query)}%", escape="\\")
+    )
+    if after is not None:
+        after_rank, after_key = after
+        stmt = stmt.where(
+            or_(rank < after_rank, and_(rank == after_rank, Order.o_orderkey > after_key))
+        )
+    return stmt.order_by(rank.desc(), Order.o_orderkey).limit(limit)
+
+
+async def set_statement_timeout(db: AsyncSession, timeout_ms: int) -> None:
+    """Limit the run time of the statements in the current transaction."""
+    await db.execute(_SET_TIMEOUT_SQL, {"timeout": str(timeout_ms)})
+
+
+def _sqlstate(error: Exception) -> Optional[str]:
+    if isinstance(error, DBAPIError):
+        return getattr(error.orig, "sqlstate", None)
+    return None
+
+
+def is_statement_timeout(error: Exception) -> bool:
+    """Return whether a database error was raised by the statement timeout."""
+    return _sqlstate(error) == _QUERY_CANCELED
+
+
+def is_search_unavailable(error: Exception) -> bool:
+    """Return whether a search failed because the pg_trgm extension is missing."""
+    return _sqlstate(error) == _UNDEFINED_FUNCTION
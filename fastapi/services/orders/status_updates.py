@@ -0,0 +1,179 @@
+"""
+Order status updates.
+
+Status changes are written with Core `UPDATE ... RETURNING` statements so
+that an update is a single statement: no ORM load beforehand and no
+refresh afterwards. Bulk updates join the table against `unnest()` of two
+array parameters, applying a whole chunk of changes in one statement.
+Cached copies of updated orders are invalidated once the change is committed,
+and when change notifications are enabled the same statement notifies the
+other app processes so they can evict their copies too.
+
+When the order summary is maintained, the statements also return each
+order's previous status, read with `FOR UPDATE` in a self-join so that it is
+the status the update replaced, and the summary is adjusted in the same
+transaction.
+"""
+
+import logging
+import os
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from models.orders import Order
+from services.orders.cache import order_cache
+from services.orders.notifications import NOTIFY_ENABLED, with_change_notifications
+from services.orders.summary import SUMMARY_ENABLED, adjust_order_summary
+from sqlalchemy import BigInteger, Text, Update, any_, bindparam, func, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+orders_table = Order.__table__
+
+BULK_UPDATE_CHUNK_SIZE = int(os.getenv("ORDERS_BULK_UPDATE_CHUNK_SIZE", "5000"))
+
+_order_keys = bindparam("order_keys", type_=ARRAY(BigInteger))
+
+_bulk_values = (
+    func.unnest(
+        _order_keys,
+        bindparam("statuses", type_=ARRAY(Text)),
+    )
+    .table_valued("o_orderkey", "o_orderstatus")
+    .render_derived(name="changes")
+)
+
+
+
+def _returning(stmt: Update, keys_clause) -> Update:
+    """Add the RETURNING clause, with the previous status when the summary is maintained."""
+    if not SUMMARY_ENABLED:
+        return stmt.returning(orders_table.c.o_orderkey, orders_table.c.o_orderstatus)
+    previous = (
+        select(
+            orders_table.c.o_orderkey,
+            orders_table.c.o_orderstatus.label("previous_status"),
+        )
+        .where(keys_clause)
+        .with_for_update()
+        .subquery("previous")
+    )
+    return stmt.where(orders_table.c.o_orderkey == previous.c.o_orderkey).returning(
+        orders_table.c.o_orderkey,
+        orders_table.c.o_orderstatus,
+        previous.c.previous_status,
+        orders_table.c.o_orderdate,
+        orders_table.c.o_orderpriority,
+        orders_table.c.o_totalprice,
+    )
+
+
+_bulk_update_stmt = _returning(
+    update(orders_table)
+    .values(o_orderstatus=_bulk_values.c.o_orderstatus)
+    .where(orders_table.c.o_orderkey == _bulk_values.c.o_orderkey),
+    orders_table.c.o_orderkey == any_(_order_keys),
+)
+if NOTIFY_ENABLED:
+    _bulk_update_stmt = with_change_notifications(_bulk_update_stmt)
+
+
+@dataclass(frozen=True)
+class StatusChange:
+    """The outcome of a status update for one order."""
+
+    o_orderkey: int
+    o_orderstatus: str
+
+
+async def apply_status_update(
+    db: AsyncSession, order_key: int, status: str
+) -> Optional[StatusChange]:
+    """
+    Set the status of one order and commit.
+
+    Args:
+        db: Database session
+        order_key: The key of the order to update
+        status: The new order status
+
+    Returns:
+        The updated order key and status, or None if the order does not exist
+    """
+    stmt = _returning(
+        update(orders_table)
+        .where(orders_table.c.o_orderkey == order_key)
+        .values(o_orderstatus=status),
+        orders_table.c.o_orderkey == order_key,
+    )
+    if NOTIFY_ENABLED:
+        stmt = with_change_notifications(stmt)
+    result = await db.execute(stmt)
+    row = result.first()
+    if SUMMARY_ENABLED and row is not None:
+        await adjust_order_summary(db, [row])
+    await db.commit()
+
+    if row is None:
+        return None
+    order_cache.invalidate(row.o_orderkey)
+    return StatusChange(o_orderkey=row.o_orderkey, o_orderstatus=row.o_orderstatus)
+
+
+async def apply_bulk_status_updates(
+    db: AsyncSession,
+    updates: Sequence[Tuple[int, str]],
+    chunk_size: int = BULK_UPDATE_CHUNK_SIZE,
+) -> List[StatusChange]:
+    """
+    Set the status of many orders in one transaction.
+
+    Updates are sent in chunks of `UPDATE ... FROM unnest(:order_keys, :statuses)`
+    statements and committed together. If the same order appears more than
+    once, the last status wins. Orders are updated in ascending key order, so
+    that concurrent bulk updates lock shared rows in the same order instead
+    of deadlocking.
+
+    Args:
+        db: Database session
+        updates: Pairs of (order key, new status)
+        chunk_size: Maximum number of orders updated per statement
+
+    Returns:
+        The orders that were updated; keys that do not exist are left out
+    """
+    latest = dict(updates)
+    order_keys = sorted(latest)
+    changes: List[StatusChange] = []
+    rows = []
+
+    try:
+        for start in range(0, len(order_keys), chunk_size):
+            chunk = order_keys[start : start + chunk_size]
+            result = await db.execute(
+                _bulk_update_stmt,
+                {"order_keys": chunk, "statuses": [latest[key] for key in chunk]},
+            )
+            chunk_rows = list(result)
+            changes.extend(
+                StatusChange(o_orderkey=row.o_orderkey, o_orderstatus=row.o_orderstatus)
+                for row in chunk_rows
+            )
+            if SUMMARY_ENABLED:
+                rows.extend(chunk_rows)
+        if rows:
+            await adjust_order_summary(db, rows)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+    for change in changes:
+        order_cache.invalidate(change.o_orderkey)
+
+    logger.info(
+        f"Bulk status update applied to {len(changes)} of {len(order_keys)} orders"
+    )
+    return changes
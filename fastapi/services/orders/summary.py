@@ -0,0 +1,309 @@
+"""
+Pre-aggregated order analytics.
+
+Order counts and `sum(o_totalprice)` per status, priority and period would
+otherwise be a full scan of `orders_synced` per request. They are served
+from `orders_daily_summary` instead, which holds one row per
+`(o_orderdate, o_orderstatus, o_orderpriority)` and is rolled up to weeks,
+months, quarters or years with `date_trunc` at query time.
+
+The summary is kept current in two ways:
+
+- Status updates move their orders from the previous status to the new one
+  in the same transaction, so the summary never lags behind committed
+  updates made through the API.
+- A background task recomputes the whole summary periodically, picking up
+  changes made outside the API such as a refresh of the synced table. The
+  recompute holds an `EXCLUSIVE` lock on the summary table: reads go on,
+  while status updates wait until it commits so that none of their
+  adjustments are lost.
+"""
+
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from enum import Enum
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from config import database
+from models.orders import Order, OrderDailySummary
+from sqlalchemy import (
+    BigInteger,
+    Date,
+    Row,
+    Select,
+    cast,
+    delete,
+    func,
+    insert,
+    literal,
+    select,
+    text,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_ENABLED = os.getenv("ORDERS_SUMMARY_ENABLED", "false").lower() == "true"
+
+summary_table = OrderDailySummary.__table__
+orders_table = Order.__table__
+
+# Advisory lock key letting a single app process recompute the summary at a time
+_REFRESH_LOCK_KEY = 0x6F7264737573  # "ordsus"
+
+SummaryKey = Tuple[date, str, str]
+
+
+class SummaryDimension(str, Enum):
+    """Dimensions the order summary can be grouped by."""
+
+    STATUS = "status"
+    PRIORITY = "priority"
+    DATE = "date"
+
+
+class SummaryPeriod(str, Enum):
+    """Periods order dates are truncated to when grouping by date."""
+
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+    QUARTER = "quarter"
+    YEAR = "year"
+
+
+def summary_deltas(rows: Iterable[Row]) -> Dict[SummaryKey, List]:
+    """
+    Compute the summary adjustments for a set of status changes.
+
+    Args:
+        rows: Updated orders with `o_orderdate`, `o_orderpriority`,
+            `o_totalprice`, `previous_status` and the new `o_orderstatus`
+
+    Returns:
+        The `[order_count, total_price]` change per summary row, leaving
+        out rows whose totals do not change
+    """
+    deltas: Dict[SummaryKey, List] = defaultdict(lambda: [0, Decimal(0)])
+    for row in rows:
+        if row.previous_status == row.o_orderstatus:
+            continue
+        price = row.o_totalprice or Decimal(0)
+        previous = deltas[(row.o_orderdate, row.previous_status, row.o_orderpriority)]
+        previous[0] -= 1
+        previous[1] -= price
+        current = deltas[(row.o_orderdate, row.o_orderstatus, row.o_orderpriority)]
+        current[0] += 1
+        current[1] += price
+    return {key: delta for key, delta in deltas.items() if delta[0] or delta[1]}
+
+
+async def adjust_order_summary(db: AsyncSession, rows: Iterable[Row]) -> None:
+    """
+    Apply status changes to the summary within the caller's transaction.
+
+    Args:
+        db: Session of the transaction that updated the orders
+        rows: Updated orders as described in `summary_deltas`
+    """
+    deltas = summary_deltas(rows)
+    if not deltas:
+        return
+    # Upsert in key order so concurrent adjustments lock rows in the same order
+    values = [
+        {
+            "o_orderdate": key[0],
+            "o_orderstatus": key[1],
+            "o_orderpriority": key[2],
+            "order_count": count,
+            "total_price": price,
+        }
+        for key, (count, price) in sorted(deltas.items())
+    ]
+    stmt = pg_insert(summary_table).values(values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            summary_table.c.o_orderdate,
+            summary_table.c.o_orderstatus,
+            summary_table.c.o_orderpriority,
+        ],
+        set_={
+            "order_count": summary_table.c.order_count + stmt.excluded.order_count,
+            "total_price": summary_table.c.total_price + stmt.excluded.total_price,
+        },
+    )
+    await db.execute(stmt)
+
+
+def build_summary_query(
+    group_by: Sequence[SummaryDimension],
+    period: SummaryPeriod = SummaryPeriod.MONTH,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> Select:
+    """
+    Build the query rolling the daily summary up to the requested groups.
+
+    Args:
+        group_by: Dimensions to group by; none gives a single grand total
+        period: Period order dates are truncated to when grouping by date
+        start_date: First order date to include
+        end_date: Last order date to include
+
+    Returns:
+        A select returning `period`, `o_orderstatus`, `o_orderpriority`,
+        `order_count` and `total_price`, with NULL for dimensions not grouped by
+    """
+    groups = []
+    if SummaryDimension.DATE in group_by:
+        period_column = cast(
+            func.date_trunc(period.value, summary_table.c.o_orderdate), Date
+        ).label("period")
+        groups.append(period_column)
+    else:
+        period_column = literal(None, Date).label("period")
+    if SummaryDimension.STATUS in group_by:
+        status_column = summary_table.c.o_orderstatus
+        groups.append(status_column)
+    else:
+        status_column = literal(None).label("o_orderstatus")
+    if SummaryDimension.PRIORITY in group_by:
+        priority_column = summary_table.c.o_orderpriority
+        groups.append(priority_column)
+    else:
+        priority_column = literal(None).label("o_orderpriority")
+
+    stmt = select(
+        period_column,
+        status_column,
+        priority_column,
+        cast(func.coalesce(func.sum(summary_table.c.order_count), 0), BigInteger).label(
+            "order_count"
+        ),
+        func.coalesce(func.sum(summary_table.c.total_price), 0).label("total_price"),
+    )
+    if start_date is not None:
+        stmt = stmt.where(summary_table.c.o_orderdate >= start_date)
+    if end_date is not None:
+        stmt = stmt.where(summary_table.c.o_orderdate <= end_date)
+    if groups:
+        # Adjustments can leave rows at zero until the next recompute
+        stmt = stmt.group_by(*groups).having(func.sum(summary_table.c.order_count) > 0)
+        stmt = stmt.order_by(*groups)
+    return stmt
+
+
+class OrderSummaryRefresher:
+    """Recomputes the order summary in the background."""
+
+    def __init__(self, enabled: bool, refresh_interval: float):
+        """
+        Args:
+            enabled: Whether the summary is maintained
+            refresh_interval: Seconds between full recomputes
+        """
+        self.enabled = enabled
+        self.refresh_interval = refresh_interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def refresh(self) -> bool:
+        """
+        Recompute the whole summary from the orders table.
+
+        Returns:
+            False if another process was already recomputing it
+        """
+        async with database.engine.begin() as conn:
+            result = await conn.execute(
+                select(func.pg_try_advisory_xact_lock(_REFRESH_LOCK_KEY))
+            )
+            if not result.scalar():
+                return False
+            # Waits for in-flight status updates, whose changes the
+            # aggregation below then sees as committed
+            await conn.execute(
+                text(f"LOCK TABLE {summary_table.fullname} IN EXCLUSIVE MODE")
+            )
+            await conn.execute(delete(summary_table))
+            aggregated = (
+                select(
+                    orders_table.c.o_orderdate,
+                    orders_table.c.o_orderstatus,
+                    orders_table.c.o_orderpriority,
+                    func.count(),
+                    func.coalesce(func.sum(orders_table.c.o_totalprice), 0),
+                )
+                .where(
+                    orders_table.c.o_orderdate.is_not(None),
+                    orders_table.c.o_orderstatus.is_not(None),
+                    orders_table.c.o_orderpriority.is_not(None),
+                )
+                .group_by(
+                    orders_table.c.o_orderdate,
+                    orders_table.c.o_orderstatus,
+                    orders_table.c.o_orderpriority,
+                )
+            )
+            result = await conn.execute(
+                insert(summary_table).from_select(
+                    [
+                        "o_orderdate",
+                        "o_orderstatus",
+                        "o_orderpriority",
+                        "order_count",
+                        "total_price",
+                    ],
+                    aggregated,
+                )
+            )
+        logger.info(f"Order summary recomputed: {result.rowcount} rows")
+        return True
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Order summary refresh failed: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+    async def create_table(self) -> None:
+        """Create the summary table if it does not exist yet."""
+        async with database.engine.begin() as conn:
+            # Serializes the existence check with other processes starting up
+            await conn.execute(select(func.pg_advisory_xact_lock(_REFRESH_LOCK_KEY)))
+            await conn.run_sync(summary_table.create, checkfirst=True)
+
+    async def start(self) -> None:
+        """If the summary is enabled, create its table and start the background refresh task."""
+        if not self.enabled:
+            return
+        try:
+            await self.create_table()
+        except Exception as e:
+            logger.error(f"Failed to create the order summary table: {e}")
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh_loop())
+            logger.info("Order summary refresh task started")
+
+    async def stop(self) -> None:
+        """Stop the background refresh task."""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            logger.info("Order summary refresh task stopped")
+
+
+order_summary = OrderSummaryRefresher(
+    enabled=SUMMARY_ENABLED,
+    refresh_interval=float(os.getenv("ORDERS_SUMMARY_REFRESH_INTERVAL", "3600")),
+)
@@ -0,0 +1,216 @@
+"""
+Downsampled order time series.
+
+Charts ask for order volume and value over a date range at a target number
+of points. The bucket width is the narrowest of a fixed ladder (1, 2, 3, 7
+and 14 days, calendar months, quarters and years) that yields at most that
+many buckets, and the aggregation runs in Postgres with `date_bin` for day
+widths and `date_trunc` for calendar widths. The response therefore never
+holds more points than requested, however many orders the range contains.
+
+Day buckets are aligned on a fixed origin (a Monday) rather than on the
+start of the range, so overlapping zooms share bucket edges. Buckets are
+read from the daily order summary when it is maintained, otherwise from the
+orders table, and cached per (range, bucket width).
+"""
+
+import os
+import sys
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import List, Optional, Tuple
+
+from models.orders import Order
+from services.orders.cache import TTLCache
+from services.orders.summary import SUMMARY_ENABLED, summary_table
+from sqlalchemy import BigInteger, Date, DateTime, cast, func, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+MAX_POINTS = int(os.getenv("ORDERS_TIMESERIES_MAX_POINTS", "1000"))
+
+# A Monday, so that 7 and 14 day buckets start on Mondays. It precedes every
+# order date: some Postgres releases have date_bin return a bucket one stride
+# too early for timestamps before the origin by an exact multiple of the stride.
+BUCKET_ORIGIN = date(1900, 1, 1)
+
+
+class InvalidTimeSeriesQueryError(ValueError):
+    """Raised for a date range that cannot be downsampled to the requested points."""
+
+
+@dataclass(frozen=True)
+class BucketWidth:
+    """The width of a time series bucket: a number of days or a calendar unit."""
+
+    name: str
+    days: Optional[int] = None
+    unit: Optional[str] = None
+
+    def count(self, start: date, end: date) -> int:
+        """Return the number of buckets covering the dates from start to end."""
+        first, last = self.floor(start), self.floor(end)
+        if self.days is not None:
+            return (last - first).days // self.days + 1
+        months = (last.year - first.year) * 12 + last.month - first.month
+        return months // {"month": 1, "quarter": 3, "year": 12}[self.unit] + 1
+
+    def floor(self, day: date) -> date:
+        """Return the start of the bucket holding a date."""
+        if self.days is not None:
+            return day - timedelta(days=(day - BUCKET_ORIGIN).days % self.days)
+        if self.unit == "year":
+            return date(day.year, 1, 1)
+        if self.unit == "quarter":
+            return date(day.year, (day.month - 1) // 3 * 3 + 1, 1)
+        return date(day.year, day.month, 1)
+
+    def next(self, bucket_start: date) -> date:
+        """Return the start of the bucket following the one starting at bucket_start."""
+        if self.days is not None:
+            return bucket_start + timedelta(days=self.days)
+        months = {"month": 1, "quarter": 3, "year": 12}[self.unit]
+        index = bucket_start.year * 12 + bucket_start.month - 1 + months
+        return date(index // 12, index % 12 + 1, 1)
+
+    def expression(self, column):
+        """Return the SQL expression truncating a date column to its bucket start."""
+        if self.days is not None:
+            return cast(
+                func.date_bin(
+                    literal(timedelta(days=self.days)),
+                    cast(column, DateTime),
+                    cast(literal(BUCKET_ORIGIN), DateTime),
+                ),
+                Date,
+            )
+        return cast(func.date_trunc(self.unit, column), Date)
+
+
+BUCKET_WIDTHS = [
+    BucketWidth("1 day", days=1),
+    BucketWidth("2 days", days=2),
+    BucketWidth("3 days", days=3),
+    BucketWidth("7 days", days=7),
+    BucketWidth("14 days", days=14),
+    BucketWidth("month", unit="month"),
+    BucketWidth("quarter", unit="quarter"),
+    BucketWidth("year", unit="year"),
+]
+
+
+def choose_bucket_width(start: date, end: date, points: int) -> BucketWidth:
+    """
+    Pick the narrowest bucket width giving at most `points` buckets.
+
+    Args:
+        start: First date of the range
+        end: Last date of the range
+        points: Maximum number of buckets
+
+    Returns:
+        BucketWidth: The chosen width
+
+    Raises:
+        InvalidTimeSeriesQueryError: If even yearly buckets are too many
+    """
+    for width in BUCKET_WIDTHS:
+        if width.count(start, end) <= points:
+            return width
+    raise InvalidTimeSeriesQueryError(
+        f"Yearly buckets over this range exceed {points} points; "
+        "request more points or a shorter range"
+    )
+
+
+@dataclass(frozen=True)
+class TimeSeriesPoint:
+    """Order totals of one bucket; bucket_end is exclusive."""
+
+    bucket_start: date
+    bucket_end: date
+    order_count: int
+    total_price: Decimal
+
+
+def _sizeof(points: List[TimeSeriesPoint]) -> int:
+    if not points:
+        return sys.getsizeof(points)
+    point = points[0]
+    per_point = sys.getsizeof(point) + sum(
+        sys.getsizeof(value) for value in point.__dict__.values()
+    )
+    return sys.getsizeof(points) + per_point * len(points)
+
+
+timeseries_cache = TTLCache(
+    max_entries=int(os.getenv("ORDERS_TIMESERIES_CACHE_MAX_ENTRIES", "256")),
+    max_bytes=int(os.getenv("ORDERS_TIMESERIES_CACHE_MAX_BYTES", str(16 * 1024 * 1024))),
+    ttl=float(os.getenv("ORDERS_TIMESERIES_CACHE_TTL", "300")),
+    sizeof=_sizeof,
+)
+
+
+async def order_date_range(db: AsyncSession) -> Tuple[Optional[date], Optional[date]]:
+    """Return the first and last order dates."""
+    column = summary_table.c.o_orderdate if SUMMARY_ENABLED else Order.o_orderdate
+    result = await db.execute(select(func.min(column), func.max(column)))
+    return tuple(result.one())
+
+
+async def _load_points(
+    db: AsyncSession, start: date, end: date, width: BucketWidth
+) -> List[TimeSeriesPoint]:
+    if SUMMARY_ENABLED:
+        column = summary_table.c.o_orderdate
+        order_count = func.sum(summary_table.c.order_count)
+        total_price = func.sum(summary_table.c.total_price)
+    else:
+        column = Order.o_orderdate
+        order_count = func.count()
+        total_price = func.sum(Order.o_totalprice)
+
+    bucket = width.expression(column).label("bucket")
+    stmt = (
+        select(
+            bucket,
+            cast(order_count, BigInteger).label("order_count"),
+            func.coalesce(total_price, 0).label("total_price"),
+        )
+        .where(column >= start, column <= end)
+        .group_by(bucket)
+        .order_by(bucket)
+    )
+    result = await db.execute(stmt)
+    return [
+        TimeSeriesPoint(
+            bucket_start=row.bucket,
+            bucket_end=width.next(row.bucket),
+            order_count=row.order_count,
+            total_price=row.total_price,
+        )
+        for row in result
+        if row.order_count
+    ]
+
+
+async def order_time_series(
+    db: AsyncSession, start: date, end: date, width: BucketWidth
+) -> List[TimeSeriesPoint]:
+    """
+    Get order counts and total prices per bucket, from cache if possible.
+
+    Args:
+        db: Database session used on a cache miss
+        start: First order date to include
+        end: Last order date to include
+        width: The bucket width
+
+    Returns:
+        One point per bucket holding orders, in date order; the first and
+        last buckets may extend beyond the range but only count orders in it
+    """
+    key = ("summary" if SUMMARY_ENABLED else "orders", start, end, width.name)
+    return await timeseries_cache.get_or_load(
+        key, lambda: _load_points(db, start, end, width)
+    )
@@ -0,0 +1,205 @@
+"""
+Write-behind queue for order status updates.
+
+When enabled, status updates are collected in memory keyed by `o_orderkey`
+and written by a background flusher as bulk statements, either every
+flush interval or as soon as the queue holds a full batch. Repeated
+updates to the same order before a flush are coalesced and only the last
+status is written. Callers that need durability can await the future
+returned by `submit`, which resolves once the update is committed.
+
+A failed flush puts its updates back in the queue, behind any newer update
+of the same order, and the flusher retries with exponential backoff until
+the database accepts them. Updates still queued when a shutdown flush
+fails are lost, which is logged.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+
+from config import database
+from services.monitoring.metrics import WRITE_BEHIND_FAILED_FLUSHES
+from services.orders.status_updates import StatusChange, apply_bulk_status_updates
+
+logger = logging.getLogger(__name__)
+
+
+def _consume_exception(future: asyncio.Future) -> None:
+    # Updates are often submitted without waiting; failures are logged by the
+    # flusher, so avoid "exception was never retrieved" warnings
+    if not future.cancelled():
+        future.exception()
+
+
+class StatusWriteBehind:
+    """Coalesces order status updates and flushes them in batches."""
+
+    def __init__(
+        self,
+        enabled: bool,
+        flush_interval: float,
+        max_batch: int,
+        retry_initial: float = 0.1,
+        retry_max: float = 5.0,
+    ):
+        """
+        Args:
+            enabled: Whether status updates should go through the queue
+            flush_interval: Seconds between flushes
+            max_batch: Number of queued orders that triggers an immediate flush
+            retry_initial: Seconds before retrying a failed flush, doubled on
+                every consecutive failure
+            retry_max: Maximum seconds between flush retries
+        """
+        self.enabled = enabled
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.retry_initial = retry_initial
+        self.retry_max = retry_max
+        # Consecutive failed flushes, reset by a successful one
+        self.failures = 0
+        self._pending: Dict[int, Tuple[str, List[asyncio.Future]]] = {}
+        self._wakeup = asyncio.Event()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def retry_delay(self) -> float:
+        """Return the seconds to wait after `failures` consecutive failed flushes."""
+        return min(self.retry_max, self.retry_initial * 2 ** (self.failures - 1))
+
+    def _requeue(self, batch: Dict[int, Tuple[str, List[asyncio.Future]]]) -> None:
+        for order_key, (status, waiters) in batch.items():
+            newer = self._pending.get(order_key)
+            if newer is None:
+                self._pending[order_key] = (status, waiters)
+            else:
+                # An update submitted meanwhile wins; earlier waiters resolve with it
+                newer_status, newer_waiters = newer
+                self._pending[order_key] = (newer_status, waiters + newer_waiters)
+
+    def submit(self, order_key: int, status: str) -> asyncio.Future:
+        """
+        Queue a status update.
+
+        Args:
+            order_key: The key of the order to update
+            status: The new order status
+
+        Returns:
+            A future resolving to the StatusChange once committed, or None if
+            the order does not exist
+        """
+        if self._stopping:
+            raise RuntimeError("Status write-behind queue is shutting down")
+
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_consume_exception)
+
+        _, waiters = self._pending.get(order_key, (status, []))
+        waiters.append(future)
+        # Last writer wins: earlier waiters resolve with the final outcome
+        self._pending[order_key] = (status, waiters)
+
+        if len(self._pending) >= self.max_batch:
+            self._wakeup.set()
+        return future
+
+    async def flush(self) -> int:
+        """
+        Write all queued updates.
+
+        Returns:
+            The number of orders that were flushed; 0 if the flush failed and
+            the updates were queued again
+        """
+        if not self._pending:
+            return 0
+
+        batch, self._pending = self._pending, {}
+        updates = [(order_key, status) for order_key, (status, _) in batch.items()]
+
+        try:
+            async with database.AsyncSessionLocal() as session:
+                changes = await apply_bulk_status_updates(session, updates)
+        except Exception as e:
+            self.failures += 1
+            WRITE_BEHIND_FAILED_FLUSHES.inc()
+            self._requeue(batch)
+            logger.error(
+                f"Write-behind flush of {len(batch)} status updates failed "
+                f"({self.failures} in a row), queued again: {e}"
+            )
+            return 0
+
+        self.failures = 0
+
+        changed: Dict[int, StatusChange] = {
+            change.o_orderkey: change for change in changes
+        }
+        for order_key, (_, waiters) in batch.items():
+            for future in waiters:
+                if not future.done():
+                    future.set_result(changed.get(order_key))
+        return len(batch)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            loop = asyncio.get_running_loop()
+            # After a failure, back off; full batches do not cut the wait short
+            deadline = loop.time() + (self.retry_delay() if self.failures else self.flush_interval)
+            while not self._stopping and loop.time() < deadline:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=deadline - loop.time())
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                if not self.failures:
+                    break
+            await self.flush()
+
+    async def start(self) -> None:
+        """Start the background flusher if write-behind is enabled."""
+        if not self.enabled:
+            return
+        self._stopping = False
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._run())
+            logger.info("Order status write-behind flusher started")
+
+    async def stop(self) -> None:
+        """Stop the flusher and write any updates that are still queued."""
+        if self._flush_task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        try:
+            await self._flush_task
+        finally:
+            self._flush_task = None
+        flushed = await self.flush()
+        if self._pending:
+            lost, self._pending = self._pending, {}
+            logger.error(f"Write-behind stopped with {len(lost)} status updates not written")
+            error = RuntimeError("Status write-behind queue stopped before the update was written")
+            for _, waiters in lost.values():
+                for future in waiters:
+                    if not future.done():
+                        future.set_exception(error)
+        logger.info(
+            f"Order status write-behind flusher stopped ({flushed} updates flushed on shutdown)"
+        )
+
+
+status_write_behind = StatusWriteBehind(
+    enabled=os.getenv("ORDERS_WRITE_BEHIND_ENABLED", "false").lower() == "true",
+    flush_interval=float(os.getenv("ORDERS_WRITE_BEHIND_FLUSH_MS", "10")) / 1000,
+    max_batch=int(os.getenv("ORDERS_WRITE_BEHIND_MAX_BATCH", "500")),
+    retry_initial=float(os.getenv("ORDERS_WRITE_BEHIND_RETRY_INITIAL_MS", "100")) / 1000,
+    retry_max=float(os.getenv("ORDERS_WRITE_BEHIND_RETRY_MAX_MS", "5000")) / 1000,
+)
@@ -0,0 +1,140 @@
+"""Tests for the Lakebase credential manager."""
+
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from config.credentials import (
+    CredentialManager,
+    SharedCredential,
+    SharedCredentialFile,
+    parse_expiration_time,
+)
+
+
+def credential(token="token", expires_in=3600):
+    expiration = datetime.now(timezone.utc) + timedelta(seconds=expires_in)
+    return SimpleNamespace(
+        token=token, expiration_time=expiration.isoformat().replace("+00:00", "Z")
+    )
+
+
+def manager(generate, **overrides):
+    settings = dict(
+        refresh_margin=600,
+        jitter=120,
+        retry_initial=5,
+        retry_max=60,
+        default_lifetime=3600,
+        retire_window=300,
+    )
+    settings.update(overrides)
+    return CredentialManager(generate, **settings)
+
+
+class TestParseExpirationTime:
+    """Tests for parsing credential expiry times."""
+
+    def test_parses_utc_timestamps(self):
+        """Test that a Z-suffixed timestamp is parsed as UTC."""
+        assert parse_expiration_time("2025-01-01T00:00:00Z") == 1735689600.0
+
+    def test_missing_or_invalid(self):
+        """Test that a missing or garbled expiry gives None."""
+        assert parse_expiration_time(None) is None
+        assert parse_expiration_time("tomorrow") is None
+
+
+class TestSharedCredentialFile:
+    """Tests for sharing a token between worker processes."""
+
+    def test_only_one_leader(self, tmp_path):
+        """Test that the leader lock is exclusive until released."""
+        first = SharedCredentialFile(str(tmp_path / "credential.json"))
+        second = SharedCredentialFile(str(tmp_path / "credential.json"))
+
+        assert first.try_lead()
+        assert not second.try_lead()
+        first.release()
+        assert second.try_lead()
+        second.release()
+
+    def test_write_and_read(self, tmp_path):
+        """Test that a written token is read back and private to the owner."""
+        shared = SharedCredentialFile(str(tmp_path / "credential.json"))
+        stored = SharedCredential(token="t", expires_at=2.0, refreshed_at=1.0)
+
+        assert shared.read() is None
+        shared.write(stored)
+
+        assert shared.read() == stored
+        assert (tmp_path / "credential.json").stat().st_mode & 0o777 == 0o600
+
+    def test_follower_uses_the_leaders_token(self, tmp_path, mocker):
+        """Test that a worker that is not the leader reads the token instead of generating one."""
+        path = str(tmp_path / "credential.json")
+        leader = manager(lambda: credential("shared"), shared=SharedCredentialFile(path))
+        leader.refresh_sync()
+        generate = mocker.MagicMock()
+        follower = manager(generate, shared=SharedCredentialFile(path))
+
+        follower.refresh_sync()
+
+        generate.assert_not_called()
+        assert follower.token == "shared"
+        assert not follower.shared.is_leader
+        leader.shared.release()
+
+
+class TestScheduling:
+    """Tests for when refreshes and retries happen."""
+
+    def test_refresh_is_scheduled_ahead_of_expiry(self):
+        """Test that the refresh falls between margin and margin plus jitter before expiry."""
+        credentials = manager(lambda: credential(expires_in=3600))
+        credentials.refresh_sync()
+
+        delays = [credentials.next_refresh_delay() for _ in range(100)]
+
+        assert all(2870 <= delay <= 3000 for delay in delays)
+        assert len(set(delays)) > 1
+
+    def test_default_lifetime_without_expiry(self):
+        """Test that a credential without expiry is assumed to last the default lifetime."""
+        credentials = manager(lambda: SimpleNamespace(token="t", expiration_time=None))
+        credentials.refresh_sync()
+
+        assert credentials.expires_at == pytest.approx(time.time() + 3600, abs=5)
+
+    def test_retry_delay_backs_off_up_to_maximum(self):
+        """Test that retries back off exponentially and are capped."""
+        credentials = manager(lambda: credential())
+
+        credentials.failures = 1
+        assert 2.5 <= credentials.retry_delay() <= 5
+        credentials.failures = 3
+        assert 10 <= credentials.retry_delay() <= 20
+        credentials.failures = 10
+        assert 30 <= credentials.retry_delay() <= 60
+
+
+@pytest.mark.asyncio
+class TestRefresh:
+    """Tests for rotating the token."""
+
+    async def test_refresh_runs_in_a_thread(self, mocker):
+        """Test that the blocking SDK call is run off the event loop."""
+        generate = mocker.MagicMock(return_value=credential("new"))
+        to_thread = mocker.patch(
+            "config.credentials.asyncio.to_thread",
+            mocker.AsyncMock(return_value=credential("new")),
+        )
+        credentials = manager(generate)
+
+        await credentials.refresh()
+
+        to_thread.assert_awaited_once_with(generate)
+        assert credentials.token == "new"
+        assert credentials.generation == 1
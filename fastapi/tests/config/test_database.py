@@ -0,0 +1,132 @@
+"""Tests for routing reads between the primary and the read replica."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from config import database
+
+
+@pytest.fixture
+def engines(mocker):
+    """Patch in a primary and a read replica engine with their session factories."""
+    primary, replica = mocker.MagicMock(name="primary"), mocker.MagicMock(name="replica")
+    primary_sessions = mocker.MagicMock(name="primary_sessions")
+    replica_sessions = mocker.MagicMock(name="replica_sessions")
+    mocker.patch.object(database, "engine", primary)
+    mocker.patch.object(database, "read_engine", replica)
+    mocker.patch.object(database, "AsyncSessionLocal", primary_sessions)
+    mocker.patch.object(database, "AsyncReadSessionLocal", replica_sessions)
+    mocker.patch.object(database, "read_replica_healthy", True)
+    return SimpleNamespace(
+        primary=primary,
+        replica=replica,
+        primary_sessions=primary_sessions,
+        replica_sessions=replica_sessions,
+    )
+
+
+def replica_connections(mocker, replica, failures):
+    """Make the replica's first connects raise the given errors and later ones succeed."""
+    connection = mocker.MagicMock()
+    connection.execute = mocker.AsyncMock()
+    failures = list(failures)
+
+    async def connect():
+        if failures:
+            raise failures.pop(0)
+        return connection
+
+    context = mocker.MagicMock()
+    context.__aenter__ = mocker.AsyncMock(side_effect=connect)
+    context.__aexit__ = mocker.AsyncMock(return_value=False)
+    replica.connect.return_value = context
+
+
+class TestReadRouting:
+    """Tests for choosing where reads go."""
+
+    def test_healthy_replica_serves_reads(self, engines):
+        """Test that reads use the replica while it is healthy."""
+        assert database.get_read_sessionmaker() is engines.replica_sessions
+        assert database.get_read_engine() is engines.replica
+
+    def test_unhealthy_replica_falls_back_to_primary(self, engines, mocker):
+        """Test that reads use the primary while the replica is unhealthy."""
+        mocker.patch.object(database, "read_replica_healthy", False)
+
+        assert database.get_read_sessionmaker() is engines.primary_sessions
+        assert database.get_read_engine() is engines.primary
+
+    def test_no_replica_uses_primary(self, engines, mocker):
+        """Test that reads use the primary when no replica is configured."""
+        mocker.patch.object(database, "read_engine", None)
+        mocker.patch.object(database, "AsyncReadSessionLocal", None)
+
+        assert database.get_read_sessionmaker() is engines.primary_sessions
+        assert database.get_read_engine() is engines.primary
+
+    def test_uninitialized_engine(self, mocker):
+        """Test that asking for a session before init_engine() fails clearly."""
+        mocker.patch.object(database, "AsyncSessionLocal", None)
+        mocker.patch.object(database, "AsyncReadSessionLocal", None)
+
+        with pytest.raises(RuntimeError, match="Engine not initialized"):
+            database.get_read_sessionmaker()
+
+
+class TestMarkReplicaUnhealthy:
+    """Tests for reacting to replica connection errors."""
+
+    def test_disconnect_routes_reads_to_primary(self, engines):
+        """Test that a dropped replica connection stops routing reads to it."""
+        database.mark_replica_unhealthy(SimpleNamespace(is_disconnect=True, connection=object()))
+
+        assert database.read_replica_healthy is False
+        assert database.get_read_engine() is engines.primary
+
+    def test_failed_connection_attempt_routes_reads_to_primary(self, engines):
+        """Test that a replica that cannot be reached stops receiving reads."""
+        database.mark_replica_unhealthy(SimpleNamespace(is_disconnect=False, connection=None))
+
+        assert database.read_replica_healthy is False
+
+    def test_statement_error_keeps_replica(self, engines):
+        """Test that an error in a query on a live connection does not fail over."""
+        database.mark_replica_unhealthy(SimpleNamespace(is_disconnect=False, connection=object()))
+
+        assert database.read_replica_healthy is True
+
+
+@pytest.mark.asyncio
+class TestReadReplicaHealth:
+    """Tests for the replica health check and monitor."""
+
+    async def test_failed_check_marks_replica_unhealthy(self, engines, mocker):
+        """Test that a failing health check routes reads to the primary."""
+        replica_connections(mocker, engines.replica, [ConnectionError("replica down")])
+
+        assert await database.read_replica_health() is False
+        assert database.get_read_sessionmaker() is engines.primary_sessions
+
+    async def test_no_replica_is_never_healthy(self, engines, mocker):
+        """Test that the health check reports no replica as unhealthy."""
+        mocker.patch.object(database, "read_engine", None)
+
+        assert await database.read_replica_health() is False
+
+    async def test_monitor_returns_reads_to_recovered_replica(self, engines, mocker):
+        """Test that the monitor routes reads back to the replica once it answers again."""
+        mocker.patch.object(database, "read_replica_healthy", False)
+        replica_connections(mocker, engines.replica, [ConnectionError("replica down")])
+
+        monitor = asyncio.create_task(database.monitor_read_replica(0))
+        for _ in range(10):
+            await asyncio.sleep(0)
+        monitor.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await monitor
+
+        assert database.read_replica_healthy is True
+        assert database.get_read_sessionmaker() is engines.replica_sessions
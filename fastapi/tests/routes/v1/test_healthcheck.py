@@ -50,3 +50,25 @@ class TestHealthcheckEndpoint:
         response = client.get("/api/v1/healthcheck", headers={"Accept": accept_header})
         assert response.status_code == status.HTTP_200_OK
         assert "application/json" in response.headers["content-type"]
+
+
+class TestReadinessEndpoint:
+    """Test suite for the readiness endpoint."""
+
+    def test_not_ready_while_pools_warm_up(self, client, mocker):
+        """Test that readiness is 503 until the connection pools are warm."""
+        mocker.patch("config.database.database_ready", return_value=False)
+
+        response = client.get("/api/v1/readiness")
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.json()["status"] == "WARMING"
+
+    def test_ready_once_pools_are_warm(self, client, mocker):
+        """Test that readiness is 200 once the connection pools are warm."""
+        mocker.patch("config.database.database_ready", return_value=True)
+
+        response = client.get("/api/v1/readiness")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["status"] == "READY"
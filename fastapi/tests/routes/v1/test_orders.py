@@ -0,0 +1,177 @@
+"""Tests for the orders endpoints."""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException, Response
+
+from models.orders import OrderBatchRequest, OrderStatusUpdate
+from routes.v1 import orders
+from routes.v1.orders import export_orders, read_orders_batch, update_order_status
+from services.orders.status_updates import StatusChange
+from services.orders.write_behind import StatusWriteBehind
+from services.orders.export import ExportFormat
+
+
+def order_row(mocker, order_key):
+    row = mocker.MagicMock()
+    row.o_orderkey = order_key
+    row._mapping = {
+        "o_orderkey": order_key,
+        "o_custkey": 7,
+        "o_orderstatus": "O",
+        "o_totalprice": "10.50",
+        "o_orderdate": "1995-01-01",
+        "o_orderpriority": "1-URGENT",
+        "o_clerk": "Clerk#000000001",
+        "o_shippriority": 0,
+        "o_comment": "comment",
+    }
+    return row
+
+
+@pytest.fixture
+def mock_db(mocker):
+    """Create a session returning the orders with keys 1, 2 and 3, in key order."""
+    db = mocker.MagicMock()
+    result = mocker.MagicMock()
+    result.all.return_value = [order_row(mocker, key) for key in (1, 2, 3)]
+    db.execute = mocker.AsyncMock(return_value=result)
+    return db
+
+
+@pytest.mark.asyncio
+class TestReadOrdersBatch:
+    """Tests for fetching many orders by key."""
+
+    async def test_orders_in_request_order(self, mock_db):
+        """Test that orders come back in the order their keys were requested."""
+        response = await read_orders_batch(OrderBatchRequest(order_keys=[3, 1, 2]), mock_db)
+
+        assert [order.o_orderkey for order in response.orders] == [3, 1, 2]
+        assert response.missing_keys == []
+
+    async def test_duplicates_are_ignored(self, mock_db):
+        """Test that a repeated key is looked up and returned once."""
+        response = await read_orders_batch(OrderBatchRequest(order_keys=[2, 1, 2, 2]), mock_db)
+
+        assert [order.o_orderkey for order in response.orders] == [2, 1]
+        bound_keys = mock_db.execute.await_args.args[0].compile().params["order_keys"]
+        assert bound_keys == [2, 1]
+
+    async def test_missing_keys_are_reported(self, mock_db):
+        """Test that keys without an order are listed in request order."""
+        response = await read_orders_batch(OrderBatchRequest(order_keys=[9, 1, 8]), mock_db)
+
+        assert [order.o_orderkey for order in response.orders] == [1]
+        assert response.missing_keys == [9, 8]
+
+    @pytest.mark.parametrize(
+        "order_keys, detail",
+        [
+            ([], "No order keys provided"),
+            ([1, 0], "Invalid order key provided"),
+            ([1, -5], "Invalid order key provided"),
+        ],
+    )
+    async def test_invalid_key_lists(self, mock_db, order_keys, detail):
+        """Test that empty and non-positive key lists are rejected without a query."""
+        with pytest.raises(HTTPException) as exc_info:
+            await read_orders_batch(OrderBatchRequest(order_keys=order_keys), mock_db)
+
+        assert exc_info.value.status_code == 400
+        assert exc_info.value.detail == detail
+        mock_db.execute.assert_not_awaited()
+
+    async def test_oversized_key_list(self, mocker, mock_db):
+        """Test that more distinct keys than the limit are rejected."""
+        mocker.patch.object(orders, "BATCH_MAX_KEYS", 3)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await read_orders_batch(OrderBatchRequest(order_keys=[1, 2, 3, 4]), mock_db)
+
+        assert exc_info.value.status_code == 400
+        assert "At most 3 order keys" in exc_info.value.detail
+        mock_db.execute.assert_not_awaited()
+
+    async def test_duplicates_do_not_count_towards_the_limit(self, mocker, mock_db):
+        """Test that the limit applies to distinct keys."""
+        mocker.patch.object(orders, "BATCH_MAX_KEYS", 3)
+
+        response = await read_orders_batch(
+            OrderBatchRequest(order_keys=[1, 2, 3, 1, 2, 3]), mock_db
+        )
+
+        assert len(response.orders) == 3
+
+    async def test_database_error(self, mock_db):
+        """Test that a failing query is reported as a 500."""
+        mock_db.execute.side_effect = Exception("connection lost")
+
+        with pytest.raises(HTTPException) as exc_info:
+            await read_orders_batch(OrderBatchRequest(order_keys=[1]), mock_db)
+
+        assert exc_info.value.status_code == 500
+
+
+@pytest.mark.asyncio
+class TestExportOrders:
+    """Tests for starting an orders export."""
+
+    async def test_connection_failure(self, mocker):
+        """Test that a failure to obtain a connection is reported as a 500."""
+        engine = mocker.MagicMock()
+        engine.connect = mocker.AsyncMock(side_effect=TimeoutError("QueuePool limit reached"))
+        mocker.patch.object(orders, "get_read_engine", return_value=engine)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await export_orders(
+                export_format=ExportFormat.NDJSON,
+                min_key=None,
+                max_key=None,
+                start_date=None,
+                end_date=None,
+                limit=None,
+                batch_size=5000,
+            )
+
+        assert exc_info.value.status_code == 500
+
+
+@pytest.mark.asyncio
+class TestUpdateOrderStatusWriteBehind:
+    """Tests for status updates going through the write-behind queue."""
+
+    @pytest.fixture
+    def queue(self, mocker):
+        """Replace the write-behind queue with one that is never flushed."""
+        queue = StatusWriteBehind(enabled=True, flush_interval=60, max_batch=100)
+        mocker.patch.object(orders, "status_write_behind", queue)
+        return queue
+
+    async def test_wait_answers_once_committed(self, queue):
+        """Test that a waiting caller gets the committed status."""
+        update = asyncio.create_task(
+            update_order_status(1, OrderStatusUpdate(o_orderstatus="F"), Response(), True, None)
+        )
+        await asyncio.sleep(0)
+        queue._pending[1][1][0].set_result(StatusChange(o_orderkey=1, o_orderstatus="F"))
+
+        result = await update
+
+        assert result.o_orderstatus == "F"
+        assert result.message == "Order status updated successfully"
+
+    async def test_wait_times_out_while_update_stays_queued(self, mocker, queue):
+        """Test that an update not committed in time answers 503 and is kept queued."""
+        mocker.patch.object(orders, "WRITE_BEHIND_WAIT_TIMEOUT", 0.01)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await update_order_status(
+                1, OrderStatusUpdate(o_orderstatus="F"), Response(), True, None
+            )
+
+        assert exc_info.value.status_code == 503
+        assert "still queued" in exc_info.value.detail
+        assert queue.pending_count == 1
+        assert not queue._pending[1][1][0].done()
@@ -0,0 +1,65 @@
+"""Tests for Prometheus metrics."""
+
+import pytest
+from prometheus_client import REGISTRY
+
+from services.monitoring.metrics import (
+    observe_warehouse_call,
+    render_metrics,
+    statement_operation,
+)
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class TestStatementOperation:
+    """Tests for labelling statements by type."""
+
+    def test_leading_keyword(self):
+        """Test that the statement type is the leading keyword, upper-cased."""
+        assert statement_operation("select 1") == "SELECT"
+        assert statement_operation("\n  UPDATE orders SET o_orderstatus = $1") == "UPDATE"
+
+    def test_unknown_keywords_are_bounded(self):
+        """Test that unexpected statements share one label."""
+        assert statement_operation("VACUUM orders") == "OTHER"
+        assert statement_operation("") == "OTHER"
+
+
+class TestObserveWarehouseCall:
+    """Tests for timing SQL warehouse calls."""
+
+    def test_success_and_error_outcomes(self):
+        """Test that calls are counted by outcome and errors still propagate."""
+        labels = {"operation": "test-call"}
+        successes = sample("warehouse_call_duration_seconds_count", outcome="success", **labels)
+        errors = sample("warehouse_call_duration_seconds_count", outcome="error", **labels)
+
+        with observe_warehouse_call("test-call"):
+            pass
+        with pytest.raises(RuntimeError):
+            with observe_warehouse_call("test-call"):
+                raise RuntimeError("warehouse unavailable")
+
+        assert (
+            sample("warehouse_call_duration_seconds_count", outcome="success", **labels)
+            == successes + 1
+        )
+        assert (
+            sample("warehouse_call_duration_seconds_count", outcome="error", **labels)
+            == errors + 1
+        )
+
+
+class TestRenderMetrics:
+    """Tests for the exposition format."""
+
+    def test_renders_text_format(self):
+        """Test that metrics are rendered in the Prometheus text format."""
+        content, content_type = render_metrics()
+
+        assert content_type.startswith("text/plain")
+        assert b"# TYPE http_request_duration_seconds histogram" in content
+        assert b"# TYPE db_statement_duration_seconds histogram" in content
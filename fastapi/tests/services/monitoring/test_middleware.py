@@ -0,0 +1,89 @@
+"""Tests for the request timing middleware."""
+
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from services.monitoring.middleware import ProcessTimeMiddleware
+
+
+def make_client(log_sample_rate):
+    app = FastAPI()
+    app.add_middleware(ProcessTimeMiddleware, log_sample_rate=log_sample_rate)
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        if item_id == 0:
+            raise HTTPException(status_code=503, detail="unavailable")
+        return {"item_id": item_id}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for chunk in (b"first,", b"second"):
+                yield chunk
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    return TestClient(app)
+
+
+def middleware_records(caplog):
+    return [r for r in caplog.records if r.name == "services.monitoring.middleware"]
+
+
+def request_count(route, status):
+    labels = {"method": "GET", "route": route, "status": status}
+    return REGISTRY.get_sample_value("http_request_duration_seconds_count", labels) or 0
+
+
+class TestProcessTimeMiddleware:
+    """Tests for timing, logging and recording requests."""
+
+    def test_adds_process_time_header(self):
+        """Test that responses carry the processing time."""
+        response = make_client(1.0).get("/items/1")
+
+        assert response.status_code == 200
+        assert float(response.headers["X-Process-Time"]) >= 0
+
+    def test_records_route_template(self):
+        """Test that requests are recorded by route template, and unmatched paths together."""
+        before = request_count("/items/{item_id}", "200")
+        unmatched = request_count("unmatched", "404")
+        client = make_client(0.0)
+
+        client.get("/items/1")
+        client.get("/items/2")
+        client.get("/missing")
+
+        assert request_count("/items/{item_id}", "200") == before + 2
+        assert request_count("unmatched", "404") == unmatched + 1
+
+    def test_streams_body_unchanged(self):
+        """Test that streaming responses pass through with the header."""
+        response = make_client(1.0).get("/stream")
+
+        assert response.text == "first,second"
+        assert "X-Process-Time" in response.headers
+
+    @pytest.mark.parametrize("rate, logged", [(0.0, 0), (1.0, 1)])
+    def test_samples_request_logs(self, caplog, rate, logged):
+        """Test that only the sampled fraction of requests is logged."""
+        with caplog.at_level(logging.INFO, logger="services.monitoring.middleware"):
+            make_client(rate).get("/items/1")
+
+        assert len(middleware_records(caplog)) == logged
+
+    def test_server_errors_are_always_logged(self, caplog):
+        """Test that server errors are logged whatever the sample rate."""
+        with caplog.at_level(logging.INFO, logger="services.monitoring.middleware"):
+            make_client(0.0).get("/items/0")
+
+        records = middleware_records(caplog)
+        assert len(records) == 1
+        assert "503" in records[0].getMessage()
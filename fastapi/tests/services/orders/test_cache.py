@@ -0,0 +1,109 @@
+"""Tests for the in-process order cache."""
+
+import asyncio
+
+import pytest
+
+from services.orders.cache import TTLCache
+
+
+def _cache(**overrides):
+    options = {"max_entries": 3, "max_bytes": 1024, "ttl": 60, "sizeof": lambda v: 10}
+    options.update(overrides)
+    return TTLCache(**options)
+
+
+class TestTTLCache:
+    """Tests for LRU eviction, expiry and invalidation."""
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test that the entry used longest ago is evicted first."""
+        cache = _cache()
+        for key in (1, 2, 3):
+            cache.set(key, f"order-{key}")
+
+        cache.get(1)
+        cache.set(4, "order-4")
+
+        assert cache.get(2) is None
+        assert cache.get(1) == "order-1"
+        assert cache.stats.evictions == 1
+
+    def test_memory_bound_evicts_entries(self):
+        """Test that the byte limit is enforced alongside the entry limit."""
+        cache = _cache(max_entries=100, max_bytes=25)
+        for key in (1, 2, 3):
+            cache.set(key, f"order-{key}")
+
+        assert len(cache) == 2
+        assert cache.size_bytes == 20
+
+    def test_expired_entries_are_not_returned(self):
+        """Test that entries older than the TTL are treated as missing."""
+        cache = _cache(ttl=-1)
+        cache.set(1, "order-1")
+
+        assert cache.get(1) is None
+        assert cache.stats.expirations == 1
+
+    def test_invalidate_removes_entry(self):
+        """Test that invalidation removes a cached entry."""
+        cache = _cache()
+        cache.set(1, "order-1")
+
+        cache.invalidate(1)
+
+        assert cache.get(1) is None
+        assert cache.stats.invalidations == 1
+
+    def test_disabled_cache_stores_nothing(self):
+        """Test that a cache with no capacity never stores values."""
+        cache = _cache(max_entries=0)
+        cache.set(1, "order-1")
+
+        assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+class TestTTLCacheLoading:
+    """Tests for loading values through the cache."""
+
+    async def test_concurrent_misses_share_one_load(self):
+        """Test that a burst of misses for one key runs the loader once."""
+        cache = _cache()
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "order-1"
+
+        results = await asyncio.gather(
+            *[cache.get_or_load(1, loader) for _ in range(10)]
+        )
+
+        assert calls == 1
+        assert set(results) == {"order-1"}
+        assert cache.stats.coalesced == 9
+
+    async def test_missing_values_are_not_cached(self):
+        """Test that a loader returning None leaves the cache empty."""
+        cache = _cache()
+
+        async def loader():
+            return None
+
+        assert await cache.get_or_load(1, loader) is None
+        assert len(cache) == 0
+
+    async def test_invalidation_during_load_discards_result(self):
+        """Test that a write during a load keeps the loaded value out of the cache."""
+        cache = _cache()
+
+        async def loader():
+            cache.invalidate(1)
+            return "stale-order-1"
+
+        assert await cache.get_or_load(1, loader) == "stale-order-1"
+        assert cache.get(1) is None
@@ -0,0 +1,76 @@
+"""Tests for the live order change feed."""
+
+import pytest
+
+from services.orders.change_feed import ChangeEvent, FeedClosed, OrderChangeFeed
+
+
+def make_feed(max_buffer=10):
+    return OrderChangeFeed(max_buffer=max_buffer, max_subscribers=10, heartbeat_interval=0.01)
+
+
+@pytest.mark.asyncio
+class TestOrderChangeFeed:
+    """Tests for fanning out changes to subscribers."""
+
+    async def test_changes_are_delivered_to_every_subscriber(self):
+        """Test that one published change reaches all subscribers."""
+        feed = make_feed()
+        first = feed.subscribe()
+        second = feed.subscribe()
+
+        feed.publish(1, "F")
+
+        expected = ChangeEvent(id=1, o_orderkey=1, o_orderstatus="F")
+        assert await first.next(timeout=1) == expected
+        assert await second.next(timeout=1) == expected
+
+    async def test_idle_subscription_times_out(self):
+        """Test that waiting without changes returns None for a heartbeat."""
+        subscription = make_feed().subscribe()
+
+        assert await subscription.next(timeout=0.01) is None
+
+    async def test_slow_subscriber_is_dropped(self):
+        """Test that a subscriber whose buffer is full is removed and closed."""
+        feed = make_feed(max_buffer=2)
+        slow = feed.subscribe()
+
+        for key in range(3):
+            feed.publish(key, "O")
+
+        assert feed.subscriber_count == 0
+        assert feed.dropped == 1
+        with pytest.raises(FeedClosed) as exc_info:
+            await slow.next(timeout=1)
+        assert exc_info.value.reason == "overflow"
+
+    async def test_stop_closes_subscriptions_after_buffered_events(self):
+        """Test that stopping the feed ends streams once pending events were sent."""
+        feed = make_feed()
+        subscription = feed.subscribe()
+        feed.publish(1, "F")
+
+        await feed.stop()
+
+        assert (await subscription.next(timeout=1)).o_orderkey == 1
+        with pytest.raises(FeedClosed):
+            await subscription.next(timeout=1)
+
+    async def test_stream_encodes_events_and_heartbeats(self):
+        """Test the Server-Sent Events framing of a subscription."""
+        feed = make_feed()
+        subscription = feed.subscribe()
+        stream = feed.stream(subscription)
+
+        assert await anext(stream) == "retry: 10\n\n"
+        assert await anext(stream) == ": heartbeat\n\n"
+        feed.publish(5, "P")
+        assert await anext(stream) == (
+            'id: 1\nevent: order_changed\ndata: {"o_orderkey": 5, "o_orderstatus": "P"}\n\n'
+        )
+        subscription.close("shutdown")
+        assert await anext(stream) == 'event: close\ndata: {"reason": "shutdown"}\n\n'
+        with pytest.raises(StopAsyncIteration):
+            await anext(stream)
+        assert feed.subscriber_count == 0
@@ -0,0 +1,154 @@
+"""Tests for incremental order change reads."""
+
+import asyncio
+
+import pytest
+
+from services.orders import changes
+from services.orders.changes import (
+    InvalidSyncTokenError,
+    SyncToken,
+    decode_sync_token,
+    encode_sync_token,
+    enable_change_tracking,
+    fetch_changes,
+)
+
+
+def make_row(mocker, order_key, change_id):
+    row = mocker.MagicMock()
+    row.o_orderkey = order_key
+    row.change_id = str(change_id)
+    return row
+
+
+def mock_db(mocker, horizon, rows):
+    """Return a session whose first query yields the horizon and the second the rows."""
+    db = mocker.MagicMock()
+    horizon_result = mocker.MagicMock()
+    horizon_result.scalar.return_value = str(horizon)
+    rows_result = mocker.MagicMock()
+    rows_result.all.return_value = rows
+    db.execute = mocker.AsyncMock(side_effect=[horizon_result, rows_result])
+    return db
+
+
+class TestSyncToken:
+    """Tests for encoding and decoding sync tokens."""
+
+    @pytest.mark.parametrize(
+        "token",
+        [SyncToken(since=10, horizon=12), SyncToken(since=10, horizon=12, after=(11, 42))],
+    )
+    def test_round_trip(self, token):
+        """Test that a token decodes to the values it was encoded from."""
+        assert decode_sync_token(encode_sync_token(token)) == token
+
+    @pytest.mark.parametrize("value", ["", "not-a-token", "eyJ4IjoxfQ"])
+    def test_malformed_token_is_rejected(self, value):
+        """Test that malformed tokens raise InvalidSyncTokenError."""
+        with pytest.raises(InvalidSyncTokenError):
+            decode_sync_token(value)
+
+
+@pytest.mark.asyncio
+class TestFetchChanges:
+    """Tests for paging through changed orders."""
+
+    async def test_last_page_starts_next_sync_at_horizon(self, mocker):
+        """Test that a complete sync hands out the horizon read before the rows."""
+        db = mock_db(mocker, horizon=20, rows=[make_row(mocker, 1, 15)])
+
+        page = await fetch_changes(db, SyncToken(since=10, horizon=10), limit=10)
+
+        assert not page.has_more
+        assert page.token == SyncToken(since=20, horizon=20)
+
+    async def test_partial_page_continues_after_last_row(self, mocker):
+        """Test that a full page keeps the original lower bound and horizon."""
+        rows = [make_row(mocker, key, 15) for key in (1, 2, 3)]
+        db = mock_db(mocker, horizon=20, rows=rows)
+
+        page = await fetch_changes(db, SyncToken(since=10, horizon=10), limit=2)
+
+        assert page.has_more
+        assert [row.o_orderkey for row in page.rows] == [1, 2]
+        assert page.token == SyncToken(since=10, horizon=20, after=(15, 2))
+
+    async def test_continuation_reuses_horizon(self, mocker):
+        """Test that later pages of one sync do not read a new horizon."""
+        rows_result = mocker.MagicMock()
+        rows_result.all.return_value = []
+        db = mocker.MagicMock()
+        db.execute = mocker.AsyncMock(return_value=rows_result)
+
+        page = await fetch_changes(
+            db, SyncToken(since=10, horizon=20, after=(15, 2)), limit=2
+        )
+
+        assert db.execute.await_count == 1
+        assert page.token == SyncToken(since=20, horizon=20)
+
+
+def mock_engine(mocker, has_column, has_trigger, has_index):
+    """Patch the primary engine with one whose catalog query reports the given state."""
+    conn = mocker.MagicMock()
+    state = mocker.MagicMock(
+        has_column=has_column, has_trigger=has_trigger, has_index=has_index
+    )
+    conn.execute = mocker.AsyncMock(
+        return_value=mocker.MagicMock(one=mocker.MagicMock(return_value=state))
+    )
+    conn.execution_options = mocker.AsyncMock(return_value=conn)
+    engine = mocker.MagicMock()
+    for method in ("begin", "connect"):
+        context = getattr(engine, method).return_value
+        context.__aenter__ = mocker.AsyncMock(return_value=conn)
+        context.__aexit__ = mocker.AsyncMock(return_value=False)
+    mocker.patch.object(changes.database, "engine", engine)
+    return conn
+
+
+def executed(conn):
+    return [str(call.args[0]) for call in conn.execute.await_args_list]
+
+
+@pytest.mark.asyncio
+class TestEnableChangeTracking:
+    """Tests for setting up change tracking."""
+
+    async def test_existing_setup_takes_no_table_lock(self, mocker):
+        """Test that nothing is altered or built when the setup is already in place."""
+        conn = mock_engine(mocker, has_column=True, has_trigger=True, has_index=True)
+
+        await enable_change_tracking()
+
+        assert len(executed(conn)) == 1
+
+    async def test_missing_setup_is_created(self, mocker):
+        """Test that the column, trigger and index are created under a lock timeout."""
+        conn = mock_engine(mocker, has_column=False, has_trigger=False, has_index=False)
+
+        await enable_change_tracking()
+
+        statements = executed(conn)
+        assert "lock_timeout" in statements[1]
+        assert "ADD COLUMN IF NOT EXISTS change_xid" in statements[2]
+        assert statements[-1].startswith("CREATE INDEX CONCURRENTLY")
+
+    async def test_start_runs_in_background(self, mocker):
+        """Test that startup does not wait for the setup to finish."""
+        mocker.patch.object(changes, "CHANGE_TRACKING_ENABLED", True)
+        release = asyncio.Event()
+
+        async def slow_setup():
+            await release.wait()
+
+        mocker.patch.object(changes, "enable_change_tracking", side_effect=slow_setup)
+
+        await changes.start_change_tracking()
+        assert not changes._setup_task.done()
+
+        release.set()
+        await changes._setup_task
+        await changes.stop_change_tracking()
@@ -0,0 +1,118 @@
+"""Tests for the columnar order listing formats."""
+
+import io
+import json
+from datetime import date
+from decimal import Decimal
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from models.orders import CursorPaginationInfo
+from services.orders.columnar import (
+    ColumnarFormat,
+    columnar_response,
+    negotiate_format,
+    rows_to_batch,
+)
+
+
+class FakeRow(tuple):
+    """A minimal stand-in for a Core row with named fields."""
+
+    _fields = (
+        "o_orderkey",
+        "o_custkey",
+        "o_orderstatus",
+        "o_totalprice",
+        "o_orderdate",
+        "o_orderpriority",
+        "o_clerk",
+        "o_shippriority",
+        "o_comment",
+    )
+
+
+def make_row(order_key):
+    return FakeRow(
+        (
+            order_key,
+            7,
+            "O",
+            Decimal("1234.50"),
+            date(1995, 3, 14),
+            "1-URGENT",
+            "Clerk#000000001",
+            0,
+            "regular deposits",
+        )
+    )
+
+
+PAGINATION = CursorPaginationInfo(
+    page_size=2, has_next=True, has_previous=False, next_cursor="abc"
+)
+
+
+class TestNegotiateFormat:
+    """Tests for choosing a format from the Accept header."""
+
+    @pytest.mark.parametrize(
+        "accept, expected",
+        [
+            (None, None),
+            ("application/json", None),
+            ("*/*", None),
+            ("application/vnd.apache.arrow.stream", ColumnarFormat.ARROW),
+            ("text/html, application/parquet;q=0.9", ColumnarFormat.PARQUET),
+            ("application/json, application/parquet;q=0.1", None),
+            ("application/json;q=0.5, application/parquet", ColumnarFormat.PARQUET),
+            ("*/*;q=0.8, application/vnd.apache.arrow.stream", ColumnarFormat.ARROW),
+            ("application/parquet;q=0, application/json;q=0.1", None),
+        ],
+    )
+    def test_negotiate_format(self, accept, expected):
+        """Test that columnar types are selected only when they rank above JSON."""
+        assert negotiate_format(accept) == expected
+
+
+class TestColumnarResponse:
+    """Tests for encoding pages as Arrow and Parquet."""
+
+    def test_batch_keeps_exact_types(self):
+        """Test that prices stay decimals and dates stay dates."""
+        batch = rows_to_batch([make_row(1), make_row(2)])
+
+        assert batch.num_rows == 2
+        assert batch.schema.field("o_totalprice").type == pa.decimal128(18, 2)
+        assert batch.column("o_totalprice")[0].as_py() == Decimal("1234.50")
+        assert batch.column("o_orderdate")[0].as_py() == date(1995, 3, 14)
+
+    def test_arrow_stream_round_trip(self):
+        """Test that an Arrow response decodes to the rows and carries pagination."""
+        response = columnar_response([make_row(1), make_row(2)], PAGINATION, ColumnarFormat.ARROW)
+
+        table = pa.ipc.open_stream(response.body).read_all()
+
+        assert response.media_type == ColumnarFormat.ARROW.value
+        assert table.column("o_orderkey").to_pylist() == [1, 2]
+        assert json.loads(response.headers["x-pagination"])["next_cursor"] == "abc"
+        assert json.loads(table.schema.metadata[b"pagination"])["has_next"] is True
+
+    def test_parquet_round_trip(self):
+        """Test that a Parquet response decodes to the rows."""
+        response = columnar_response([make_row(1)], PAGINATION, ColumnarFormat.PARQUET)
+
+        table = pq.read_table(io.BytesIO(response.body))
+
+        assert table.column("o_comment").to_pylist() == ["regular deposits"]
+
+    def test_empty_page_has_schema(self):
+        """Test that an empty page still encodes the full schema."""
+        response = columnar_response([], PAGINATION, ColumnarFormat.ARROW)
+
+        table = pa.ipc.open_stream(response.body).read_all()
+
+        assert table.num_rows == 0
+        assert table.schema.names[0] == "o_orderkey"
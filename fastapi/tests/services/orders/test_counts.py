@@ -0,0 +1,86 @@
+"""Tests for the order count provider."""
+
+import asyncio
+
+import pytest
+
+from services.orders.counts import CountMode, CountResult, OrderCountProvider
+
+
+@pytest.fixture
+def mock_db(mocker):
+    """Create a mock session whose queries return a fixed count."""
+    db = mocker.MagicMock()
+    result = mocker.MagicMock()
+    result.scalar.return_value = 1500000
+    db.execute = mocker.AsyncMock(return_value=result)
+    return db
+
+
+@pytest.mark.asyncio
+class TestOrderCountProvider:
+    """Tests for the count modes."""
+
+    async def test_exact_count_is_cached(self, mock_db):
+        """Test that an exact count is reused within the TTL."""
+        provider = OrderCountProvider(ttl=60, refresh_interval=300)
+
+        first = await provider.get(mock_db, CountMode.EXACT)
+        second = await provider.get(mock_db, CountMode.EXACT)
+
+        assert first.value == 1500000
+        assert second is first
+        assert mock_db.execute.await_count == 1
+
+    async def test_zero_max_age_forces_recount(self, mock_db):
+        """Test that max_age=0 bypasses the cached count."""
+        provider = OrderCountProvider(ttl=60, refresh_interval=300)
+
+        await provider.get(mock_db, CountMode.EXACT)
+        await provider.get(mock_db, CountMode.EXACT, max_age=0)
+
+        assert mock_db.execute.await_count == 2
+
+    async def test_approximate_count(self, mock_db):
+        """Test that approximate counts report their mode."""
+        provider = OrderCountProvider(ttl=60, refresh_interval=300)
+
+        count = await provider.get(mock_db, CountMode.APPROXIMATE)
+
+        assert count.mode == CountMode.APPROXIMATE
+        assert count.value == 1500000
+
+    async def test_background_without_result_falls_back(self, mock_db):
+        """Test that the background mode answers from statistics until computed."""
+        provider = OrderCountProvider(ttl=60, refresh_interval=300)
+
+        count = await provider.get(mock_db, CountMode.BACKGROUND)
+
+        assert count.mode == CountMode.APPROXIMATE
+
+    async def test_background_result_served_without_query(self, mock_db):
+        """Test that a background count is served from memory."""
+        provider = OrderCountProvider(ttl=60, refresh_interval=300)
+        provider._background = CountResult(
+            value=42, mode=CountMode.BACKGROUND, as_of=0.0
+        )
+
+        count = await provider.get(mock_db, CountMode.BACKGROUND)
+
+        assert count.value == 42
+        mock_db.execute.assert_not_awaited()
+
+    async def test_background_task_waits_for_first_request(self, mocker, mock_db):
+        """Test that no background count runs until background mode is requested."""
+        provider = OrderCountProvider(ttl=60, refresh_interval=300)
+        refresh = mocker.patch.object(provider, "refresh_background")
+
+        await provider.start()
+        await provider.get(mock_db, CountMode.EXACT)
+        assert provider._refresh_task is None
+
+        await provider.get(mock_db, CountMode.BACKGROUND)
+        await asyncio.sleep(0)
+        refresh.assert_awaited_once()
+
+        await provider.stop()
@@ -0,0 +1,52 @@
+"""Tests for the orders keyset cursor helpers."""
+
+import pytest
+
+from services.orders.cursors import (
+    BACKWARD,
+    FORWARD,
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+)
+
+
+class TestCursorEncoding:
+    """Tests for encoding and decoding opaque cursors."""
+
+    @pytest.mark.parametrize("direction", [FORWARD, BACKWARD])
+    def test_round_trip(self, direction):
+        """Test that an encoded cursor decodes to the same position."""
+        token = encode_cursor(direction, [4500032])
+
+        cursor = decode_cursor(token)
+
+        assert cursor.direction == direction
+        assert cursor.values == [4500032]
+        assert cursor.is_backward == (direction == BACKWARD)
+
+    def test_token_is_url_safe(self):
+        """Test that tokens can be used in a query string without escaping."""
+        token = encode_cursor(FORWARD, [1, "1996-01-02"])
+
+        assert "=" not in token
+        assert "+" not in token
+        assert "/" not in token
+
+    def test_bare_integer_is_forward_cursor(self):
+        """Test that legacy integer cursors are still accepted."""
+        cursor = decode_cursor("12345")
+
+        assert cursor.direction == FORWARD
+        assert cursor.values == [12345]
+
+    @pytest.mark.parametrize("token", ["not-a-cursor", "e30", "W10", "²", "١٢٣"])
+    def test_malformed_token_raises(self, token):
+        """Test that malformed tokens raise InvalidCursorError."""
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(token)
+
+    def test_unknown_direction_rejected(self):
+        """Test that encoding with an unknown direction fails."""
+        with pytest.raises(ValueError):
+            encode_cursor("sideways", [1])
@@ -0,0 +1,44 @@
+"""Tests for the orders export helpers."""
+
+from datetime import date
+
+from sqlalchemy.dialects import postgresql
+
+from services.orders.export import build_export_query
+
+
+def _compile(stmt) -> str:
+    return str(
+        stmt.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+
+
+class TestBuildExportQuery:
+    """Tests for building the export query."""
+
+    def test_unfiltered_export_orders_by_key(self):
+        """Test that an unfiltered export scans the whole table by key."""
+        sql = _compile(build_export_query())
+
+        assert "WHERE" not in sql
+        assert "ORDER BY public.orders_synced.o_orderkey" in sql
+
+    def test_key_and_date_filters(self):
+        """Test that key and date ranges are applied inclusively."""
+        sql = _compile(
+            build_export_query(
+                min_key=10,
+                max_key=20,
+                start_date=date(1995, 1, 1),
+                end_date=date(1995, 12, 31),
+                limit=5,
+            )
+        )
+
+        assert "o_orderkey >= 10" in sql
+        assert "o_orderkey <= 20" in sql
+        assert "o_orderdate >= '1995-01-01'" in sql
+        assert "o_orderdate <= '1995-12-31'" in sql
+        assert "LIMIT 5" in sql
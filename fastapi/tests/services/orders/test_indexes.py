@@ -0,0 +1,66 @@
+"""Tests for the managed order indexes."""
+
+import pytest
+
+from services.orders import indexes
+from services.orders.indexes import ManagedIndex, OrderIndexManager
+
+
+@pytest.fixture
+def mock_conn(mocker):
+    """Patch the primary engine with one handing out a single mocked connection."""
+    conn = mocker.MagicMock()
+    conn.execution_options = mocker.AsyncMock(return_value=conn)
+    engine = mocker.MagicMock()
+    engine.connect.return_value.__aenter__ = mocker.AsyncMock(return_value=conn)
+    engine.connect.return_value.__aexit__ = mocker.AsyncMock(return_value=False)
+    mocker.patch.object(indexes.database, "engine", engine)
+    return conn
+
+
+def result(mocker, scalar=None, rows=()):
+    value = mocker.MagicMock()
+    value.scalar.return_value = scalar
+    value.all.return_value = list(rows)
+    return value
+
+
+def executed(conn):
+    return [str(call.args[0]) for call in conn.execute.await_args_list]
+
+
+@pytest.mark.asyncio
+class TestEnsureIndexes:
+    """Tests for building the managed indexes from one process at a time."""
+
+    async def test_skips_when_another_process_holds_the_lock(self, mocker, mock_conn):
+        """Test that an index another process is building is not dropped as invalid."""
+        mock_conn.execute = mocker.AsyncMock(return_value=result(mocker, scalar=False))
+        manager = OrderIndexManager(True, [ManagedIndex("orders_test_idx", "(o_custkey)")])
+
+        assert await manager.ensure_indexes() is False
+
+        statements = executed(mock_conn)
+        assert len(statements) == 1
+        assert "pg_try_advisory_lock" in statements[0]
+
+    async def test_rebuilds_invalid_index_under_the_lock(self, mocker, mock_conn):
+        """Test that an invalid index is rebuilt and the lock released afterwards."""
+        mock_conn.execute = mocker.AsyncMock(
+            side_effect=[
+                result(mocker, scalar=True),
+                result(mocker, rows=[("orders_test_idx", False)]),
+                result(mocker),
+                result(mocker),
+                result(mocker),
+            ]
+        )
+        manager = OrderIndexManager(True, [ManagedIndex("orders_test_idx", "(o_custkey)")])
+
+        assert await manager.ensure_indexes() is True
+
+        statements = executed(mock_conn)
+        assert statements[2].startswith("DROP INDEX CONCURRENTLY")
+        assert statements[3].startswith("CREATE INDEX CONCURRENTLY")
+        assert "pg_advisory_unlock" in statements[4]
+        assert manager.ready == {"orders_test_idx": True}
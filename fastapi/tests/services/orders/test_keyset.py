@@ -0,0 +1,102 @@
+"""Tests for composite keyset queries on the order stream."""
+
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from services.orders.keyset import (
+    InvalidStreamQueryError,
+    StreamFilters,
+    StreamSort,
+    build_stream_query,
+    cursor_values,
+    parse_cursor_values,
+    validate_stream_query,
+)
+
+
+def compile_sql(stmt):
+    return str(
+        stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    ).replace("\n", " ")
+
+
+class TestBuildStreamQuery:
+    """Tests for the generated page queries."""
+
+    def test_orderkey_sort_seeks_on_key(self):
+        """Test that the default sort seeks on the primary key."""
+        sql = compile_sql(
+            build_stream_query(StreamSort.ORDERKEY, StreamFilters(), [42], False, 101)
+        )
+
+        assert "public.orders_synced.o_orderkey > 42" in sql
+        assert "ORDER BY public.orders_synced.o_orderkey " in sql
+        assert "LIMIT 101" in sql
+
+    def test_orderdate_sort_uses_row_comparison(self):
+        """Test that the date sort seeks on (o_orderdate, o_orderkey) with filters."""
+        filters = StreamFilters(status="O", start_date=date(1995, 1, 1))
+
+        sql = compile_sql(
+            build_stream_query(
+                StreamSort.ORDERDATE, filters, [date(1995, 2, 1), 7], False, 11
+            )
+        )
+
+        assert "public.orders_synced.o_orderstatus = 'O'" in sql
+        assert "public.orders_synced.o_orderdate >= '1995-01-01'" in sql
+        assert (
+            "(public.orders_synced.o_orderdate, public.orders_synced.o_orderkey) > ('1995-02-01', 7)"
+            in sql
+        )
+        assert "ORDER BY public.orders_synced.o_orderdate, public.orders_synced.o_orderkey" in sql
+
+    def test_backward_reverses_comparison_and_order(self):
+        """Test that going backward reads rows before the boundary in descending order."""
+        sql = compile_sql(
+            build_stream_query(
+                StreamSort.ORDERDATE, StreamFilters(custkey=5), [date(1995, 2, 1), 7], True, 11
+            )
+        )
+
+        assert "public.orders_synced.o_custkey = 5" in sql
+        assert ") < ('1995-02-01', 7)" in sql
+        assert (
+            "ORDER BY public.orders_synced.o_orderdate DESC, public.orders_synced.o_orderkey DESC"
+            in sql
+        )
+
+
+class TestStreamCursors:
+    """Tests for validating stream parameters and cursor values."""
+
+    def test_date_range_requires_date_sort(self):
+        """Test that date filters are rejected unless the stream is sorted by date."""
+        with pytest.raises(InvalidStreamQueryError):
+            validate_stream_query(StreamSort.ORDERKEY, StreamFilters(end_date=date(1995, 1, 1)))
+        validate_stream_query(StreamSort.ORDERDATE, StreamFilters(end_date=date(1995, 1, 1)))
+
+    def test_cursor_values_round_trip(self):
+        """Test that the sort key of a row survives encoding as cursor values."""
+        row = SimpleNamespace(o_orderdate=date(1995, 2, 1), o_orderkey=7)
+
+        values = cursor_values(row, StreamSort.ORDERDATE)
+
+        assert values == ["1995-02-01", 7]
+        assert parse_cursor_values(StreamSort.ORDERDATE, values) == [date(1995, 2, 1), 7]
+
+    @pytest.mark.parametrize(
+        "sort, values",
+        [
+            (StreamSort.ORDERDATE, [7]),
+            (StreamSort.ORDERKEY, ["1995-02-01", 7]),
+            (StreamSort.ORDERDATE, ["not-a-date", 7]),
+        ],
+    )
+    def test_cursor_not_matching_sort_is_rejected(self, sort, values):
+        """Test that a cursor from another sort order is rejected."""
+        with pytest.raises(InvalidStreamQueryError):
+            parse_cursor_values(sort, values)
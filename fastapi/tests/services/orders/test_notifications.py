@@ -0,0 +1,93 @@
+"""Tests for order change notifications."""
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql
+
+from services.orders.cache import TTLCache
+from services.orders.notifications import (
+    OrderChangeListener,
+    parse_notification,
+    with_change_notifications,
+)
+from services.orders.status_updates import orders_table
+
+
+@pytest.fixture
+def cache(mocker):
+    """Replace the order cache evicted by the listener."""
+    cache = TTLCache(max_entries=10, max_bytes=1024 * 1024, ttl=60)
+    mocker.patch("services.orders.notifications.order_cache", cache)
+    return cache
+
+
+class TestWithChangeNotifications:
+    """Tests for wrapping status updates with pg_notify."""
+
+    def test_notifies_each_updated_row(self):
+        """Test that the update runs in a CTE selecting pg_notify per returned row."""
+        stmt = with_change_notifications(
+            update(orders_table)
+            .where(orders_table.c.o_orderkey == 1)
+            .values(o_orderstatus="F")
+            .returning(orders_table.c.o_orderkey, orders_table.c.o_orderstatus)
+        )
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+
+        assert sql.startswith("WITH updated AS \n(UPDATE")
+        assert "pg_notify(" in sql
+        assert "json_build_array(updated.o_orderkey, updated.o_orderstatus)" in sql
+        assert list(stmt.selected_columns.keys())[:2] == ["o_orderkey", "o_orderstatus"]
+
+
+class TestOrderChangeListener:
+    """Tests for handling received notifications."""
+
+    def test_parse_notification(self):
+        """Test that payloads are parsed into an order key and status."""
+        assert parse_notification('[42, "F"]') == (42, "F")
+
+    def test_notification_evicts_cached_order(self, cache):
+        """Test that a received change evicts the order from the cache."""
+        cache.set(1, "order 1")
+        cache.set(2, "order 2")
+        listener = OrderChangeListener(enabled=True, channel="orders_changed")
+
+        listener._on_notification(None, 1234, "orders_changed", '[1, "F"]')
+
+        assert cache.get(1) is None
+        assert cache.get(2) == "order 2"
+
+    def test_notification_is_dispatched_to_handlers(self, cache):
+        """Test that registered handlers receive every change."""
+        listener = OrderChangeListener(enabled=True, channel="orders_changed")
+        received = []
+        listener.add_handler(lambda key, status: received.append((key, status)))
+
+        listener._on_notification(None, 1234, "orders_changed", '[7, "O"]')
+
+        assert received == [(7, "O")]
+
+    def test_malformed_notification_is_ignored(self, cache):
+        """Test that an invalid payload neither raises nor evicts anything."""
+        cache.set(1, "order 1")
+        listener = OrderChangeListener(enabled=True, channel="orders_changed")
+
+        listener._on_notification(None, 1234, "orders_changed", "not json")
+
+        assert cache.get(1) == "order 1"
+
+    def test_failing_handler_does_not_stop_others(self, cache):
+        """Test that an exception in one handler does not skip the remaining ones."""
+        listener = OrderChangeListener(enabled=True, channel="orders_changed")
+        received = []
+
+        def failing(key, status):
+            raise RuntimeError("boom")
+
+        listener.add_handler(failing)
+        listener.add_handler(lambda key, status: received.append(key))
+
+        listener._on_notification(None, 1234, "orders_changed", '[3, "P"]')
+
+        assert received == [3]
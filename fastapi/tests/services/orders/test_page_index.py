@@ -0,0 +1,106 @@
+"""Tests for the orders page index."""
+
+import asyncio
+
+import pytest
+
+from services.orders import page_index
+from services.orders.page_index import PageIndex
+
+
+@pytest.fixture
+def built_index():
+    """Create a page index with boundaries every 100 rows."""
+    index = PageIndex(stride=100)
+    index._boundaries = [1, 388, 775, 1160]
+    index._built_at = 1.0
+    return index
+
+
+class TestPageIndex:
+    """Tests for translating offsets into keyset seeks."""
+
+    def test_seek_before_build_returns_none(self):
+        """Test that an unbuilt index does not translate offsets."""
+        assert PageIndex(stride=100).seek(250) is None
+
+    @pytest.mark.parametrize(
+        "offset, expected",
+        [(0, (1, 0)), (99, (1, 99)), (100, (388, 0)), (250, (775, 50))],
+    )
+    def test_seek_uses_closest_boundary(self, built_index, offset, expected):
+        """Test that offsets map to the boundary at or before them."""
+        assert built_index.seek(offset) == expected
+
+    def test_seek_past_last_boundary(self, built_index):
+        """Test that offsets past the last boundary seek from the last boundary."""
+        assert built_index.seek(450) == (1160, 150)
+
+    def test_invalidate(self, built_index):
+        """Test that an invalidated index no longer translates offsets."""
+        built_index.invalidate()
+
+        assert not built_index.ready
+        assert built_index.seek(0) is None
+
+    def test_stride_must_be_positive(self):
+        """Test that a zero stride is rejected."""
+        with pytest.raises(ValueError):
+            PageIndex(stride=0)
+
+
+@pytest.fixture
+def blocking_table(mocker):
+    """Serve boundary queries that wait for a release, returning a new key list each time."""
+    results = iter([[1, 500], [1, 600], [1, 700]])
+    release = asyncio.Event()
+    calls = []
+
+    async def execute(stmt):
+        calls.append(stmt)
+        await release.wait()
+        result = mocker.MagicMock()
+        result.scalars.return_value.all.return_value = next(results)
+        return result
+
+    session = mocker.MagicMock()
+    session.execute = execute
+    sessionmaker = mocker.MagicMock()
+    sessionmaker.return_value.return_value.__aenter__ = mocker.AsyncMock(return_value=session)
+    sessionmaker.return_value.return_value.__aexit__ = mocker.AsyncMock(return_value=False)
+    mocker.patch.object(page_index.database, "get_read_sessionmaker", sessionmaker)
+    return release, calls
+
+
+@pytest.mark.asyncio
+class TestPageIndexRebuild:
+    """Tests for rebuilds racing invalidations and other rebuilds."""
+
+    async def test_invalidate_discards_running_build(self, blocking_table):
+        """Test that a build started before an invalidation does not install its boundaries."""
+        release, calls = blocking_table
+        index = PageIndex(stride=100)
+
+        task = index.schedule_rebuild()
+        await asyncio.sleep(0)
+        index.invalidate()
+        release.set()
+        await task
+
+        assert not index.ready
+        assert len(calls) == 1
+
+    async def test_rebuild_requested_while_building_runs_again(self, blocking_table):
+        """Test that a second request discards the running build and builds again."""
+        release, calls = blocking_table
+        index = PageIndex(stride=100)
+
+        task = index.schedule_rebuild()
+        await asyncio.sleep(0)
+        assert index.schedule_rebuild() is task
+        release.set()
+        await task
+
+        assert index.ready
+        assert len(calls) == 2
+        assert index.seek(100) == (600, 0)
@@ -0,0 +1,77 @@
+"""Tests for random order key sampling."""
+
+import pytest
+
+from services.orders.counts import CountMode, CountResult
+from services.orders.sampling import SampleMethod, sample_order_keys
+
+
+def result(mocker, one=None, scalars=None):
+    value = mocker.MagicMock()
+    value.one.return_value = one
+    value.scalars.return_value = iter(scalars or [])
+    return value
+
+
+@pytest.mark.asyncio
+class TestSampleOrderKeys:
+    """Tests for drawing samples of order keys."""
+
+    async def test_keyrange_tops_up_duplicate_probes(self, mocker):
+        """Test that probes landing on the same key are replaced by new probes."""
+        db = mocker.MagicMock()
+        db.execute = mocker.AsyncMock(
+            side_effect=[
+                result(mocker, one=(1, 100)),
+                result(mocker, scalars=[5, 5, 9]),
+                result(mocker, scalars=[9, 12]),
+            ]
+        )
+
+        keys = await sample_order_keys(db, 3, SampleMethod.KEYRANGE, seed=1)
+
+        assert sorted(keys) == [5, 9, 12]
+        assert db.execute.await_count == 3
+
+    async def test_keyrange_empty_table(self, mocker):
+        """Test that an empty table yields an empty sample."""
+        db = mocker.MagicMock()
+        db.execute = mocker.AsyncMock(return_value=result(mocker, one=(None, None)))
+
+        assert await sample_order_keys(db, 5, SampleMethod.KEYRANGE) == []
+
+    async def test_seed_makes_sample_repeatable(self, mocker):
+        """Test that the same seed shuffles the same keys in the same order."""
+        mocker.patch(
+            "services.orders.sampling.order_counts.get",
+            mocker.AsyncMock(return_value=CountResult(100, CountMode.APPROXIMATE, 0)),
+        )
+
+        samples = []
+        for _ in range(2):
+            db = mocker.MagicMock()
+            db.execute = mocker.AsyncMock(return_value=result(mocker, scalars=list(range(20))))
+            samples.append(await sample_order_keys(db, 10, SampleMethod.SYSTEM, seed=42))
+
+        assert samples[0] == samples[1]
+        assert len(set(samples[0])) == 10
+
+    async def test_tablesample_widens_short_sample(self, mocker):
+        """Test that a sample smaller than requested is retried with a larger percentage."""
+        mocker.patch(
+            "services.orders.sampling.order_counts.get",
+            mocker.AsyncMock(return_value=CountResult(1000, CountMode.APPROXIMATE, 0)),
+        )
+        db = mocker.MagicMock()
+        db.execute = mocker.AsyncMock(
+            side_effect=[result(mocker, scalars=[1]), result(mocker, scalars=[1, 2, 3])]
+        )
+
+        keys = await sample_order_keys(db, 3, SampleMethod.BERNOULLI)
+
+        assert sorted(keys) == [1, 2, 3]
+        first, second = (call.args[0] for call in db.execute.await_args_list)
+        assert "TABLESAMPLE bernoulli" in str(first)
+        first_percent = first.compile().params["bernoulli_1"]
+        second_percent = second.compile().params["bernoulli_1"]
+        assert second_percent == first_percent * 4
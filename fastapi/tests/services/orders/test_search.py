@@ -0,0 +1,62 @@
+"""Tests for order comment search."""
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import DBAPIError
+
+from services.orders.search import (
+    build_search_query,
+    escape_like,
+    is_search_unavailable,
+    is_statement_timeout,
+)
+
+
+def compile_sql(stmt):
+    return str(
+        stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    ).replace("\n", " ")
+
+
+def db_error(mocker, sqlstate):
+    orig = mocker.MagicMock()
+    orig.sqlstate = sqlstate
+    return DBAPIError("SELECT 1", {}, orig)
+
+
+class TestBuildSearchQuery:
+    """Tests for the generated search queries."""
+
+    def test_escape_like(self):
+        """Test that LIKE wildcards in the search text match literally."""
+        assert escape_like("50%_off\\") == "50\\%\\_off\\\\"
+
+    def test_first_page_filters_and_ranks(self):
+        """Test that the first page filters with ILIKE and orders by rank."""
+        sql = compile_sql(build_search_query("special requests", None, 21))
+
+        assert "o_comment ILIKE '%%special requests%%'" in sql
+        assert "word_similarity('special requests', public.orders_synced.o_comment) AS rank" in sql
+        assert "DESC, public.orders_synced.o_orderkey" in sql
+        assert "LIMIT 21" in sql
+
+    def test_next_page_seeks_after_rank_and_key(self):
+        """Test that later pages continue after the last (rank, key) pair."""
+        sql = compile_sql(build_search_query("special", [0.5, 42], 21))
+
+        assert "o_comment) < 0.5" in sql
+        assert "o_comment) = 0.5 AND public.orders_synced.o_orderkey > 42" in sql
+
+
+class TestSearchErrors:
+    """Tests for classifying search failures."""
+
+    def test_statement_timeout(self, mocker):
+        """Test that a cancelled statement is recognized as a timeout."""
+        assert is_statement_timeout(db_error(mocker, "57014"))
+        assert not is_statement_timeout(db_error(mocker, "42883"))
+        assert not is_statement_timeout(ValueError("boom"))
+
+    def test_missing_extension(self, mocker):
+        """Test that a missing word_similarity function is recognized."""
+        assert is_search_unavailable(db_error(mocker, "42883"))
+        assert not is_search_unavailable(db_error(mocker, "57014"))
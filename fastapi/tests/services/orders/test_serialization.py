@@ -0,0 +1,76 @@
+"""Tests for the fast order listing encoder."""
+
+import json
+from datetime import date
+from decimal import Decimal
+
+
+from models.orders import CursorPaginationInfo, OrderListCursorResponse, OrderRead
+from services.orders.serialization import order_list_response, rows_to_dicts
+
+
+class FakeRow(tuple):
+    """A minimal stand-in for a Core row with named fields."""
+
+    _fields = (
+        "o_orderkey",
+        "o_custkey",
+        "o_orderstatus",
+        "o_totalprice",
+        "o_orderdate",
+        "o_orderpriority",
+        "o_clerk",
+        "o_shippriority",
+        "o_comment",
+    )
+
+
+def make_row(order_key, price, comment="regular deposits"):
+    return FakeRow(
+        (
+            order_key,
+            7,
+            "O",
+            price,
+            date(1995, 3, 14),
+            "1-URGENT",
+            "Clerk#000000001",
+            0,
+            comment,
+        )
+    )
+
+
+class TestOrderListResponse:
+    """Tests for encoding order listings without response models."""
+
+    def test_matches_response_model_output(self):
+        """Test that the fast path produces the same JSON as the response model."""
+        rows = [make_row(1, Decimal("10.50")), make_row(2, Decimal("0.00"), "naïve “x”")]
+        pagination = CursorPaginationInfo(
+            page_size=2, has_next=True, has_previous=False, next_cursor="abc"
+        )
+
+        fast = order_list_response(rows, pagination).body
+        expected = OrderListCursorResponse(
+            orders=[OrderRead(**dict(zip(FakeRow._fields, row))) for row in rows],
+            pagination=pagination,
+        ).model_dump_json()
+
+        assert json.loads(fast) == json.loads(expected)
+        assert list(json.loads(fast)["orders"][0]) == list(OrderRead.model_fields)
+
+    def test_decimals_stay_strings_and_dates_iso(self):
+        """Test that prices keep their scale and dates are ISO formatted."""
+        order = rows_to_dicts([make_row(1, Decimal("1234.50"))])[0]
+        pagination = CursorPaginationInfo(page_size=1, has_next=False, has_previous=False)
+
+        body = json.loads(order_list_response([make_row(1, Decimal("1234.50"))], pagination).body)
+
+        assert order["o_totalprice"] == Decimal("1234.50")
+        assert body["orders"][0]["o_totalprice"] == "1234.50"
+        assert body["orders"][0]["o_orderdate"] == "1995-03-14"
+
+    def test_empty_page(self):
+        """Test that an empty page encodes an empty order list."""
+        assert rows_to_dicts([]) == []
@@ -0,0 +1,93 @@
+"""Tests for the order status update service."""
+
+import pytest
+
+from services.orders.status_updates import (
+    StatusChange,
+    apply_bulk_status_updates,
+    apply_status_update,
+)
+
+
+@pytest.fixture
+def mock_db(mocker):
+    """Create a mock session for status updates."""
+    db = mocker.MagicMock()
+    db.execute = mocker.AsyncMock(return_value=mocker.MagicMock())
+    db.commit = mocker.AsyncMock()
+    db.rollback = mocker.AsyncMock()
+    return db
+
+
+@pytest.mark.asyncio
+class TestApplyStatusUpdate:
+    """Tests for single order status updates."""
+
+    async def test_update_uses_single_returning_statement(self, mock_db, mocker):
+        """Test that an update is one UPDATE ... RETURNING and a commit."""
+        row = mocker.MagicMock(o_orderkey=1, o_orderstatus="F")
+        mock_db.execute.return_value.first.return_value = row
+
+        change = await apply_status_update(mock_db, 1, "F")
+
+        assert change == StatusChange(o_orderkey=1, o_orderstatus="F")
+        assert mock_db.execute.await_count == 1
+        sql = str(mock_db.execute.await_args.args[0])
+        assert sql.startswith("UPDATE")
+        assert "RETURNING" in sql
+        mock_db.commit.assert_awaited_once()
+
+    async def test_missing_order_returns_none(self, mock_db):
+        """Test that no returned row means the order does not exist."""
+        mock_db.execute.return_value.first.return_value = None
+
+        assert await apply_status_update(mock_db, 404, "F") is None
+
+
+@pytest.mark.asyncio
+class TestApplyBulkStatusUpdates:
+    """Tests for bulk order status updates."""
+
+    async def test_updates_are_chunked_in_one_transaction(self, mock_db, mocker):
+        """Test that large payloads are split into chunks and committed once."""
+        mock_db.execute.side_effect = lambda stmt, params: [
+            mocker.MagicMock(o_orderkey=key, o_orderstatus=status)
+            for key, status in zip(params["order_keys"], params["statuses"])
+        ]
+        updates = [(key, "F") for key in range(1, 6)]
+
+        changes = await apply_bulk_status_updates(mock_db, updates, chunk_size=2)
+
+        assert len(changes) == 5
+        assert mock_db.execute.await_count == 3
+        mock_db.commit.assert_awaited_once()
+
+    async def test_last_status_wins_for_repeated_keys(self, mock_db, mocker):
+        """Test that a repeated order key is sent once with its latest status."""
+        mock_db.execute.side_effect = lambda stmt, params: []
+
+        await apply_bulk_status_updates(mock_db, [(1, "O"), (2, "O"), (1, "F")])
+
+        params = mock_db.execute.await_args.args[1]
+        assert params == {"order_keys": [1, 2], "statuses": ["F", "O"]}
+
+    async def test_keys_are_locked_in_ascending_order(self, mock_db, mocker):
+        """Test that keys are sent sorted across chunks whatever the request order."""
+        mock_db.execute.side_effect = lambda stmt, params: []
+        updates = [(5, "F"), (3, "O"), (9, "P"), (1, "F"), (7, "O")]
+
+        await apply_bulk_status_updates(mock_db, updates, chunk_size=2)
+
+        chunks = [call.args[1] for call in mock_db.execute.await_args_list]
+        assert [chunk["order_keys"] for chunk in chunks] == [[1, 3], [5, 7], [9]]
+        assert [chunk["statuses"] for chunk in chunks] == [["F", "O"], ["F", "O"], ["P"]]
+
+    async def test_failure_rolls_back(self, mock_db):
+        """Test that a failing chunk rolls back the whole transaction."""
+        mock_db.execute.side_effect = Exception("Database connection failed")
+
+        with pytest.raises(Exception):
+            await apply_bulk_status_updates(mock_db, [(1, "F")])
+
+        mock_db.rollback.assert_awaited_once()
+        mock_db.commit.assert_not_awaited()
@@ -0,0 +1,156 @@
+"""Tests for the pre-aggregated order summary."""
+
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlmodel import SQLModel
+
+from services.orders import status_updates
+from services.orders.summary import (
+    OrderSummaryRefresher,
+    SummaryDimension,
+    SummaryPeriod,
+    adjust_order_summary,
+    build_summary_query,
+    summary_deltas,
+)
+
+
+def compile_sql(stmt):
+    return str(
+        stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    ).replace("\n", " ")
+
+
+def changed(previous, current, price="10.00", day=date(1995, 1, 1), priority="1-URGENT"):
+    return SimpleNamespace(
+        o_orderkey=1,
+        o_orderdate=day,
+        o_orderpriority=priority,
+        o_totalprice=Decimal(price),
+        previous_status=previous,
+        o_orderstatus=current,
+    )
+
+
+class TestSummaryDeltas:
+    """Tests for computing summary adjustments from status changes."""
+
+    def test_change_moves_order_between_statuses(self):
+        """Test that an order leaves its previous status and joins the new one."""
+        deltas = summary_deltas([changed("O", "F")])
+
+        assert deltas == {
+            (date(1995, 1, 1), "O", "1-URGENT"): [-1, Decimal("-10.00")],
+            (date(1995, 1, 1), "F", "1-URGENT"): [1, Decimal("10.00")],
+        }
+
+    def test_unchanged_status_and_round_trips_are_left_out(self):
+        """Test that changes cancelling out do not touch the summary."""
+        assert summary_deltas([changed("O", "O")]) == {}
+        assert summary_deltas([changed("O", "F"), changed("F", "O")]) == {}
+
+
+class TestBuildSummaryQuery:
+    """Tests for rolling the daily summary up."""
+
+    def test_groups_by_truncated_date_and_priority(self):
+        """Test that dates are truncated to the period and groups are ordered."""
+        sql = compile_sql(
+            build_summary_query(
+                [SummaryDimension.DATE, SummaryDimension.PRIORITY],
+                SummaryPeriod.QUARTER,
+                start_date=date(1995, 1, 1),
+            )
+        )
+
+        assert (
+            "CAST(date_trunc('quarter', public.orders_daily_summary.o_orderdate) AS DATE) AS period"
+            in sql
+        )
+        assert "NULL AS o_orderstatus" in sql
+        assert "o_orderdate >= '1995-01-01'" in sql
+        assert "GROUP BY CAST(date_trunc('quarter'" in sql
+        assert "HAVING sum(public.orders_daily_summary.order_count) > 0" in sql
+
+    def test_no_dimensions_is_a_grand_total(self):
+        """Test that no dimensions give one ungrouped row."""
+        sql = compile_sql(build_summary_query([]))
+
+        assert "GROUP BY" not in sql
+        assert "NULL AS period" in sql
+
+
+@pytest.mark.asyncio
+class TestAdjustOrderSummary:
+    """Tests for applying status changes to the summary."""
+
+    async def test_upserts_deltas(self, mocker):
+        """Test that deltas are added to existing summary rows."""
+        db = mocker.MagicMock()
+        db.execute = mocker.AsyncMock()
+
+        await adjust_order_summary(db, [changed("O", "F")])
+
+        sql = compile_sql(db.execute.await_args.args[0])
+        assert sql.startswith("INSERT INTO public.orders_daily_summary")
+        assert "ON CONFLICT (o_orderdate, o_orderstatus, o_orderpriority) DO UPDATE" in sql
+        assert (
+            "order_count = (public.orders_daily_summary.order_count + excluded.order_count)"
+            in sql
+        )
+
+    async def test_nothing_to_adjust(self, mocker):
+        """Test that no statement is sent when no totals change."""
+        db = mocker.MagicMock()
+        db.execute = mocker.AsyncMock()
+
+        await adjust_order_summary(db, [changed("O", "O")])
+
+        db.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+class TestStatusUpdatesAdjustSummary:
+    """Tests for maintaining the summary from status updates."""
+
+    async def test_update_reads_previous_status_and_adjusts(self, mocker):
+        """Test that the update returns the replaced status and adjusts before committing."""
+        mocker.patch.object(status_updates, "SUMMARY_ENABLED", True)
+        adjust = mocker.patch.object(status_updates, "adjust_order_summary")
+        row = changed("O", "F")
+        db = mocker.MagicMock()
+        db.execute = mocker.AsyncMock(return_value=mocker.MagicMock())
+        db.execute.return_value.first.return_value = row
+        db.commit = mocker.AsyncMock()
+
+        await status_updates.apply_status_update(db, 1, "F")
+
+        sql = compile_sql(db.execute.await_args.args[0])
+        assert "previous_status" in sql
+        assert "FOR UPDATE" in sql
+        adjust.assert_awaited_once_with(db, [row])
+        db.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+class TestSummaryTableCreation:
+    """Tests for creating the summary table only where it is used."""
+
+    async def test_not_created_at_startup(self):
+        """Test that create_all at startup leaves the summary table out."""
+        assert "public.orders_daily_summary" not in SQLModel.metadata.tables
+        assert "public.orders_synced" in SQLModel.metadata.tables
+
+    async def test_disabled_summary_creates_nothing(self, mocker):
+        """Test that a disabled summary neither creates its table nor starts refreshing."""
+        create_table = mocker.patch.object(OrderSummaryRefresher, "create_table")
+        refresher = OrderSummaryRefresher(enabled=False, refresh_interval=60)
+
+        await refresher.start()
+
+        create_table.assert_not_called()
+        assert refresher._task is None
@@ -0,0 +1,77 @@
+"""Tests for downsampled order time series."""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from services.orders import timeseries
+from services.orders.cache import TTLCache
+from services.orders.timeseries import (
+    BUCKET_WIDTHS,
+    InvalidTimeSeriesQueryError,
+    choose_bucket_width,
+    order_time_series,
+)
+
+WIDTHS = {width.name: width for width in BUCKET_WIDTHS}
+
+
+class TestBucketWidth:
+    """Tests for bucket boundaries."""
+
+    def test_day_buckets_are_aligned_on_mondays(self):
+        """Test that weekly buckets start on Mondays whatever the range start."""
+        week = WIDTHS["7 days"]
+
+        assert week.floor(date(1995, 3, 1)) == date(1995, 2, 27)
+        assert week.next(date(1995, 2, 27)) == date(1995, 3, 6)
+        assert week.count(date(1995, 3, 1), date(1995, 3, 6)) == 2
+
+    def test_calendar_buckets(self):
+        """Test month, quarter and year boundaries."""
+        assert WIDTHS["month"].next(date(1995, 12, 1)) == date(1996, 1, 1)
+        assert WIDTHS["quarter"].floor(date(1995, 8, 15)) == date(1995, 7, 1)
+        assert WIDTHS["quarter"].count(date(1995, 3, 31), date(1995, 4, 1)) == 2
+        assert WIDTHS["year"].count(date(1992, 1, 1), date(1998, 8, 2)) == 7
+
+
+class TestChooseBucketWidth:
+    """Tests for picking the bucket width."""
+
+    def test_picks_narrowest_width_within_points(self):
+        """Test that the width grows until the range fits the point budget."""
+        start, end = date(1995, 3, 1), date(1995, 6, 30)
+
+        assert choose_bucket_width(start, end, 300).name == "1 day"
+        assert choose_bucket_width(start, end, 20).name == "7 days"
+        assert choose_bucket_width(start, end, 5).name == "month"
+
+    def test_range_too_wide(self):
+        """Test that a range needing more yearly buckets than points is rejected."""
+        with pytest.raises(InvalidTimeSeriesQueryError):
+            choose_bucket_width(date(1992, 1, 1), date(1998, 8, 2), 3)
+
+
+@pytest.mark.asyncio
+class TestOrderTimeSeries:
+    """Tests for loading and caching time series."""
+
+    async def test_repeated_requests_are_served_from_cache(self, mocker):
+        """Test that the same range and width query the database once."""
+        mocker.patch.object(
+            timeseries, "timeseries_cache", TTLCache(max_entries=10, max_bytes=1 << 20, ttl=60)
+        )
+        row = mocker.MagicMock(
+            bucket=date(1995, 3, 1), order_count=3, total_price=Decimal("30.00")
+        )
+        db = mocker.MagicMock()
+        db.execute = mocker.AsyncMock(return_value=[row])
+        args = (db, date(1995, 3, 1), date(1995, 6, 30), WIDTHS["month"])
+
+        first = await order_time_series(*args)
+        second = await order_time_series(*args)
+
+        assert first == second
+        assert first[0].bucket_end == date(1995, 4, 1)
+        assert db.execute.await_count == 1
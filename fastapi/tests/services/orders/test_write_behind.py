@@ -0,0 +1,132 @@
+"""Tests for the order status write-behind queue."""
+
+import pytest
+
+from services.orders.status_updates import StatusChange
+from services.orders.write_behind import StatusWriteBehind
+
+
+@pytest.fixture
+def mock_bulk_update(mocker):
+    """Replace the bulk update and session factory used by the flusher."""
+    session_factory = mocker.MagicMock()
+    session_factory.return_value.__aenter__ = mocker.AsyncMock()
+    session_factory.return_value.__aexit__ = mocker.AsyncMock(return_value=False)
+    mocker.patch(
+        "services.orders.write_behind.database.AsyncSessionLocal", session_factory
+    )
+
+    async def bulk_update(session, updates):
+        return [
+            StatusChange(o_orderkey=key, o_orderstatus=status)
+            for key, status in updates
+            if key != 404
+        ]
+
+    return mocker.patch(
+        "services.orders.write_behind.apply_bulk_status_updates",
+        side_effect=bulk_update,
+    )
+
+
+@pytest.mark.asyncio
+class TestStatusWriteBehind:
+    """Tests for coalescing and flushing queued status updates."""
+
+    async def test_updates_to_same_order_are_coalesced(self, mock_bulk_update):
+        """Test that only the last queued status of an order is written."""
+        queue = StatusWriteBehind(enabled=True, flush_interval=1, max_batch=100)
+
+        first = queue.submit(1, "O")
+        second = queue.submit(1, "F")
+        queue.submit(2, "P")
+        flushed = await queue.flush()
+
+        assert flushed == 2
+        assert mock_bulk_update.call_args.args[1] == [(1, "F"), (2, "P")]
+        assert await first == StatusChange(o_orderkey=1, o_orderstatus="F")
+        assert await second == StatusChange(o_orderkey=1, o_orderstatus="F")
+
+    async def test_missing_order_resolves_to_none(self, mock_bulk_update):
+        """Test that waiting on an unknown order resolves to None."""
+        queue = StatusWriteBehind(enabled=True, flush_interval=1, max_batch=100)
+
+        pending = queue.submit(404, "F")
+        await queue.flush()
+
+        assert await pending is None
+
+    async def test_stop_flushes_queued_updates(self, mock_bulk_update):
+        """Test that shutting down writes updates that are still queued."""
+        queue = StatusWriteBehind(enabled=True, flush_interval=60, max_batch=100)
+        await queue.start()
+
+        pending = queue.submit(1, "F")
+        await queue.stop()
+
+        assert pending.done()
+        assert queue.pending_count == 0
+
+    async def test_failed_flush_requeues_updates(self, mock_bulk_update):
+        """Test that a failed flush keeps the updates queued and retries them."""
+        bulk_update = mock_bulk_update.side_effect
+        mock_bulk_update.side_effect = Exception("Database connection failed")
+        queue = StatusWriteBehind(enabled=True, flush_interval=1, max_batch=100)
+
+        pending = queue.submit(1, "F")
+        assert await queue.flush() == 0
+
+        assert not pending.done()
+        assert queue.pending_count == 1
+        assert queue.failures == 1
+
+        mock_bulk_update.side_effect = bulk_update
+        assert await queue.flush() == 1
+        assert await pending == StatusChange(o_orderkey=1, o_orderstatus="F")
+        assert queue.failures == 0
+
+    async def test_requeue_keeps_newer_update(self, mock_bulk_update):
+        """Test that an update submitted during a failed flush is not overwritten."""
+        queue = StatusWriteBehind(enabled=True, flush_interval=1, max_batch=100)
+        newer = []
+
+        async def fail_after_new_submit(session, updates):
+            newer.append(queue.submit(1, "P"))
+            raise Exception("Database connection failed")
+
+        mock_bulk_update.side_effect = fail_after_new_submit
+        older = queue.submit(1, "F")
+        await queue.flush()
+
+        mock_bulk_update.side_effect = None
+        mock_bulk_update.return_value = [StatusChange(o_orderkey=1, o_orderstatus="P")]
+        await queue.flush()
+
+        assert mock_bulk_update.call_args.args[1] == [(1, "P")]
+        assert await older == await newer[0]
+
+    async def test_retry_delay_backs_off(self):
+        """Test that retries double up to the maximum delay."""
+        queue = StatusWriteBehind(
+            enabled=True, flush_interval=1, max_batch=100, retry_initial=0.1, retry_max=0.3
+        )
+
+        delays = []
+        for failures in (1, 2, 3):
+            queue.failures = failures
+            delays.append(queue.retry_delay())
+
+        assert delays == [0.1, 0.2, 0.3]
+
+    async def test_stop_fails_waiters_of_unwritten_updates(self, mock_bulk_update):
+        """Test that updates still failing at shutdown raise for their waiters."""
+        mock_bulk_update.side_effect = Exception("Database connection failed")
+        queue = StatusWriteBehind(enabled=True, flush_interval=60, max_batch=100)
+        await queue.start()
+
+        pending = queue.submit(1, "F")
+        await queue.stop()
+
+        assert queue.pending_count == 0
+        with pytest.raises(RuntimeError, match="stopped before the update was written"):
+            await pending